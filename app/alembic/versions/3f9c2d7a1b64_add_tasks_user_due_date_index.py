@@ -0,0 +1,32 @@
+"""Add tasks (user_id, due_date, id) index
+
+Revision ID: 3f9c2d7a1b64
+Revises: ab1877d0746b
+Create Date: 2026-10-18 10:12:41.218903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2d7a1b64"
+down_revision: Union[str, Sequence[str], None] = "ab1877d0746b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_user_id_due_date_id",
+        "tasks",
+        ["user_id", "due_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_user_id_due_date_id", table_name="tasks")
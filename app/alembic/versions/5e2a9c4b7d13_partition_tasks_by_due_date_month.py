@@ -0,0 +1,116 @@
+"""Partition tasks by due_date month
+
+Revision ID: 5e2a9c4b7d13
+Revises: 7c41e8b2d9a5
+Create Date: 2026-10-18 18:41:09.337512
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from sqlalchemy import text
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2a9c4b7d13"
+down_revision: Union[str, Sequence[str], None] = "7c41e8b2d9a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+COLUMNS = "id, title, description, due_date, user_id, created_at"
+TABLE_COLUMNS = """
+    id integer NOT NULL DEFAULT nextval('tasks_id_seq'::regclass),
+    title varchar NOT NULL,
+    description varchar,
+    due_date timestamptz NOT NULL,
+    user_id integer NOT NULL REFERENCES users (id),
+    created_at timestamptz NOT NULL,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED"""
+INDEXES = (
+    "CREATE INDEX ix_tasks_user_id_due_date_id ON tasks (user_id, due_date, id)",
+    "CREATE INDEX ix_tasks_user_id_search_vector ON tasks "
+    "USING gin (user_id, search_vector)",
+    "CREATE INDEX ix_tasks_user_id_title_trgm ON tasks "
+    "USING gin (user_id, title gin_trgm_ops)",
+)
+INDEX_NAMES = (
+    "ix_tasks_user_id_due_date_id",
+    "ix_tasks_user_id_search_vector",
+    "ix_tasks_user_id_title_trgm",
+)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _rename_old_table() -> None:
+    op.execute("ALTER TABLE tasks RENAME TO tasks_old")
+    op.execute("ALTER TABLE tasks_old RENAME CONSTRAINT tasks_pkey TO tasks_old_pkey")
+    for name in INDEX_NAMES:
+        old_name = name.replace("tasks", "tasks_old")
+        op.execute(f"ALTER INDEX {name} RENAME TO {old_name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        return  # в SQLite секционирования нет
+
+    # Таблица пересоздается и копируется целиком под блокировкой:
+    # на больших таблицах миграцию нужно выполнять в окно обслуживания
+    _rename_old_table()
+    op.execute(
+        f"CREATE TABLE tasks ({TABLE_COLUMNS},\n    PRIMARY KEY (id, due_date)\n"
+        ") PARTITION BY RANGE (due_date)"
+    )
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("CREATE TABLE tasks_default PARTITION OF tasks DEFAULT")
+
+    # секции для каждого месяца с задачами и на MONTHS_AHEAD месяцев вперед
+    months = set(
+        bind.execute(
+            text(
+                "SELECT DISTINCT date_trunc('month', due_date AT TIME ZONE 'UTC') "
+                "FROM tasks_old"
+            )
+        ).scalars()
+    )
+    now = datetime.now(timezone.utc)
+    current = datetime(now.year, now.month, 1)
+    months.update(_add_months(current, offset) for offset in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        start = month.replace(tzinfo=timezone.utc)
+        end = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE tasks_p{start:%Y_%m} PARTITION OF tasks "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_old")
+    op.execute("DROP TABLE tasks_old")
+    for statement in INDEXES:
+        op.execute(statement)
+    op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        return
+
+    _rename_old_table()
+    op.execute(f"CREATE TABLE tasks ({TABLE_COLUMNS},\n    PRIMARY KEY (id)\n)")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_old")
+    op.execute("DROP TABLE tasks_old CASCADE")
+    for statement in INDEXES:
+        op.execute(statement)
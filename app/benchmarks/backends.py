@@ -0,0 +1,132 @@
+"""Подключаемые бекенды для бенчмарков: база данных, Redis и транспорт HTTP"""
+
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+import fakeredis
+import redis.asyncio as redis
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.config import settings
+from core.dependencies import get_db
+from core.principal_cache import principal_cache
+from core.redis import redis_service
+from core.revocation import revocation_registry
+from main import create_application
+from models import Base
+
+DATABASES = ("sqlite", "postgres")
+REDIS_BACKENDS = ("fake", "local")
+TRANSPORTS = ("inprocess", "uvicorn")
+
+
+@asynccontextmanager
+async def database_backend(name: str, db_url: str | None = None):
+    """Фабрика сессий на чистой схеме
+
+    sqlite - временный файл, postgres - база по db_url. Все таблицы базы
+    postgres пересоздаются, поэтому адрес нужно указывать явно.
+    """
+    if name not in DATABASES:
+        raise ValueError(f"Неизвестная база данных: {name}")
+    with tempfile.TemporaryDirectory() as tmp:
+        if name == "sqlite":
+            db_url = db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        elif not db_url:
+            raise ValueError("Для postgres нужно указать --db-url")
+        engine = create_async_engine(db_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield async_sessionmaker(engine, expire_on_commit=False)
+        finally:
+            await engine.dispose()
+
+
+@asynccontextmanager
+async def redis_backend(name: str, redis_url: str | None = None):
+    """Подменяет клиент redis_service на fakeredis или локальный Redis"""
+    if name not in REDIS_BACKENDS:
+        raise ValueError(f"Неизвестный бекенд Redis: {name}")
+    if name == "fake":
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    else:
+        client = redis.Redis.from_url(
+            redis_url or "redis://localhost:6379/15", decode_responses=True
+        )
+        await client.ping()
+    previous = redis_service.redis_client
+    redis_service.redis_client = client
+    try:
+        yield client
+    finally:
+        await client.aclose()
+        redis_service.redis_client = previous
+
+
+@asynccontextmanager
+async def app_client(transport: str, session_factory, background: bool = False):
+    """Клиент приложения в процессе или через настоящий воркер uvicorn
+
+    Жизненный цикл приложения не запускается, чтобы оно не подключилось
+    к базе и Redis из настроек. При background=True запускаются фоновые
+    подписки кеша пользователей и реестра отзыва, как в startup_event.
+    Ограничение попыток входа отключается: все запросы бенчмарка идут
+    с одного адреса.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Неизвестный транспорт: {transport}")
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app = create_application()
+    app.dependency_overrides[get_db] = override_get_db
+    throttle_enabled = settings.LOGIN_THROTTLE_ENABLED
+    settings.LOGIN_THROTTLE_ENABLED = False
+    if background:
+        principal_cache.start_listener()
+        revocation_registry.start_sync()
+    try:
+        if transport == "inprocess":
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://bench"
+            ) as client:
+                yield client
+        else:
+            async with _uvicorn_server(app) as base_url:
+                async with AsyncClient(base_url=base_url, timeout=60) as client:
+                    yield client
+    finally:
+        if background:
+            await principal_cache.stop_listener()
+            await revocation_registry.stop_sync()
+        principal_cache.clear()
+        settings.LOGIN_THROTTLE_ENABLED = throttle_enabled
+
+
+@asynccontextmanager
+async def _uvicorn_server(app):
+    """Воркер uvicorn на свободном порту в текущем event loop"""
+    import uvicorn
+
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serving
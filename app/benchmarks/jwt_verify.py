@@ -0,0 +1,134 @@
+"""Пропускная способность проверки JWT: HS256, RS256 и EdDSA
+
+Для каждого алгоритма подписывается access токен и многократно
+проверяется в одном потоке. Варианты проверки:
+  локально  - TokenVerifier с разобранным ключом из кеша по kid
+              (для HS256 - jwt.decode с общим секретом)
+  без кеша  - JWKS загружается по HTTP с локального сервера на каждую
+              проверку, нижняя граница для проверки обращением к API
+Подпись замеряется отдельно.
+
+Запуск из каталога app:
+    python -m benchmarks.jwt_verify --iterations 5000
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from core.token_verifier import TokenVerifier
+
+SECRET = "benchmark-secret-key-of-sufficient-length"
+
+
+def payload() -> dict:
+    return {
+        "sub": "bench@example.com",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+        "jti": uuid.uuid4().hex,
+    }
+
+
+def rate(func, iterations: int) -> float:
+    """Операций в секунду"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def serve_jwks(jwks: dict) -> ThreadingHTTPServer:
+    """HTTP сервер с JWKS на свободном локальном порту"""
+    body = json.dumps(jwks).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def asymmetric(algorithm: str, key, converter, iterations: int) -> dict:
+    jwk = {
+        **converter.to_jwk(key.public_key(), as_dict=True),
+        "kid": "bench",
+        "alg": algorithm,
+    }
+    token = jwt.encode(payload(), key, algorithm=algorithm, headers={"kid": "bench"})
+    server = serve_jwks({"keys": [jwk]})
+    url = f"http://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+    verifier = TokenVerifier(source=url)
+    verifier.verify(token)
+
+    def fetch_each_time():
+        verifier.refresh()
+        verifier.verify(token)
+
+    try:
+        return {
+            "sign": rate(
+                lambda: jwt.encode(payload(), key, algorithm=algorithm),
+                iterations // 10,
+            ),
+            "local": rate(lambda: verifier.verify(token), iterations),
+            "remote": rate(fetch_each_time, iterations // 10),
+        }
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = jwt.encode(payload(), SECRET, algorithm="HS256")
+    results = {
+        "HS256": {
+            "sign": rate(
+                lambda: jwt.encode(payload(), SECRET, algorithm="HS256"),
+                args.iterations // 10,
+            ),
+            "local": rate(
+                lambda: jwt.decode(token, SECRET, algorithms=["HS256"]),
+                args.iterations,
+            ),
+            "remote": None,
+        },
+        "RS256": asymmetric(
+            "RS256",
+            rsa.generate_private_key(public_exponent=65537, key_size=2048),
+            RSAAlgorithm,
+            args.iterations,
+        ),
+        "EdDSA": asymmetric(
+            "EdDSA", ed25519.Ed25519PrivateKey.generate(), OKPAlgorithm, args.iterations
+        ),
+    }
+
+    print("операций в секунду на одно ядро")
+    print(f"{'':>8} {'подпись':>10} {'локально':>10} {'без кеша':>10}")
+    for algorithm, result in results.items():
+        remote = f"{result['remote']:10.0f}" if result["remote"] else f"{'-':>10}"
+        print(f"{algorithm:>8} {result['sign']:10.0f} {result['local']:10.0f} {remote}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Задержка GET /api/tasks под нагрузкой логинами
+
+Сравнивает хеширование bcrypt прямо в event loop (inline) и в пуле потоков.
+Приложение запускается в процессе через ASGITransport, база - SQLite,
+Redis заменен на fakeredis.
+
+Запуск из каталога app:
+    python -m benchmarks.login_load --logins 40 --readers 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import in_process_client, percentile, register_user
+from core.hashing import hashing_executor
+
+
+async def run_mode(kind: str, logins: int, readers: int, db_url: str) -> dict:
+    """Прогон одного режима хеширования"""
+    hashing_executor.kind = kind
+    credentials = {"email": "bench@example.com", "password": "benchpassword"}
+    latencies: list[float] = []
+
+    async with in_process_client(db_url) as client:
+        headers = await register_user(client, **credentials)
+        for i in range(20):
+            await client.post(
+                "/api/tasks",
+                json={"title": f"task {i}", "due_date": "2030-01-01T00:00:00Z"},
+                headers=headers,
+            )
+
+        done = asyncio.Event()
+
+        async def reader():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/tasks", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0)
+
+        async def login():
+            await client.post("/api/auth/login", json=credentials)
+
+        reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*reader_tasks)
+
+    hashing_executor.shutdown()
+    return {
+        "mode": kind,
+        "logins": logins,
+        "login_wall_seconds": elapsed,
+        "tasks_requests": len(latencies),
+        "tasks_p50_ms": percentile(latencies, 50) * 1000,
+        "tasks_p99_ms": percentile(latencies, 99) * 1000,
+        "tasks_max_ms": max(latencies, default=0.0) * 1000,
+        "tasks_mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        for kind in ("inline", "thread"):
+            result = await run_mode(kind, args.logins, args.readers, db_url)
+            print(
+                f"{result['mode']:>7}: GET /api/tasks p50={result['tasks_p50_ms']:.1f}ms "
+                f"p99={result['tasks_p99_ms']:.1f}ms max={result['tasks_max_ms']:.1f}ms "
+                f"({result['tasks_requests']} req), "
+                f"{result['logins']} logins in {result['login_wall_seconds']:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
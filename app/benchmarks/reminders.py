@@ -0,0 +1,118 @@
+"""Пропускная способность напоминаний о сроках задач
+
+Ставит в очередь N напоминаний с равномерными сроками, затем несколько
+экземпляров ReminderScheduler (воркеры) одновременно забирают все
+наступившие напоминания в QueueNotifier. Проверяется, что каждое
+напоминание отправлено ровно один раз, и замеряется время постановки
+и отмены отдельного напоминания при заполненной очереди.
+
+Запуск из каталога app:
+    python -m benchmarks.reminders --reminders 1000000 --workers 4
+    python -m benchmarks.reminders --redis local --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.backends import REDIS_BACKENDS, redis_backend
+from benchmarks.utils import percentile, stopwatch
+from core.reminders import QueueNotifier, ReminderScheduler
+
+FILL_BATCH_SIZE = 10_000
+REMINDER_KEYS = (
+    ReminderScheduler.QUEUE_KEY,
+    ReminderScheduler.CLAIMED_KEY,
+    ReminderScheduler.CLAIMED_DUE_KEY,
+)
+
+
+class Due:
+    """Задача с полями, которые нужны планировщику"""
+
+    def __init__(self, task_id: int, user_id: int, due_date: datetime) -> None:
+        self.id = task_id
+        self.user_id = user_id
+        self.due_date = due_date
+
+
+async def fill(client, reminders: int, start: float) -> None:
+    """Заполняет очередь напоминаниями со сроками через секунду"""
+    for offset in range(0, reminders, FILL_BATCH_SIZE):
+        members = {
+            f"{task_id}:{task_id % 1000}": start + task_id
+            for task_id in range(offset, min(offset + FILL_BATCH_SIZE, reminders))
+        }
+        await client.zadd(ReminderScheduler.QUEUE_KEY, members)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=200_000)
+    parser.add_argument("--due", type=float, default=0.1, help="доля наступивших")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--redis", choices=REDIS_BACKENDS, default="fake")
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    async with redis_backend(args.redis, args.redis_url) as client:
+        await client.delete(*REMINDER_KEYS)
+        start = time.time()
+        started = time.perf_counter()
+        await fill(client, args.reminders, start)
+        fill_seconds = time.perf_counter() - started
+
+        scheduler = ReminderScheduler(enabled=True, notifier=QueueNotifier())
+        schedule: list[float] = []
+        cancel: list[float] = []
+        base = datetime.fromtimestamp(start, timezone.utc)
+        for i in range(args.ops):
+            task = Due(args.reminders + i, 1, base + timedelta(days=1, seconds=i))
+            with stopwatch(schedule):
+                await scheduler.schedule([task])
+            with stopwatch(cancel):
+                await scheduler.cancel([(task.id, task.user_id)])
+
+        notifier = QueueNotifier()
+        workers = [
+            ReminderScheduler(enabled=True, notifier=notifier, batch_size=args.batch)
+            for _ in range(args.workers)
+        ]
+        now = start + args.reminders * args.due
+
+        async def drain(worker: ReminderScheduler) -> None:
+            while await worker.run_once(now):
+                pass
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drain(worker) for worker in workers))
+        drain_seconds = time.perf_counter() - started
+
+        fired = []
+        while not notifier.queue.empty():
+            fired.append(notifier.queue.get_nowait().task_id)
+        expected = sum(1 for task_id in range(args.reminders) if start + task_id <= now)
+        await client.delete(*REMINDER_KEYS)
+
+    print(f"{args.reminders} напоминаний в очереди, Redis {args.redis}")
+    print(f"  постановка в очередь: {args.reminders / fill_seconds:10.0f} в секунду")
+    print(
+        f"  schedule p50 {percentile(schedule, 50) * 1000:.3f}ms, "
+        f"p99 {percentile(schedule, 99) * 1000:.3f}ms"
+    )
+    print(
+        f"  cancel   p50 {percentile(cancel, 50) * 1000:.3f}ms, "
+        f"p99 {percentile(cancel, 99) * 1000:.3f}ms"
+    )
+    print(
+        f"  {args.workers} воркера, пачка {args.batch}: {len(fired)} отправлено "
+        f"({len(fired) / drain_seconds:.0f} в секунду), "
+        f"повторов {len(fired) - len(set(fired))}, ожидалось {expected}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,294 @@
+"""Синтетические данные для нагрузочного тестирования: пользователи, задачи, токены
+
+Пользователи и задачи пишутся прямо в базу, минуя API. Пароль хешируется
+bcrypt один раз, хеш общий для всех пользователей. Задачи вставляются
+многострочными INSERT пачками, в Postgres - через COPY. Сроки задач
+распределены как в живой базе: большая часть рядом с текущим моментом,
+длинный хвост в прошлом и короткий в будущем, время суток тяготеет
+к рабочим часам. Если таблица tasks секционирована, секции на весь
+диапазон сроков создаются заранее. По желанию в Redis добавляются
+refresh токены пользователей и записи об отозванных токенах.
+
+Запуск из каталога app, база и Redis из настроек или аргументов:
+    python -m benchmarks.seed --db-url sqlite+aiosqlite:///./seed.db \\
+        --create-schema --users 10000 --tasks-per-user 100
+    python -m benchmarks.seed --users 100000 --tasks-per-user 100 \\
+        --refresh-tokens 100000 --revoked 10000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import redis.asyncio as redis
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from core.config import settings
+from core.hashing import hash_password_sync
+from core.partitions import create_partitions, is_partitioned
+from core.redis import redis_service
+from core.revocation import revocation_registry
+from core.security import create_refresh_token
+from models import Base, Task, User
+
+TASK_COLUMNS = ("title", "description", "due_date", "user_id", "created_at")
+FUTURE_SHARE = 0.3  # доля задач со сроком в будущем
+FUTURE_MEAN_DAYS = 14
+LEAD_MEAN_DAYS = 7  # сколько в среднем задача создается до срока
+WORDS = """
+позвонить купить отчет встреча клиент договор счет оплатить проверить
+отправить подготовить презентация ремонт врач молоко хлеб билеты отпуск
+налоги документы код ревью релиз сервер база бэкап письмо бюджет план
+квартал собеседование кандидат задача проект дизайн макет тесты исправить
+ошибка обновить зависимости машина страховка подарок день рождения спортзал
+книга курс английский родители квартира аренда интернет телефон банк карта
+заказ доставка склад
+""".split()
+
+
+def emails(prefix: str, users: int) -> list[str]:
+    """Адреса пользователей"""
+    return [f"{prefix}{index}@example.com" for index in range(users)]
+
+
+def due_date(rng: random.Random, now: datetime, history_days: int) -> datetime:
+    """Срок задачи: экспоненциальные хвосты в прошлое и будущее от now"""
+    if rng.random() < FUTURE_SHARE:
+        days = min(rng.expovariate(1 / FUTURE_MEAN_DAYS), FUTURE_MEAN_DAYS * 6)
+    else:
+        days = -min(rng.expovariate(5 / history_days), history_days)
+    moment = now + timedelta(days=days)
+    if rng.random() < 0.8:
+        hour = rng.randint(9, 18)
+    else:
+        hour = rng.randint(0, 23)
+    return moment.replace(hour=hour, minute=rng.choice((0, 15, 30, 45)), second=0)
+
+
+def task_row(rng: random.Random, user_id: int, now: datetime, history_days: int):
+    """Задача кортежем в порядке TASK_COLUMNS"""
+    due = due_date(rng, now, history_days).replace(microsecond=0)
+    created_at = min(due - timedelta(days=rng.expovariate(1 / LEAD_MEAN_DAYS)), now)
+    title = " ".join(rng.sample(WORDS, rng.randint(2, 5))).capitalize()
+    description = None
+    if rng.random() < 0.6:
+        description = " ".join(rng.choices(WORDS, k=rng.randint(5, 20)))
+    return title, description, due, user_id, created_at
+
+
+def task_batches(
+    rng: random.Random,
+    user_ids: list[int],
+    tasks_per_user: int,
+    now: datetime,
+    history_days: int,
+    batch_size: int,
+) -> Iterator[list[tuple]]:
+    """Задачи всех пользователей пачками по batch_size"""
+    batch = []
+    for user_id in user_ids:
+        for _ in range(tasks_per_user):
+            batch.append(task_row(rng, user_id, now, history_days))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def seed_users(
+    engine: AsyncEngine,
+    addresses: list[str],
+    password_hash: str,
+    now: datetime,
+    batch_size: int,
+) -> list[int]:
+    """Создает пользователей многострочными INSERT и возвращает их id"""
+    user_ids = []
+    for offset in range(0, len(addresses), batch_size):
+        rows = [
+            {"email": email, "password_hash": password_hash, "created_at": now}
+            for email in addresses[offset : offset + batch_size]
+        ]
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True), rows
+            )
+            user_ids.extend(result.scalars())
+    return user_ids
+
+
+async def seed_tasks(engine: AsyncEngine, batches: Iterator[list[tuple]]) -> int:
+    """Вставляет задачи: COPY в Postgres, многострочные INSERT в остальных"""
+    count = 0
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            for batch in batches:
+                await raw.driver_connection.copy_records_to_table(
+                    "tasks", records=batch, columns=TASK_COLUMNS
+                )
+                count += len(batch)
+        return count
+
+    for batch in batches:
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(Task), [dict(zip(TASK_COLUMNS, row)) for row in batch]
+            )
+        count += len(batch)
+    return count
+
+
+async def seed_database(
+    engine: AsyncEngine,
+    users: int,
+    tasks_per_user: int,
+    password: str = "password123",
+    email_prefix: str = "seed",
+    history_days: int = 730,
+    batch_size: int = 10_000,
+    seed: int = 0,
+) -> tuple[list[str], int]:
+    """Заполняет базу пользователями и задачами, возвращает адреса и число задач"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    addresses = emails(email_prefix, users)
+    user_ids = await seed_users(
+        engine, addresses, hash_password_sync(password), now, batch_size
+    )
+
+    async with engine.connect() as conn:
+        partitioned = await conn.run_sync(is_partitioned)
+    if partitioned:
+        await create_partitions(
+            engine,
+            now - timedelta(days=history_days),
+            now + timedelta(days=FUTURE_MEAN_DAYS * 6),
+        )
+
+    batches = task_batches(rng, user_ids, tasks_per_user, now, history_days, batch_size)
+    count = await seed_tasks(engine, batches)
+    if engine.dialect.name == "postgresql":
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE users, tasks"))
+    return addresses, count
+
+
+async def seed_redis(
+    client,
+    addresses: list[str],
+    refresh_tokens: int,
+    revoked: int,
+    batch_size: int,
+    seed: int = 0,
+) -> None:
+    """Refresh токены первых пользователей и записи об отозванных токенах
+
+    jti и сроки отозванных токенов берутся из генератора с seed, сами
+    refresh токены содержат время выпуска и от запуска к запуску разные.
+    """
+    rng = random.Random(seed)
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    for offset in range(0, min(refresh_tokens, len(addresses)), batch_size):
+        pipe = client.pipeline(transaction=False)
+        for email in addresses[offset : min(offset + batch_size, refresh_tokens)]:
+            token = await create_refresh_token({"sub": email})
+            pipe.setex(f"refresh_token:{email}", ttl, token)
+        await pipe.execute()
+
+    now = time.time()
+    for offset in range(0, revoked, batch_size):
+        pipe = client.pipeline(transaction=False)
+        for _ in range(min(batch_size, revoked - offset)):
+            jti = uuid.UUID(int=rng.getrandbits(128), version=4).hex
+            remaining = rng.randint(60, ttl)
+            pipe.setex(revocation_registry.key(jti), remaining, "1")
+            pipe.xadd(
+                revocation_registry.STREAM,
+                {"jti": jti, "exp": int(now + remaining)},
+                minid=revocation_registry.stream_min_id(),
+                approximate=True,
+            )
+        await pipe.execute()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--create-schema", action="store_true")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--email-prefix", default="seed")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--refresh-tokens", type=int, default=0)
+    parser.add_argument("--revoked", type=int, default=0)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.db_url or settings.pg_connection_string)
+    try:
+        if args.create_schema:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        started = time.perf_counter()
+        addresses, count = await seed_database(
+            engine,
+            args.users,
+            args.tasks_per_user,
+            password=args.password,
+            email_prefix=args.email_prefix,
+            history_days=args.history_days,
+            batch_size=args.batch,
+            seed=args.seed,
+        )
+        seconds = time.perf_counter() - started
+        print(
+            f"{args.users} пользователей и {count} задач за {seconds:.1f}с "
+            f"({count / seconds:.0f} задач в секунду), пароль {args.password}"
+        )
+    finally:
+        await engine.dispose()
+
+    if not args.refresh_tokens and not args.revoked:
+        return
+    if args.revoked > settings.REVOCATION_FILTER_CAPACITY:
+        print(
+            "Отозванных токенов больше REVOCATION_FILTER_CAPACITY, "
+            "фильтр Блума воркеров будет постоянно перестраиваться"
+        )
+    client: Optional[redis.Redis]
+    if args.redis_url:
+        client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        redis_service.connect()
+        client = redis_service.redis_client
+    started = time.perf_counter()
+    try:
+        await seed_redis(
+            client,
+            addresses,
+            args.refresh_tokens,
+            args.revoked,
+            args.batch,
+            seed=args.seed,
+        )
+    finally:
+        await client.aclose()
+    print(
+        f"Redis: {min(args.refresh_tokens, len(addresses))} refresh токенов, "
+        f"{args.revoked} отозванных за {time.perf_counter() - started:.1f}с"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Создание задач: POST /api/tasks по одной против POST /api/tasks/bulk
+
+Запуск из каталога app:
+    python -m benchmarks.tasks_bulk_insert --tasks 10000 --batch 1000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.utils import in_process_client, register_user
+
+
+def make_tasks(count: int) -> list[dict]:
+    return [
+        {
+            "title": f"task {i}",
+            "description": "imported",
+            "due_date": f"2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}T09:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+async def per_row(db_url: str, tasks: list[dict], concurrency: int) -> float:
+    """Создание задач отдельными запросами"""
+    async with in_process_client(db_url) as client:
+        headers = await register_user(client, "rows@example.com", "benchpassword")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create(task: dict):
+            async with semaphore:
+                response = await client.post("/api/tasks", json=task, headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(create(task) for task in tasks))
+        return time.perf_counter() - started
+
+
+async def bulk(db_url: str, tasks: list[dict], batch: int) -> float:
+    """Создание задач пакетами"""
+    async with in_process_client(db_url) as client:
+        headers = await register_user(client, "bulk@example.com", "benchpassword")
+        started = time.perf_counter()
+        for offset in range(0, len(tasks), batch):
+            response = await client.post(
+                "/api/tasks/bulk", json=tasks[offset : offset + batch], headers=headers
+            )
+            response.raise_for_status()
+        return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        rows_seconds = await per_row(db_url, tasks, args.concurrency)
+        bulk_seconds = await bulk(db_url, tasks, args.batch)
+
+    print(f"{args.tasks} задач")
+    for label, seconds in (
+        ("по одной:     ", rows_seconds),
+        (f"пакетами {args.batch}:", bulk_seconds),
+    ):
+        print(f"  {label} {seconds:7.2f}s ({args.tasks / seconds:8.0f} задач/с)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Память и скорость выгрузки задач: потоковый экспорт против списка
+
+Потоковый путь - TaskService.export_tasks (серверный курсор, кортежи).
+Для сравнения все задачи загружаются ORM объектами и валидируются в
+TaskResponseSchema, как это делал список задач. Пик памяти Python
+измеряется через tracemalloc.
+
+Запуск из каталога app:
+    python -m benchmarks.tasks_export --sizes 1000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.utils import seed_tasks
+from models import Base, Task
+from schemas.task import TaskResponseSchema
+from services.task_service import TaskService
+
+
+async def measure(coro_factory) -> tuple[float, float]:
+    """Время и пик памяти (МБ) выполнения корутины"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+async def run_size(db_url: str, size: int, load_list: bool) -> dict:
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = await seed_tasks(session_factory, size)
+
+    async def stream():
+        async with session_factory() as session:
+            written = 0
+            async for chunk in TaskService(session).export_tasks(user_id, "ndjson"):
+                written += len(chunk)
+
+    async def full_list():
+        async with session_factory() as session:
+            result = await session.scalars(select(Task).where(Task.user_id == user_id))
+            [TaskResponseSchema.model_validate(task) for task in result.all()]
+
+    result = {"tasks": size}
+    result["stream_seconds"], result["stream_peak_mb"] = await measure(stream)
+    if load_list:
+        result["list_seconds"], result["list_peak_mb"] = await measure(full_list)
+    await engine.dispose()
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument(
+        "--skip-list", action="store_true", help="не замерять загрузку списком"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        for size in args.sizes:
+            result = await run_size(db_url, size, not args.skip_list)
+            line = (
+                f"{size:>9} задач: поток {result['stream_seconds']:6.2f}s "
+                f"пик {result['stream_peak_mb']:7.1f}MB"
+            )
+            if "list_seconds" in result:
+                line += (
+                    f" | список {result['list_seconds']:6.2f}s "
+                    f"пик {result['list_peak_mb']:7.1f}MB"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
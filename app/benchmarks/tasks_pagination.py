@@ -0,0 +1,87 @@
+"""Задержка получения N-й страницы задач: keyset против OFFSET
+
+Заполняет базу задачами одного пользователя и измеряет время получения
+страниц на разной глубине через курсор (TaskRepository.get_by_user_id)
+и через классический OFFSET/LIMIT.
+
+Запуск из каталога app:
+    python -m benchmarks.tasks_pagination --tasks 1000000
+    python -m benchmarks.tasks_pagination --db-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.utils import percentile, seed_tasks, stopwatch
+from models import Base, Task
+from repositories.task_repository import TaskRepository
+
+
+async def measure(session_factory, user_id: int, depth: int, limit: int, runs: int):
+    """Замеры страницы на глубине depth обоими способами"""
+    async with session_factory() as session:
+        repository = TaskRepository(session)
+        anchor = (
+            await session.execute(
+                select(Task.due_date, Task.id)
+                .where(Task.user_id == user_id)
+                .order_by(Task.due_date, Task.id)
+                .offset(max(depth - 1, 0))
+                .limit(1)
+            )
+        ).first()
+        after = tuple(anchor) if depth and anchor else None
+
+        keyset: list[float] = []
+        offset: list[float] = []
+        for _ in range(runs):
+            with stopwatch(keyset):
+                await repository.get_by_user_id(user_id, limit=limit, after=after)
+            with stopwatch(offset):
+                await session.execute(
+                    select(Task)
+                    .where(Task.user_id == user_id)
+                    .order_by(Task.due_date, Task.id)
+                    .offset(depth)
+                    .limit(limit)
+                )
+        return percentile(keyset, 50), percentile(offset, 50)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_async_engine(db_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        user_id = await seed_tasks(session_factory, args.tasks)
+        print(f"{args.tasks} задач, страница {args.limit}, медиана из {args.runs}")
+        for fraction in (0, 0.01, 0.1, 0.5, 0.99):
+            depth = int(args.tasks * fraction)
+            keyset, offset = await measure(
+                session_factory, user_id, depth, args.limit, args.runs
+            )
+            print(
+                f"  глубина {depth:>9}: keyset {keyset * 1000:8.2f}ms, "
+                f"offset {offset * 1000:8.2f}ms"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
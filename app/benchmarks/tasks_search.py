@@ -0,0 +1,147 @@
+"""Задержка полнотекстового поиска задач: слово, префикс и опечатка
+
+Заполняет базу задачами нескольких пользователей со случайными словами
+из общего словаря и измеряет время первой страницы поиска одного
+пользователя через TaskRepository.search_rows. На SQLite поиск идет по
+FTS5, на Postgres - по tsvector и триграммам (поиск с опечаткой есть
+только на Postgres). Для сравнения замеряется LIKE по заголовку
+и описанию - то, что пришлось бы делать без индекса.
+
+Запуск из каталога app:
+    python -m benchmarks.tasks_search --tasks 200000
+    python -m benchmarks.tasks_search --tasks 10000000 \\
+        --db-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.utils import SEED_BATCH_SIZE, percentile, stopwatch
+from models import Base, Task, User
+from repositories.task_repository import TaskRepository
+
+ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщэюя"
+
+
+def vocabulary(size: int, rng: random.Random) -> list[str]:
+    """Словарь из size случайных слов длиной 4-10 букв"""
+    return [
+        "".join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 10)))
+        for _ in range(size)
+    ]
+
+
+async def seed(session_factory, tasks: int, users: int, words: list[str], rng):
+    """Создает users пользователей и tasks задач, возвращает id первого"""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    async with session_factory() as session:
+        owners = [
+            User(email=f"search{index}@example.com", password_hash="x")
+            for index in range(users)
+        ]
+        session.add_all(owners)
+        await session.commit()
+        user_ids = [owner.id for owner in owners]
+        for offset in range(0, tasks, SEED_BATCH_SIZE):
+            rows = [
+                {
+                    "title": " ".join(rng.choices(words, k=rng.randint(2, 6))),
+                    "description": " ".join(rng.choices(words, k=rng.randint(5, 30))),
+                    "due_date": start + timedelta(minutes=number),
+                    "user_id": user_ids[number % users],
+                }
+                for number in range(offset, min(offset + SEED_BATCH_SIZE, tasks))
+            ]
+            await session.execute(insert(Task), rows)
+            await session.commit()
+    return user_ids[0]
+
+
+def typo(word: str) -> str:
+    """Слово с переставленными соседними буквами"""
+    return word[:1] + word[2] + word[1] + word[3:]
+
+
+async def measure(session_factory, user_id: int, queries: dict, limit: int, runs):
+    """Медианы поиска и LIKE по каждому виду запроса"""
+    results = {}
+    async with session_factory() as session:
+        repository = TaskRepository(session)
+        for kind, terms in queries.items():
+            search: list[float] = []
+            like: list[float] = []
+            found = 0
+            for _ in range(runs):
+                with stopwatch(search):
+                    found = len(await repository.search_rows(user_id, terms, limit))
+                pattern = f"%{' '.join(terms)}%"
+                with stopwatch(like):
+                    await session.execute(
+                        select(Task)
+                        .where(
+                            Task.user_id == user_id,
+                            or_(
+                                Task.title.like(pattern),
+                                Task.description.like(pattern),
+                            ),
+                        )
+                        .limit(limit)
+                    )
+            results[kind] = (percentile(search, 50), percentile(like, 50), found)
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.words, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_async_engine(db_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        user_id = await seed(session_factory, args.tasks, args.users, words, rng)
+        word = rng.choice(words)
+        queries = {
+            "слово": [word],
+            "два слова": [word, rng.choice(words)],
+            "префикс": [word[:3]],
+        }
+        if engine.dialect.name == "postgresql":
+            queries["опечатка"] = [typo(word)]
+        results = await measure(
+            session_factory, user_id, queries, args.limit, args.runs
+        )
+        print(
+            f"{args.tasks} задач, {args.users} пользователей, "
+            f"страница {args.limit}, медиана из {args.runs}"
+        )
+        for kind, (search, like, found) in results.items():
+            print(
+                f"  {kind:>10}: поиск {search * 1000:8.2f}ms, "
+                f"LIKE {like * 1000:8.2f}ms, найдено {found}"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Сериализация страницы задач: ORM и двойная валидация против колонок и TypeAdapter
+
+Старый путь: ORM объекты, TaskResponseSchema.model_validate на каждую
+задачу, затем то, что делает FastAPI с response_model - повторная
+валидация словаря, преобразование в JSON-совместимые значения и json.dumps.
+Новый путь: выборка колонок и task_page_adapter.dump_json без валидации.
+Время указано для запроса к базе вместе с сериализацией и отдельно
+для сериализации.
+
+Запуск из каталога app:
+    python -m benchmarks.tasks_serialization
+    python -m benchmarks.tasks_serialization --db-url postgresql+asyncpg://...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.utils import percentile, seed_tasks, stopwatch
+from models import Base
+from repositories.task_repository import TaskRepository
+from schemas.task import TaskPageSchema, TaskResponseSchema, task_page_adapter
+
+response_adapter = TypeAdapter(TaskPageSchema)
+
+
+def serialize_validated(tasks) -> bytes:
+    """Путь через model_validate и response_model FastAPI"""
+    page = TaskPageSchema(
+        items=[TaskResponseSchema.model_validate(task) for task in tasks],
+        next_cursor=None,
+    )
+    content = page.model_dump(by_alias=True)
+    value = response_adapter.validate_python(content)
+    payload = response_adapter.dump_python(value, mode="json")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serialize_rows(rows) -> bytes:
+    """Путь из кортежей колонок"""
+    return task_page_adapter.dump_json(
+        {"items": [row._asdict() for row in rows], "next_cursor": None}
+    )
+
+
+async def measure(session_factory, user_id: int, size: int, runs: int) -> dict:
+    """Медианы обоих путей для страницы из size задач"""
+    names = ("orm_total", "orm_serialize", "rows_total", "rows_serialize")
+    samples = {name: [] for name in names}
+    async with session_factory() as session:
+        repository = TaskRepository(session)
+        for _ in range(runs):
+            with stopwatch(samples["orm_total"]):
+                tasks = await repository.get_by_user_id(user_id, limit=size)
+                with stopwatch(samples["orm_serialize"]):
+                    serialize_validated(tasks)
+            session.expunge_all()
+
+            with stopwatch(samples["rows_total"]):
+                rows = await repository.get_rows_by_user_id(user_id, limit=size)
+                with stopwatch(samples["rows_serialize"]):
+                    serialize_rows(rows)
+    return {name: percentile(values, 50) for name, values in samples.items()}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_async_engine(db_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        user_id = await seed_tasks(session_factory, max(sizes))
+        print(f"медиана из {args.runs}, всего / только сериализация")
+        for size in sizes:
+            result = await measure(session_factory, user_id, size, args.runs)
+            print(
+                f"  {size:>6} задач: "
+                f"orm {result['orm_total'] * 1000:8.2f} / "
+                f"{result['orm_serialize'] * 1000:7.2f}ms, "
+                f"колонки {result['rows_total'] * 1000:8.2f} / "
+                f"{result['rows_serialize'] * 1000:7.2f}ms, "
+                f"ускорение сериализации "
+                f"x{result['orm_serialize'] / result['rows_serialize']:.1f}"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
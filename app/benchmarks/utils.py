@@ -0,0 +1,72 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from benchmarks.backends import app_client, database_backend, redis_backend
+from core.security import create_access_token
+from models import Task, User
+
+SEED_BATCH_SIZE = 10_000
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Перцентиль по выборке (ближайший ранг)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@contextmanager
+def stopwatch(samples: list[float]):
+    """Добавляет длительность блока в список замеров"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def in_process_client(db_url: str):
+    """Приложение в процессе на чистой базе db_url и fakeredis"""
+    database = "sqlite" if db_url.startswith("sqlite") else "postgres"
+    async with database_backend(database, db_url) as session_factory:
+        async with redis_backend("fake"):
+            async with app_client("inprocess", session_factory) as client:
+                yield client
+
+
+async def register_user(client: AsyncClient, email: str, password: str) -> dict:
+    """Регистрирует пользователя и возвращает заголовки авторизации"""
+    await client.post("/api/auth/register", json={"email": email, "password": password})
+    token = await create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def seed_tasks(
+    session_factory, tasks: int, email: str = "seed@example.com"
+) -> int:
+    """Создает пользователя и tasks задач с равномерными сроками"""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    async with session_factory() as session:
+        user = User(email=email, password_hash="x")
+        session.add(user)
+        await session.commit()
+        for offset in range(0, tasks, SEED_BATCH_SIZE):
+            rows = [
+                {
+                    "title": f"task {i}",
+                    "due_date": start + timedelta(minutes=i * 7 % 5_000_000),
+                    "user_id": user.id,
+                    "created_at": start,
+                }
+                for i in range(offset, min(offset + SEED_BATCH_SIZE, tasks))
+            ]
+            await session.execute(insert(Task), rows)
+        await session.commit()
+        return user.id
@@ -9,17 +9,82 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
     REDIS_URL: Optional[str] = None
 
+    # Запуск: dev создает таблицы и проверяет Redis, production только
+    # сверяет ревизию миграций и подключает Redis лениво
+    BOOT_MODE: str = "dev"  # dev | production
+
     # JWT настройки
     JWT_SECRET_KEY: str = "secret-key"
-    JWT_ALGORITHM: str = "HS256"
+    # HS256 - общий секрет, RS256 или EdDSA - ключи из JWT_KEYS_DIR,
+    # алгоритм подписи определяется типом активного ключа
+    JWT_ALGORITHM: str = "HS256"  # HS256 | RS256 | EdDSA
+    JWT_KEYS_DIR: Optional[str] = None  # <kid>.pem для RS256 и EdDSA
+    JWT_ACTIVE_KID: Optional[str] = None  # по умолчанию последний по имени
+    JWT_KEYS_REFRESH_SECONDS: float = 30.0
+    JWT_ACCEPT_HS256: bool = False  # принимать HS256 токены на время перехода
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Хеширование паролей
+    HASHING_EXECUTOR: str = "thread"  # thread | process | inline
+    HASHING_MAX_WORKERS: int = 4
+    HASHING_MAX_QUEUE: int = 64
+
+    # Ограничение попыток входа: burst сразу, затем per_minute в минуту
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_EMAIL_BURST: int = 10
+    LOGIN_THROTTLE_EMAIL_PER_MINUTE: float = 5.0
+    LOGIN_THROTTLE_IP_BURST: int = 50
+    LOGIN_THROTTLE_IP_PER_MINUTE: float = 60.0
+    # сети прокси через запятую, за ними IP клиента берется из X-Forwarded-For
+    LOGIN_THROTTLE_TRUSTED_PROXIES: Optional[str] = None
+
+    # Кеш аутентифицированных пользователей
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: int = 60
+
+    # Отзыв токенов
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+
+    # Задачи
+    TASKS_BULK_MAX_SIZE: int = 1000
+    TASKS_CACHE_ENABLED: bool = True
+    TASKS_CACHE_TTL_SECONDS: int = 300
+    TASKS_CACHE_LOCAL_MAX_SIZE: int = 1000
+
+    # Помесячные секции tasks в Postgres (python -m core.partitions)
+    TASKS_PARTITION_MONTHS_AHEAD: int = 3
+    TASKS_PARTITION_RETENTION_MONTHS: int = 24
+    TASKS_PARTITION_ARCHIVE_MODE: str = "archive"  # detach | archive | drop
+
+    # Напоминания о сроках задач
+    REMINDERS_ENABLED: bool = True
+    REMINDERS_NOTIFIER: str = "log"  # log | webhook | queue
+    REMINDERS_WEBHOOK_URL: Optional[str] = None
+    REMINDERS_BATCH_SIZE: int = 100
+    REMINDERS_POLL_SECONDS: float = 1.0
+    REMINDERS_LEASE_SECONDS: float = 60.0  # после этого невыполненные повторяются
+
+    # Метрики
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None  # без него /metrics и /pool-stats закрыты
+    SQL_TIMING_ENABLED: bool = True
+    SQL_TIMING_SHOW_STATEMENTS: bool = False  # текст запроса в Server-Timing
+    SQL_SLOW_QUERY_MS: int = 200
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+
     # Redis настройки
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 10.0  # больше блокирующего XREAD (5 с)
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
 
     # Database
     POSTGRES_HOST: str = "db_postgres"
@@ -28,6 +93,30 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "myapp"
     POSTGRES_PORT: int = 5432
 
+    # Пул соединений с базой данных
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_LIVENESS: str = "idle"  # pre_ping | idle | none
+    DB_POOL_IDLE_PING_SECONDS: int = 30
+
+    # Реплики для чтения
+    DATABASE_REPLICA_URLS: Optional[str] = None  # через запятую
+    DB_REPLICA_SELECTION: str = "round_robin"  # round_robin | least_connections
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # 0 - отключено
+
+    @property
+    def replica_connection_strings(self) -> list[str]:
+        if not self.DATABASE_REPLICA_URLS:
+            return []
+        return [
+            url.strip().replace("postgresql://", "postgresql+asyncpg://", 1)
+            for url in self.DATABASE_REPLICA_URLS.split(",")
+            if url.strip()
+        ]
+
     @property
     def pg_connection_string(self):
         if self.DATABASE_URL:
@@ -0,0 +1,48 @@
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.config import settings
+from core.metrics import metrics_registry
+from core.observability import (
+    InstrumentedQueuePool,
+    components_collector,
+    pool_collector,
+)
+from core.pool import engine_pool_options, install_idle_ping
+from core.query_stats import install_query_hooks
+from core.replicas import ReplicaRouter
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Движок с пулом, проверкой соединений и замером запросов из настроек"""
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        **engine_pool_options(),
+    )
+    if settings.DB_POOL_LIVENESS == "idle":
+        install_idle_ping(engine, settings.DB_POOL_IDLE_PING_SECONDS)
+    install_query_hooks(engine)
+    return engine
+
+
+async_engine = create_engine(settings.pg_connection_string)
+metrics_registry.add_collector(pool_collector(async_engine))
+metrics_registry.add_collector(components_collector)
+async_session = async_sessionmaker(
+    async_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    autoflush=False,
+)
+replica_router = ReplicaRouter(
+    primary=async_engine,
+    replicas=[create_engine(url) for url in settings.replica_connection_strings],
+    selection=settings.DB_REPLICA_SELECTION,
+    health_check_interval=settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
+    read_your_writes=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
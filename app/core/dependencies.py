@@ -3,26 +3,20 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from core.database import async_session, replica_router
+from core.hashing import hashing_executor
+from core.principal_cache import principal_cache
 from core.redis import redis_service
+from core.reminders import reminder_scheduler
+from core.revocation import revocation_registry
 from core.security import verify_token
 from services.auth_service import AuthService
 from services.task_service import TaskService
 from services.user_service import UserService
 
-async_engine = create_async_engine(
-    settings.pg_connection_string,
-    pool_pre_ping=True,
-)
-async_session = async_sessionmaker(
-    async_engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-    autoflush=False,
-)
-
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Создает и возвращает асинхронную сессию базы данных"""
@@ -33,59 +27,106 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         await db.close()
 
 
+async def get_read_db(
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для чтения: реплика, если они настроены, иначе основная сессия"""
+    if not replica_router.enabled:
+        yield db
+        return
+    read_db = replica_router.read_session()
+    try:
+        yield read_db
+    finally:
+        await read_db.close()
+
+
 security = HTTPBearer()
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
 ):
     """Получение текущего пользователя"""
     token = credentials.credentials
-    auth_service = AuthService(db_session=db)
-    if await auth_service.is_token_blacklisted(token):
-        raise HTTPException(status_code=401, detail="Токен отозван")
+    cached = await principal_cache.get(token)
+    if cached is not None:
+        await replica_router.route_user(cached[1].id)
+        return cached[1]
 
     payload = await verify_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Не валиданый токен")
 
+    auth_service = AuthService(db_session=db)
+    if await auth_service.is_token_revoked(token, payload):
+        raise HTTPException(status_code=401, detail="Токен отозван")
+
     email = payload.get("sub")
     if not email:
         raise HTTPException(status_code=401, detail="Неверная структура токена")
 
     try:
-        user_service = UserService(db_session=db)
-        return await user_service.get_current_user(email)
+        user_service = UserService(db_session=db, read_session=read_db)
+        user = await user_service.get_current_user(email)
     except ValueError as e:
         raise HTTPException(status_code=401, detail=str(e))
+    await replica_router.route_user(user.id)
+
+    await principal_cache.set(
+        token, payload, user, revocation_key=auth_service.revocation_key(token, payload)
+    )
+    return user
 
 
 async def get_auth_service(
     db: Annotated[AsyncSession, Depends(get_db)],
+    read_db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> AuthService:
     """Создает и возращает сервис для работы с ауетификацией"""
-    return AuthService(db_session=db)
+    return AuthService(db_session=db, read_session=read_db)
 
 
-async def get_user_service(db: Annotated[AsyncSession, Depends(get_db)]) -> UserService:
+async def get_user_service(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    read_db: Annotated[AsyncSession, Depends(get_read_db)],
+) -> UserService:
     """Создает и возращает сервис для работы с пользователем"""
 
-    return UserService(db_session=db)
+    return UserService(db_session=db, read_session=read_db)
 
 
 async def get_task_service(
     db: Annotated[AsyncSession, Depends(get_db)],
+    read_db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> TaskService:
     """Создает и возвращает сервис для работы с задачами"""
-    return TaskService(db_session=db)
+    return TaskService(db_session=db, read_session=read_db)
 
 
 async def startup_event() -> None:
-    """Инициализация подключения к Redis при запуске приложения"""
-    await redis_service.init_redis()
+    """Инициализация подключения к Redis при запуске приложения
+
+    В production режиме запуск не ждет Redis: клиент подключается
+    при первой команде.
+    """
+    if settings.BOOT_MODE == "production":
+        redis_service.connect()
+    else:
+        await redis_service.init_redis()
+    principal_cache.start_listener()
+    revocation_registry.start_sync()
+    replica_router.start_health_checks()
+    reminder_scheduler.start()
 
 
 async def shutdown_event() -> None:
-    """Закрытие подключения к Redis при завершении работы приложения"""
+    """Закрытие подключения к Redis и пула хеширования при завершении работы"""
+    await principal_cache.stop_listener()
+    await revocation_registry.stop_sync()
+    await replica_router.stop_health_checks()
+    await reminder_scheduler.stop()
     await redis_service.close()
+    hashing_executor.shutdown()
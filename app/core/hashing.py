@@ -0,0 +1,123 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from core.config import settings
+from core.metrics import TimingStat
+
+
+@functools.cache
+def get_pwd_context():
+    """Контекст passlib, импортируется при первом использовании"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password_sync(password: str) -> str:
+    """Синхронно создает bcrypt хеш пароля"""
+    return get_pwd_context().hash(password)
+
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """Синхронно проверяет пароль по bcrypt хешу"""
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def _timed_call(func: Callable, *args: Any) -> tuple[Any, float, float]:
+    """Выполняет функцию в воркере и возвращает результат с отметками времени"""
+    started = time.monotonic()
+    result = func(*args)
+    return result, started, time.monotonic()
+
+
+class HashingQueueFullError(Exception):
+    """Очередь на хеширование паролей переполнена"""
+
+
+class HashingExecutor:
+    """Ограниченный пул для выполнения bcrypt вне event loop
+
+    kind: "thread" или "process" - тип пула, "inline" - выполнение прямо
+    в event loop (используется только для сравнения в бенчмарках).
+    Одновременно выполняется не более max_workers операций, еще max_queue
+    могут ждать своей очереди, остальные сразу отклоняются.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_wait = TimingStat()
+        self.hash_time = TimingStat()
+        self.rejected = 0
+        self._pending = 0
+        self._executor: Executor | None = None
+
+    @property
+    def pending(self) -> int:
+        """Количество операций в работе и в очереди"""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        """Ленивое создание пула"""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Выполняет функцию хеширования в пуле с учетом лимитов"""
+        if self.kind == "inline":
+            result, started, finished = _timed_call(func, *args)
+            self.hash_time.observe(finished - started)
+            return result
+
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingQueueFullError("Превышен лимит очереди на хеширование")
+
+        self._pending += 1
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        self.queue_wait.observe(max(0.0, started - submitted))
+        self.hash_time.observe(finished - started)
+        return result
+
+    def metrics(self) -> dict:
+        """Метрики пула: ожидание в очереди и время хеширования"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Останавливает пул"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_executor = HashingExecutor(
+    kind=settings.HASHING_EXECUTOR,
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_queue=settings.HASHING_MAX_QUEUE,
+)
@@ -0,0 +1,156 @@
+import hashlib
+import ipaddress
+import logging
+import math
+import time
+from typing import Optional
+
+from core.config import settings
+from core.metrics import metrics_registry
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOGIN_THROTTLED = metrics_registry.counter(
+    "login_throttled_total", "Отклоненные попытки входа", ("scope",)
+)
+
+# KEYS: бакеты email и IP адреса
+# ARGV: текущее время в мс, затем для каждого бакета емкость и пополнение
+#       в токенах за мс
+# Возвращает {0, 0}, если попытка разрешена, иначе {мс до появления токена,
+# номер переполненного бакета}. Токены списываются только при разрешении.
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local retry, scope = 0, 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        local wait = math.ceil((1 - tokens) / rate)
+        if wait > retry then
+            retry, scope = wait, i
+        end
+    end
+    levels[i] = tokens
+end
+if retry > 0 then
+    return {retry, scope}
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(levels[i] - 1), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate))
+end
+return {0, 0}
+"""
+
+
+class LoginThrottle:
+    """Ограничение частоты попыток входа по email и IP адресу
+
+    Token bucket на каждый email и каждый IP: burst попыток сразу, затем
+    per_minute в минуту. Оба бакета проверяются и списываются одним Lua
+    скриптом за один round trip, до поиска пользователя и bcrypt.
+    Без Redis попытки не ограничиваются.
+    """
+
+    KEY_PREFIX = "login_throttle:"
+
+    def __init__(
+        self,
+        email_burst: int,
+        email_per_minute: float,
+        ip_burst: int,
+        ip_per_minute: float,
+        trusted_proxies: Optional[str] = None,
+    ) -> None:
+        self.limits = {
+            "email": (email_burst, email_per_minute / 60000),
+            "ip": (ip_burst, ip_per_minute / 60000),
+        }
+        self.trusted_proxies = [
+            ipaddress.ip_network(network.strip())
+            for network in (trusted_proxies or "").split(",")
+            if network.strip()
+        ]
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def client_ip(
+        self, peer: Optional[str], forwarded_for: Optional[str]
+    ) -> Optional[str]:
+        """IP адрес клиента для бакета
+
+        X-Forwarded-For учитывается, только если соединение пришло от
+        доверенного прокси. Адреса заголовка просматриваются справа налево,
+        клиентом считается первый недоверенный: левые записи клиент может
+        подставить сам.
+        """
+        if not peer or not forwarded_for or not self._is_trusted(peer):
+            return peer
+        client = peer
+        for address in reversed(forwarded_for.split(",")):
+            address = address.strip()
+            try:
+                ipaddress.ip_address(address)
+            except ValueError:
+                break
+            client = address
+            if not self._is_trusted(address):
+                break
+        return client
+
+    def key(self, scope: str, value: str) -> str:
+        """Ключ бакета в Redis"""
+        digest = hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+        return f"{self.KEY_PREFIX}{scope}:{digest}"
+
+    async def check(self, email: str, client_ip: Optional[str]) -> Optional[int]:
+        """Списывает попытку входа
+
+        Возвращает None, если попытка разрешена, иначе число секунд
+        до следующей разрешенной попытки.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return None
+        buckets = [("email", email)]
+        if client_ip:
+            buckets.append(("ip", client_ip))
+        args = [int(time.time() * 1000)]
+        for scope, _ in buckets:
+            args.extend(self.limits[scope])
+        try:
+            redis = await get_redis()
+            retry_ms, scope = await redis.run_script(
+                TOKEN_BUCKET_SCRIPT,
+                keys=[self.key(scope, value) for scope, value in buckets],
+                args=args,
+            )
+        except Exception:
+            logger.warning("Не удалось проверить лимит попыток входа")
+            return None
+        if not retry_ms:
+            return None
+        LOGIN_THROTTLED.inc(buckets[int(scope) - 1][0])
+        return max(1, math.ceil(int(retry_ms) / 1000))
+
+
+login_throttle = LoginThrottle(
+    email_burst=settings.LOGIN_THROTTLE_EMAIL_BURST,
+    email_per_minute=settings.LOGIN_THROTTLE_EMAIL_PER_MINUTE,
+    ip_burst=settings.LOGIN_THROTTLE_IP_BURST,
+    ip_per_minute=settings.LOGIN_THROTTLE_IP_PER_MINUTE,
+    trusted_proxies=settings.LOGIN_THROTTLE_TRUSTED_PROXIES,
+)
@@ -0,0 +1,171 @@
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.hashing import hashing_executor
+from core.metrics import TimingStat, metrics_registry
+from core.principal_cache import principal_cache
+from core.revocation import revocation_registry
+from core.task_list_cache import task_list_cache
+
+HTTP_LATENCY = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP запроса",
+    ("method", "route"),
+)
+HTTP_REQUESTS = metrics_registry.counter(
+    "http_requests_total", "Количество HTTP запросов", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight", "Количество HTTP запросов в обработке"
+)
+DB_POOL_CHECKOUT = metrics_registry.histogram(
+    "db_pool_checkout_seconds",
+    "Время получения соединения из пула SQLAlchemy",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIME = TimingStat()
+
+
+class MetricsMiddleware:
+    """ASGI middleware с метриками задержки и количества запросов
+
+    Меткой маршрута служит шаблон пути (например /api/tasks), а не сам путь,
+    поэтому число временных рядов ограничено числом маршрутов.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else "<unmatched>"
+            method = scope["method"]
+            HTTP_LATENCY.observe(method, path, value=elapsed)
+            HTTP_REQUESTS.inc(method, path, status_code)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий время выдачи соединения"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_POOL_CHECKOUT.observe(value=elapsed)
+            DB_POOL_CHECKOUT_TIME.observe(elapsed)
+
+
+def pool_collector(engine: AsyncEngine):
+    """Функция сбора состояния пула соединений движка"""
+
+    def collect():
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return
+        yield "db_pool_size", "gauge", "Размер пула", [({}, pool.size())]
+        yield (
+            "db_pool_checked_out",
+            "gauge",
+            "Соединения, выданные из пула",
+            [({}, pool.checkedout())],
+        )
+        yield (
+            "db_pool_checked_in",
+            "gauge",
+            "Свободные соединения в пуле",
+            [({}, pool.checkedin())],
+        )
+        yield (
+            "db_pool_overflow",
+            "gauge",
+            "Соединения сверх размера пула",
+            # SQLAlchemy считает overflow отрицательным, пока пул не заполнен
+            [({}, max(0, pool.overflow()))],
+        )
+
+    return collect
+
+
+def _timing(name: str, documentation: str, stat: TimingStat):
+    """TimingStat в виде счетчиков суммы и количества и максимума"""
+    yield f"{name}_seconds_total", "counter", f"{documentation}, сумма", [
+        ({}, stat.total)
+    ]
+    yield f"{name}_total", "counter", f"{documentation}, количество", [({}, stat.count)]
+    yield f"{name}_max_seconds", "gauge", f"{documentation}, максимум", [({}, stat.max)]
+
+
+def components_collector():
+    """Метрики пула хеширования, кешей и реестра отзыва"""
+    yield "hashing_pending", "gauge", "Операции хеширования в работе и в очереди", [
+        ({}, hashing_executor.pending)
+    ]
+    yield "hashing_rejected_total", "counter", "Отклоненные операции хеширования", [
+        ({}, hashing_executor.rejected)
+    ]
+    yield from _timing(
+        "hashing_queue_wait",
+        "Ожидание в очереди хеширования",
+        hashing_executor.queue_wait,
+    )
+    yield from _timing(
+        "hashing_duration", "Время хеширования", hashing_executor.hash_time
+    )
+
+    for name, cache in (
+        ("principal_cache", principal_cache),
+        ("task_list_cache", task_list_cache),
+    ):
+        stats = cache.metrics()
+        yield f"{name}_size", "gauge", "Записей в памяти процесса", [
+            ({}, stats["size"])
+        ]
+        yield f"{name}_lookups_total", "counter", "Обращения к кешу по результату", [
+            ({"result": "local_hit"}, stats["local_hits"]),
+            ({"result": "redis_hit"}, stats["redis_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ]
+    yield "task_list_cache_not_modified_total", "counter", "Ответы 304", [
+        ({}, task_list_cache.not_modified)
+    ]
+    yield from _timing(
+        "principal_cache_lookup",
+        "Время поиска в кеше пользователей",
+        principal_cache.lookup_time,
+    )
+
+    revocation = revocation_registry.metrics()
+    yield "revocation_filter_synced", "gauge", "Фильтр отзыва синхронизирован", [
+        ({}, revocation["synced"])
+    ]
+    yield "revocation_filter_items", "gauge", "Элементов в фильтре отзыва", [
+        ({}, revocation["filter_items"])
+    ]
+    yield "revocation_checks_total", "counter", "Проверки отзыва по результату", [
+        ({"result": "filter_negative"}, revocation["filter_negatives"]),
+        ({"result": "redis"}, revocation["redis_checks"]),
+        ({"result": "false_positive"}, revocation["false_positives"]),
+    ]
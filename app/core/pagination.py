@@ -0,0 +1,36 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(due_date: datetime, task_id: int) -> str:
+    """Кодирует позицию (due_date, id) в непрозрачный курсор"""
+    raw = json.dumps({"d": due_date.isoformat(), "i": task_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Декодирует курсор обратно в позицию (due_date, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["d"]), int(data["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Невалидный курсор")
+
+
+def encode_search_cursor(rank: float, task_id: int) -> str:
+    """Кодирует позицию (rank, id) результатов поиска в непрозрачный курсор"""
+    raw = json.dumps({"r": rank, "i": task_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """Декодирует курсор поиска обратно в позицию (rank, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(data["r"]), int(data["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Невалидный курсор")
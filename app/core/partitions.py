@@ -0,0 +1,229 @@
+"""Обслуживание помесячных секций таблицы tasks в Postgres
+
+Таблица tasks секционирована по диапазонам due_date, одна секция
+tasks_pYYYY_MM на календарный месяц UTC и секция tasks_default для
+сроков, на которые секции еще нет. Команды:
+
+    python -m core.partitions ensure    # секции на ближайшие месяцы
+    python -m core.partitions archive   # убрать секции старше срока хранения
+
+ensure нужно запускать по расписанию (cron), раньше, чем наступит
+последний месяц с секцией. archive отсоединяет секции, закончившиеся
+раньше TASKS_PARTITION_RETENTION_MONTHS месяцев назад, и в зависимости
+от режима оставляет их отдельными таблицами (detach), переносит в схему
+tasks_archive (archive) или удаляет (drop).
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "tasks_default"
+ARCHIVE_SCHEMA = "tasks_archive"
+ARCHIVE_MODES = ("detach", "archive", "drop")
+PARTITION_NAME = re.compile(r"^tasks_p(\d{4})_(\d{2})$")
+COLUMNS = "id, title, description, due_date, user_id, created_at"
+
+
+def month_start(moment: datetime) -> datetime:
+    """Начало месяца UTC, в который попадает moment"""
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Начало месяца через months месяцев"""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Имя секции месяца"""
+    return f"tasks_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Месяц секции по ее имени, None для секций с другими именами"""
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+
+
+def expired_partitions(
+    names: list[str], retention_months: int, now: datetime
+) -> list[str]:
+    """Секции, месяц которых закончился раньше срока хранения"""
+    cutoff = add_months(month_start(now), -retention_months)
+    expired = []
+    for name in sorted(names):
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            expired.append(name)
+    return expired
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """Секционирована ли таблица tasks"""
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass('tasks'))"
+        )
+    ).scalar()
+
+
+def _partitions(conn: Connection) -> list[str]:
+    if not is_partitioned(conn):
+        raise RuntimeError(
+            "Таблица tasks не секционирована, выполните alembic upgrade head"
+        )
+    return list(
+        conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'tasks'::regclass"
+            )
+        ).scalars()
+    )
+
+
+def _create_partition(conn: Connection, month: datetime) -> bool:
+    """Создает секцию месяца и переносит в нее задачи из секции по умолчанию"""
+    name = partition_name(month)
+    if name in _partitions(conn):
+        return False
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    in_default = conn.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE due_date >= :start AND due_date < :end)"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    ).scalar()
+    if not in_default:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF tasks {bounds}"))
+        return True
+
+    # Новая секция не может пересекаться со строками секции по умолчанию:
+    # секция по умолчанию отсоединяется, ее строки месяца переносятся
+    conn.execute(text(f"ALTER TABLE tasks DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF tasks {bounds}"))
+    range_filter = f"due_date >= '{start}' AND due_date < '{end}'"
+    conn.execute(
+        text(
+            f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} "
+            f"FROM {DEFAULT_PARTITION} WHERE {range_filter}"
+        )
+    )
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {range_filter}"))
+    conn.execute(
+        text(f"ALTER TABLE tasks ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    )
+    return True
+
+
+def _archive_partition(conn: Connection, name: str, mode: str) -> None:
+    """Отсоединяет секцию и убирает ее в архив или удаляет"""
+    conn.execute(text(f"ALTER TABLE tasks DETACH PARTITION {name}"))
+    if mode == "archive":
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+    elif mode == "drop":
+        conn.execute(text(f"DROP TABLE {name}"))
+
+
+async def create_partitions(
+    engine: AsyncEngine, first: datetime, last: datetime
+) -> list[str]:
+    """Создает недостающие секции месяцев с first по last включительно
+
+    Каждая секция создается в отдельной транзакции, чтобы блокировка
+    таблицы держалась недолго.
+    """
+    created = []
+    month = month_start(first)
+    while month <= month_start(last):
+        async with engine.begin() as conn:
+            if await conn.run_sync(_create_partition, month):
+                created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+async def ensure_partitions(
+    engine: AsyncEngine, months_ahead: int, now: Optional[datetime] = None
+) -> list[str]:
+    """Создает секции текущего месяца и months_ahead следующих"""
+    current = month_start(now or datetime.now(timezone.utc))
+    return await create_partitions(engine, current, add_months(current, months_ahead))
+
+
+async def archive_partitions(
+    engine: AsyncEngine,
+    retention_months: int,
+    mode: str = "archive",
+    now: Optional[datetime] = None,
+) -> list[str]:
+    """Убирает секции старше retention_months месяцев"""
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Неизвестный режим архивации: {mode}")
+    async with engine.connect() as conn:
+        names = await conn.run_sync(_partitions)
+    expired = expired_partitions(
+        names, retention_months, now or datetime.now(timezone.utc)
+    )
+    for name in expired:
+        async with engine.begin() as conn:
+            await conn.run_sync(_archive_partition, name, mode)
+        logger.info("Секция %s: %s", name, mode)
+    return expired
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("ensure", "archive"))
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.TASKS_PARTITION_MONTHS_AHEAD
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=settings.TASKS_PARTITION_RETENTION_MONTHS,
+    )
+    parser.add_argument(
+        "--mode", choices=ARCHIVE_MODES, default=settings.TASKS_PARTITION_ARCHIVE_MODE
+    )
+    parser.add_argument("--db-url", default=None)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.db_url or settings.pg_connection_string)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Секционирование tasks поддерживается только в Postgres")
+    try:
+        if args.command == "ensure":
+            names = await ensure_partitions(engine, args.months_ahead)
+            print("созданы секции:", ", ".join(names) or "нет")
+        else:
+            names = await archive_partitions(engine, args.retention_months, args.mode)
+            print(f"{args.mode}:", ", ".join(names) or "нет")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
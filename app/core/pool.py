@@ -0,0 +1,63 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from core.config import settings
+from core.observability import DB_POOL_CHECKOUT_TIME
+
+
+def engine_pool_options() -> dict:
+    """Параметры пула соединений движка из настроек"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_LIVENESS == "pre_ping",
+    }
+
+
+def install_idle_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Проверяет соединение при выдаче, только если оно простаивало дольше idle_seconds
+
+    В отличие от pool_pre_ping не добавляет round trip к каждому запросу.
+    Неответившее соединение пул заменяет новым.
+    """
+    sync_engine = engine.sync_engine
+
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise DisconnectionError("Соединение не ответило на проверку") from e
+
+    event.listen(sync_engine, "checkin", on_checkin)
+    event.listen(sync_engine, "checkout", on_checkout)
+
+
+def db_pool_stats(engine: AsyncEngine) -> dict | None:
+    """Состояние пула соединений движка"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # SQLAlchemy считает overflow отрицательным, пока пул не заполнен
+        "overflow": max(0, pool.overflow()),
+        "timeout_seconds": pool.timeout(),
+        "recycle_seconds": settings.DB_POOL_RECYCLE_SECONDS,
+        "liveness": settings.DB_POOL_LIVENESS,
+        "checkout_time": DB_POOL_CHECKOUT_TIME.snapshot(),
+    }
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.config import settings
+from core.metrics import TimingStat
+from core.redis import get_redis
+from schemas.user import UserResponseSchema
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """Двухуровневый кеш аутентифицированных пользователей
+
+    Первый уровень - LRU в памяти процесса, второй - Redis, общий для всех
+    воркеров. Ключом служит sha256 токена. Записи живут не дольше exp токена,
+    при отзыве токена запись удаляется из Redis, а воркеры получают
+    уведомление через pub/sub и удаляют ее из своей памяти.
+    """
+
+    CHANNEL = "principal:invalidate"
+    KEY_PREFIX = "principal:"
+
+    def __init__(self, enabled: bool, max_size: int, local_ttl: int) -> None:
+        self.enabled = enabled
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.lookup_time = TimingStat()
+        self._entries: OrderedDict[str, tuple[float, dict, UserResponseSchema]] = (
+            OrderedDict()
+        )
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """Ключ кеша для токена"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _get_local(self, digest: str) -> Optional[tuple[dict, UserResponseSchema]]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        expires_at, payload, user = entry
+        if expires_at <= time.time():
+            self._entries.pop(digest, None)
+            return None
+        self._entries.move_to_end(digest)
+        return payload, user
+
+    def _put_local(self, digest: str, payload: dict, user: UserResponseSchema) -> None:
+        expires_at = min(payload["exp"], time.time() + self.local_ttl)
+        self._entries[digest] = (expires_at, payload, user)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, token: str) -> Optional[tuple[dict, UserResponseSchema]]:
+        """Поиск пользователя по токену сначала в памяти, затем в Redis"""
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        digest = self.digest(token)
+        try:
+            cached = self._get_local(digest)
+            if cached is not None:
+                self.local_hits += 1
+                return cached
+
+            try:
+                redis = await get_redis()
+                raw = await redis.get(f"{self.KEY_PREFIX}{digest}")
+            except Exception:
+                raw = None
+            if raw is None:
+                self.misses += 1
+                return None
+
+            data = json.loads(raw)
+            payload = data["payload"]
+            user = UserResponseSchema.model_validate(data["user"])
+            self._put_local(digest, payload, user)
+            self.redis_hits += 1
+            return payload, user
+        finally:
+            self.lookup_time.observe(time.perf_counter() - started)
+
+    async def set(
+        self,
+        token: str,
+        payload: dict,
+        user: UserResponseSchema,
+        revocation_key: str,
+    ) -> None:
+        """Сохраняет пользователя в оба уровня кеша
+
+        Запись и проверка revocation_key выполняются одной транзакцией,
+        поэтому токен, отозванный во время проверки, не останется в кеше.
+        """
+        ttl = int(payload.get("exp", 0) - time.time())
+        if not self.enabled or ttl <= 0:
+            return
+        digest = self.digest(token)
+        key = f"{self.KEY_PREFIX}{digest}"
+        value = json.dumps({"payload": payload, "user": user.model_dump(mode="json")})
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.setex(key, ttl, value)
+            pipe.exists(revocation_key)
+            _, revoked = await pipe.execute()
+            if revoked:
+                await redis.delete(key)
+                return
+        except Exception:
+            logger.debug("Redis недоступен, кешируем только в памяти")
+        self._put_local(digest, payload, user)
+
+    def drop_local(self, token: str) -> None:
+        """Удаляет токен из памяти этого воркера"""
+        self._entries.pop(self.digest(token), None)
+
+    async def invalidate(self, token: str) -> None:
+        """Удаляет токен из кеша во всех воркерах"""
+        digest = self.digest(token)
+        self._entries.pop(digest, None)
+        try:
+            redis = await get_redis()
+            await redis.delete(f"{self.KEY_PREFIX}{digest}")
+            await redis.publish(self.CHANNEL, digest)
+        except Exception:
+            logger.warning("Не удалось разослать инвалидацию кеша пользователей")
+
+    def clear(self) -> None:
+        """Очищает локальный уровень кеша"""
+        self._entries.clear()
+
+    async def _listen(self) -> None:
+        """Слушает канал инвалидации и удаляет записи из памяти"""
+        while True:
+            try:
+                redis = await get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                # пока подписки не было, сообщения могли потеряться
+                self.clear()
+                try:
+                    while True:
+                        # ожидание с таймаутом меньше socket_timeout клиента
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None and message["type"] == "message":
+                            self._entries.pop(message["data"], None)
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Подписка на инвалидацию кеша потеряна, переподключение")
+                self.clear()
+                await asyncio.sleep(1)
+
+    def start_listener(self) -> None:
+        """Запускает фоновую подписку на инвалидацию"""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Останавливает фоновую подписку"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def metrics(self) -> dict:
+        """Счетчики попаданий и время поиска"""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.local_hits + self.redis_hits) / lookups if lookups else 0.0
+            ),
+            "lookup_time": self.lookup_time.snapshot(),
+        }
+
+
+principal_cache = PrincipalCache(
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+)
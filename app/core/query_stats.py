@@ -0,0 +1,138 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestQueryStats"]] = ContextVar(
+    "request_query_stats", default=None
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestQueryStats:
+    """SQL запросы, выполненные в рамках одного HTTP запроса"""
+
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "shapes", "path")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = ""
+        self.shapes: dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Учитывает выполненный запрос"""
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+        repeats = self.shapes.get(statement, 0) + 1
+        self.shapes[statement] = repeats
+        if repeats == settings.SQL_N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                "Возможный N+1: запрос выполнен более %s раз за %s: %s",
+                settings.SQL_N_PLUS_ONE_THRESHOLD,
+                self.path,
+                _compact(statement),
+            )
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing
+
+        Текст самого медленного запроса виден любому клиенту, поэтому
+        добавляется только при SQL_TIMING_SHOW_STATEMENTS.
+        """
+        timing = (
+            f'db;dur={self.total * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest * 1000:.2f}"
+        )
+        if settings.SQL_TIMING_SHOW_STATEMENTS:
+            slowest = _compact(self.slowest_statement)[:100].replace('"', "'")
+            timing += f';desc="{slowest}"'
+        return timing
+
+
+def _compact(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _redact(parameters) -> str:
+    """Типы параметров запроса вместо их значений"""
+    if isinstance(parameters, dict):
+        return str({key: type(value).__name__ for key, value in parameters.items()})
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"<{len(parameters)} наборов параметров>"
+        return str([type(value).__name__ for value in parameters])
+    return "<скрыто>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "Медленный запрос %.1f мс: %s параметры: %s",
+            elapsed * 1000,
+            _compact(statement),
+            _redact(parameters),
+        )
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    """Подключает замер SQL запросов к движку"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware, собирающее SQL статистику запроса в Server-Timing"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope["path"])
+        token = _current.set(stats)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start" and stats.count:
+                timing = stats.server_timing().encode("latin-1", "replace")
+                headers = [*message.get("headers", []), (b"server-timing", timing)]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
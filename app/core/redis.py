@@ -1,6 +1,54 @@
+import functools
+import time
+
 import redis.asyncio as redis
 
 from core.config import settings
+from core.metrics import metrics_registry
+
+REDIS_LATENCY = metrics_registry.histogram(
+    "redis_command_duration_seconds",
+    "Длительность команды Redis",
+    ("command",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+REDIS_ERRORS = metrics_registry.counter(
+    "redis_command_errors_total", "Ошибки команд Redis", ("command",)
+)
+
+
+def instrumented(command: str):
+    """Замеряет длительность и ошибки команды Redis"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                REDIS_ERRORS.inc(command)
+                raise
+            finally:
+                REDIS_LATENCY.observe(command, value=time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedPipeline:
+    """Пайплайн Redis, выполнение которого попадает в метрики"""
+
+    def __init__(self, pipeline) -> None:
+        self._pipeline = pipeline
+
+    def __getattr__(self, name: str):
+        return getattr(self._pipeline, name)
+
+    @instrumented("pipeline")
+    async def execute(self, raise_on_error: bool = True) -> list:
+        return await self._pipeline.execute(raise_on_error=raise_on_error)
 
 
 class RedisService:
@@ -8,44 +56,113 @@ class RedisService:
 
     def __init__(self):
         self.redis_client = None
+        self._scripts = {}
 
-    async def init_redis(self) -> None:
-        """Инициализация подключения к Redis"""
+    def connect(self) -> None:
+        """Создание клиента Redis, соединения открываются при первой команде"""
+        pool_options = {
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "timeout": settings.REDIS_POOL_TIMEOUT_SECONDS,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+            "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+            "decode_responses": True,
+        }
         if settings.REDIS_URL:
-            self.redis_client = redis.Redis.from_url(
-                settings.REDIS_URL, decode_responses=True
+            pool = redis.BlockingConnectionPool.from_url(
+                settings.REDIS_URL, **pool_options
             )
         else:
-            self.redis_client = redis.Redis(
+            pool = redis.BlockingConnectionPool(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 password=settings.REDIS_PASSWORD,
                 db=settings.REDIS_DB,
-                decode_responses=True,
+                **pool_options,
             )
+        self.redis_client = redis.Redis.from_pool(pool)
+
+    async def init_redis(self) -> None:
+        """Инициализация подключения к Redis"""
+        self.connect()
         await self.redis_client.ping()  # тестовое подключение
 
+    def pool_stats(self) -> dict | None:
+        """Состояние пула соединений Redis"""
+        pool = getattr(self.redis_client, "connection_pool", None)
+        if pool is None:
+            return None
+        in_use = len(getattr(pool, "_in_use_connections", ()))
+        available = len(getattr(pool, "_available_connections", ()))
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": in_use,
+            "idle": available,
+            "created": in_use + available,
+        }
+
     async def close(self) -> None:
         """Закрытие подключения к Redis"""
         if self.redis_client:
             await self.redis_client.close()
 
+    @instrumented("setex")
     async def setex(self, key: str, time: int, value: str) -> None:
         """Установка значения с TTL"""
         await self.redis_client.setex(key, time, value)
 
+    @instrumented("set")
+    async def setnx(self, key: str, value: str) -> bool:
+        """Установка значения, только если ключа еще нет"""
+        return bool(await self.redis_client.set(key, value, nx=True))
+
+    @instrumented("get")
     async def get(self, key: str) -> str | None:
         """Получение значения по ключу"""
         return await self.redis_client.get(key)
 
+    @instrumented("exists")
     async def exists(self, key: str) -> bool:
         """Проверка существования ключа"""
         return await self.redis_client.exists(key)
 
+    @instrumented("del")
     async def delete(self, key: str) -> None:
         """Удаление ключа"""
         await self.redis_client.delete(key)
 
+    @instrumented("publish")
+    async def publish(self, channel: str, message: str) -> None:
+        """Публикация сообщения в канал"""
+        await self.redis_client.publish(channel, message)
+
+    def pubsub(self):
+        """Создание объекта подписки на каналы"""
+        return self.redis_client.pubsub()
+
+    @instrumented("xrange")
+    async def xrange(self, stream: str, start: str, end: str, count: int) -> list:
+        """Чтение диапазона записей потока"""
+        return await self.redis_client.xrange(stream, start, end, count=count)
+
+    @instrumented("xread")
+    async def xread(self, streams: dict, count: int, block: int) -> list:
+        """Чтение новых записей потоков с ожиданием"""
+        return await self.redis_client.xread(streams, count=count, block=block)
+
+    @instrumented("evalsha")
+    async def run_script(self, script: str, keys: list, args: list):
+        """Выполнение Lua скрипта через EVALSHA с откатом на EVAL"""
+        registered = self._scripts.get(script)
+        if registered is None or registered.registered_client is not self.redis_client:
+            registered = self.redis_client.register_script(script)
+            self._scripts[script] = registered
+        return await registered(keys=keys, args=args)
+
+    def pipeline(self, transaction: bool = True):
+        """Создание пайплайна для выполнения команд за один round trip"""
+        return InstrumentedPipeline(self.redis_client.pipeline(transaction=transaction))
+
 
 redis_service = RedisService()
 
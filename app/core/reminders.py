@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from core.config import settings
+from core.metrics import metrics_registry
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_FIRED = metrics_registry.counter(
+    "reminders_fired_total", "Отправленные напоминания о сроках задач"
+)
+REMINDERS_FAILED = metrics_registry.counter(
+    "reminders_failed_total", "Напоминания, которые не удалось отправить"
+)
+
+# KEYS: очередь напоминаний, напоминания, выданные воркерам, хеш сроков
+#       выданных напоминаний
+# ARGV: текущее время, размер пачки, срок аренды выданных напоминаний
+# Сначала возвращает в очередь с исходным сроком напоминания с истекшей
+# арендой (воркер упал или не смог отправить), затем переносит наступившие
+# в выданные, запоминая их срок. Возвращает плоский список участник, срок.
+CLAIM_SCRIPT = """
+local expired = redis.call(
+    'ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(expired) do
+    local due = redis.call('HGET', KEYS[3], member) or ARGV[1]
+    redis.call('ZREM', KEYS[2], member)
+    redis.call('HDEL', KEYS[3], member)
+    redis.call('ZADD', KEYS[1], 'NX', due, member)
+end
+local due = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+    redis.call('ZADD', KEYS[2], ARGV[3], due[i])
+    redis.call('HSET', KEYS[3], due[i], due[i + 1])
+end
+return due
+"""
+
+
+class Reminder:
+    """Наступивший срок задачи"""
+
+    __slots__ = ("task_id", "user_id", "due_date")
+
+    def __init__(self, task_id: int, user_id: int, due_date: datetime) -> None:
+        self.task_id = task_id
+        self.user_id = user_id
+        self.due_date = due_date
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "user_id": self.user_id,
+            "due_date": self.due_date.isoformat(),
+        }
+
+
+class LogNotifier:
+    """Пишет напоминания в лог"""
+
+    async def notify(self, reminder: Reminder) -> None:
+        logger.info(
+            "Наступил срок задачи %s пользователя %s",
+            reminder.task_id,
+            reminder.user_id,
+        )
+
+
+class QueueNotifier:
+    """Складывает напоминания в очередь asyncio внутри процесса"""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.queue: asyncio.Queue[Reminder] = asyncio.Queue(maxsize)
+
+    async def notify(self, reminder: Reminder) -> None:
+        await self.queue.put(reminder)
+
+
+class WebhookNotifier:
+    """Отправляет напоминания POST запросом с JSON на адрес url"""
+
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    async def notify(self, reminder: Reminder) -> None:
+        body = json.dumps(reminder.to_dict()).encode()
+        await asyncio.to_thread(self._post, body)
+
+
+def _timestamp(moment: datetime) -> float:
+    """Секунды Unix, время без пояса считается UTC (так его возвращает SQLite)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def build_notifier(name: str, webhook_url: Optional[str] = None):
+    """Получатель напоминаний по имени из настроек"""
+    if name == "log":
+        return LogNotifier()
+    if name == "queue":
+        return QueueNotifier()
+    if name == "webhook":
+        if not webhook_url:
+            raise RuntimeError("Для webhook нужно указать REMINDERS_WEBHOOK_URL")
+        return WebhookNotifier(webhook_url)
+    raise RuntimeError(f"Неизвестный получатель напоминаний: {name}")
+
+
+class ReminderScheduler:
+    """Напоминания о сроках задач в сортированном множестве Redis
+
+    Участник множества - "<task_id>:<user_id>", вес - срок задачи в
+    секундах Unix, поэтому постановка, перенос и отмена напоминания
+    стоят O(log n). Задачи со сроком в прошлом из множества убираются.
+    Фоновый цикл каждого воркера забирает наступившие напоминания
+    пачками Lua скриптом: забранное переносится в множество выданных
+    с арендой на lease секунд, поэтому одно напоминание не получат два
+    воркера. После отправки напоминание удаляется, а при ошибке или
+    падении воркера возвращается в очередь по истечении аренды с
+    исходным сроком из хеша CLAIMED_DUE_KEY.
+    """
+
+    QUEUE_KEY = "reminders:due"
+    CLAIMED_KEY = "reminders:claimed"
+    CLAIMED_DUE_KEY = "reminders:claimed:due"
+
+    def __init__(
+        self,
+        enabled: bool,
+        notifier,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+    ) -> None:
+        self.enabled = enabled
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def member(task_id: int, user_id: int) -> str:
+        """Участник множества для задачи"""
+        return f"{task_id}:{user_id}"
+
+    async def schedule(self, tasks: Iterable) -> None:
+        """Ставит или переносит напоминания для задач со сроком due_date
+
+        Уже выданное воркеру напоминание со старым сроком снимается,
+        иначе после истечения аренды оно вернулось бы в очередь.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            for task in tasks:
+                member = self.member(task.id, task.user_id)
+                pipe.zrem(self.CLAIMED_KEY, member)
+                pipe.hdel(self.CLAIMED_DUE_KEY, member)
+                due = _timestamp(task.due_date)
+                if due > now:
+                    pipe.zadd(self.QUEUE_KEY, {member: due})
+                else:
+                    pipe.zrem(self.QUEUE_KEY, member)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Не удалось запланировать напоминания о задачах")
+
+    async def cancel(self, tasks: Iterable[tuple[int, int]]) -> None:
+        """Отменяет напоминания для пар (task_id, user_id)"""
+        if not self.enabled:
+            return
+        members = [self.member(task_id, user_id) for task_id, user_id in tasks]
+        if not members:
+            return
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.zrem(self.QUEUE_KEY, *members)
+            pipe.zrem(self.CLAIMED_KEY, *members)
+            pipe.hdel(self.CLAIMED_DUE_KEY, *members)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Не удалось отменить напоминания о задачах")
+
+    async def claim(self, now: Optional[float] = None) -> list[Reminder]:
+        """Забирает пачку наступивших напоминаний"""
+        now = time.time() if now is None else now
+        redis = await get_redis()
+        flat = await redis.run_script(
+            CLAIM_SCRIPT,
+            keys=[self.QUEUE_KEY, self.CLAIMED_KEY, self.CLAIMED_DUE_KEY],
+            args=[now, self.batch_size, now + self.lease],
+        )
+        reminders = []
+        for member, score in zip(flat[::2], flat[1::2]):
+            task_id, user_id = member.split(":")
+            due_date = datetime.fromtimestamp(float(score), timezone.utc)
+            reminders.append(Reminder(int(task_id), int(user_id), due_date))
+        return reminders
+
+    async def _dispatch(self, reminder: Reminder) -> Optional[str]:
+        try:
+            await self.notifier.notify(reminder)
+        except Exception:
+            REMINDERS_FAILED.inc()
+            logger.warning(
+                "Не удалось отправить напоминание о задаче %s", reminder.task_id
+            )
+            return None
+        REMINDERS_FIRED.inc()
+        return self.member(reminder.task_id, reminder.user_id)
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        """Отправляет одну пачку наступивших напоминаний, возвращает ее размер"""
+        reminders = await self.claim(now)
+        if not reminders:
+            return 0
+        sent = await asyncio.gather(*(self._dispatch(r) for r in reminders))
+        done = [member for member in sent if member is not None]
+        if done:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.zrem(self.CLAIMED_KEY, *done)
+            pipe.hdel(self.CLAIMED_DUE_KEY, *done)
+            await pipe.execute()
+        return len(reminders)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self.run_once() < self.batch_size:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Обработка напоминаний прервана")
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Запускает фоновую отправку напоминаний"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую отправку напоминаний"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+reminder_scheduler = ReminderScheduler(
+    enabled=settings.REMINDERS_ENABLED,
+    notifier=build_notifier(
+        settings.REMINDERS_NOTIFIER, settings.REMINDERS_WEBHOOK_URL
+    ),
+    batch_size=settings.REMINDERS_BATCH_SIZE,
+    poll_interval=settings.REMINDERS_POLL_SECONDS,
+    lease=settings.REMINDERS_LEASE_SECONDS,
+)
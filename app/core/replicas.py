@@ -0,0 +1,185 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+
+
+class ReadRoutingSession(Session):
+    """Сессия чтения, выбирающая реплику при первом запросе
+
+    Реплика закрепляется за сессией до ее закрытия. Если для текущего
+    запроса включено чтение своих записей, запросы идут в основную базу.
+    """
+
+    _replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        router: ReplicaRouter = self.info["replica_router"]
+        if _read_primary.get():
+            return router.primary.sync_engine
+        if self._replica is None:
+            self._replica = router.pick() or router.primary
+        return self._replica.sync_engine
+
+
+class ReplicaRouter:
+    """Маршрутизация чтения по репликам с проверкой их доступности
+
+    selection: "round_robin" или "least_connections" (по числу выданных
+    соединений пула). Недоступные реплики исключаются до следующей успешной
+    проверки, без доступных реплик чтение идет в основную базу.
+    После записи пользователя его чтение в течение read_your_writes секунд
+    тоже идет в основную базу; отметка хранится в Redis, поэтому действует
+    во всех воркерах.
+    """
+
+    WRITE_KEY_PREFIX = "recent_write:"
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        selection: str,
+        health_check_interval: float,
+        read_your_writes: float,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.selection = selection
+        self.health_check_interval = health_check_interval
+        self.read_your_writes = read_your_writes
+        self.healthy = [True] * len(replicas)
+        self.primary_fallbacks = 0
+        self._counter = itertools.count()
+        self._recent_writes: dict[int, float] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self.session_factory = async_sessionmaker(
+            class_=AsyncSession,
+            sync_session_class=ReadRoutingSession,
+            expire_on_commit=False,
+            autoflush=False,
+            info={"replica_router": self},
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Настроена ли хотя бы одна реплика"""
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """Доступная реплика или None"""
+        candidates = [engine for engine, ok in zip(self.replicas, self.healthy) if ok]
+        if not candidates:
+            self.primary_fallbacks += 1
+            return None
+        if self.selection == "least_connections":
+            return min(
+                candidates, key=lambda engine: engine.sync_engine.pool.checkedout()
+            )
+        return candidates[next(self._counter) % len(candidates)]
+
+    def read_session(self) -> AsyncSession:
+        """Новая сессия чтения"""
+        _read_primary.set(False)
+        return self.session_factory()
+
+    async def mark_write(self, user_id: int) -> None:
+        """Отмечает запись пользователя для чтения своих записей"""
+        if not self.enabled or not self.read_your_writes:
+            return
+        self._recent_writes[user_id] = time.monotonic() + self.read_your_writes
+        try:
+            redis = await get_redis()
+            await redis.setex(
+                f"{self.WRITE_KEY_PREFIX}{user_id}",
+                max(1, int(self.read_your_writes)),
+                "1",
+            )
+        except Exception:
+            logger.warning(
+                "Не удалось сохранить отметку записи пользователя %s", user_id
+            )
+
+    async def route_user(self, user_id: int) -> None:
+        """Направляет чтение текущего запроса в основную базу после недавней записи"""
+        if not self.enabled or not self.read_your_writes:
+            return
+        until = self._recent_writes.get(user_id)
+        recent = until is not None and until > time.monotonic()
+        if until is not None and not recent:
+            del self._recent_writes[user_id]
+        if not recent:
+            try:
+                redis = await get_redis()
+                recent = bool(await redis.exists(f"{self.WRITE_KEY_PREFIX}{user_id}"))
+            except Exception:
+                # без Redis нельзя узнать о записи в другом воркере
+                recent = True
+        if recent:
+            _read_primary.set(True)
+
+    async def check_health(self) -> None:
+        """Проверяет доступность всех реплик"""
+        for index, engine in enumerate(self.replicas):
+            try:
+                async with asyncio.timeout(2):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception:
+                healthy = False
+            if healthy != self.healthy[index]:
+                logger.warning(
+                    "Реплика %s %s",
+                    engine.url.render_as_string(hide_password=True),
+                    "снова доступна" if healthy else "недоступна",
+                )
+            self.healthy[index] = healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start_health_checks(self) -> None:
+        """Запускает фоновую проверку реплик"""
+        if self.enabled and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop_health_checks(self) -> None:
+        """Останавливает фоновую проверку и закрывает пулы реплик"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for engine in self.replicas:
+            await engine.dispose()
+
+    def metrics(self) -> dict:
+        """Состояние реплик"""
+        return {
+            "replicas": [
+                {
+                    "url": engine.url.render_as_string(hide_password=True),
+                    "healthy": ok,
+                    "checked_out": engine.sync_engine.pool.checkedout(),
+                }
+                for engine, ok in zip(self.replicas, self.healthy)
+            ],
+            "primary_fallbacks": self.primary_fallbacks,
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Optional
+
+from core.config import settings
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Фильтр Блума для строк
+
+    Ложноотрицательных ответов не бывает, доля ложноположительных при
+    заполнении до capacity не превышает error_rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        """Добавляет элемент в фильтр"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationRegistry:
+    """Реестр отозванных токенов по jti
+
+    Отзыв хранится в Redis ключом revoked:<jti> с TTL до exp токена и
+    дописывается в поток revoked:log. Каждый воркер держит фильтр Блума
+    отозванных jti и догружает в него новые записи потока, поэтому в Redis
+    проверяются только jti, на которые фильтр ответил положительно.
+    Пока фильтр не синхронизирован, каждая проверка идет в Redis.
+    """
+
+    KEY_PREFIX = "revoked:"
+    STREAM = "revoked:log"
+    SYNC_BATCH = 1000
+
+    def __init__(self, capacity: int, error_rate: float, max_token_age: int) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_token_age = max_token_age
+        self.filter_negatives = 0
+        self.redis_checks = 0
+        self.false_positives = 0
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_id = "0-0"
+        self._synced = False
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def key(self, jti: str) -> str:
+        """Ключ Redis для отозванного jti"""
+        return f"{self.KEY_PREFIX}{jti}"
+
+    async def revoke(self, jti: str, exp_timestamp: float) -> None:
+        """Отзывает токен до момента его истечения"""
+        ttl = max(1, int(exp_timestamp - time.time()))
+        redis = await get_redis()
+        pipe = redis.pipeline()
+        pipe.setex(self.key(jti), ttl, "1")
+        pipe.xadd(
+            self.STREAM,
+            {"jti": jti, "exp": int(exp_timestamp)},
+            minid=self.stream_min_id(),
+            approximate=True,
+        )
+        await pipe.execute()
+        self.mark_revoked(jti)
+
+    def mark_revoked(self, jti: str) -> None:
+        """Добавляет jti, отозванный в этом воркере, в локальный фильтр"""
+        self._filter.add(jti)
+
+    def stream_min_id(self) -> int:
+        """Минимальный id записи потока, которую еще нужно хранить"""
+        return max(int((time.time() - self.max_token_age) * 1000), 0)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """Проверяет, отозван ли токен"""
+        if self._synced and jti not in self._filter:
+            self.filter_negatives += 1
+            return False
+        self.redis_checks += 1
+        redis = await get_redis()
+        revoked = bool(await redis.exists(self.key(jti)))
+        if not revoked and self._synced:
+            self.false_positives += 1
+        return revoked
+
+    async def _reload(self, redis) -> None:
+        """Полностью перестраивает фильтр по потоку отзывов
+
+        Фильтр рассчитывается минимум на вдвое больше действующих отзывов,
+        чем найдено в потоке, иначе он переполнялся бы сразу после
+        перестройки и перестраивался на каждой итерации синхронизации.
+        """
+        live = []
+        now = time.time()
+        last_id = "0-0"
+        start = "-"
+        while True:
+            entries = await redis.xrange(self.STREAM, start, "+", count=self.SYNC_BATCH)
+            for entry_id, fields in entries:
+                if float(fields.get("exp", 0)) > now:
+                    live.append(fields["jti"])
+                last_id = entry_id
+            if len(entries) < self.SYNC_BATCH:
+                break
+            start = f"({last_id}"
+        bloom = BloomFilter(max(self.capacity, 2 * len(live)), self.error_rate)
+        for jti in live:
+            bloom.add(jti)
+        self._filter = bloom
+        self._last_id = last_id
+        self._synced = True
+
+    async def _sync(self) -> None:
+        """Догружает в фильтр новые отзывы из потока"""
+        while True:
+            try:
+                redis = await get_redis()
+                if not self._synced or self._filter.count > self._filter.capacity:
+                    await self._reload(redis)
+                streams = await redis.xread(
+                    {self.STREAM: self._last_id}, count=self.SYNC_BATCH, block=5000
+                )
+                for _, entries in streams:
+                    for entry_id, fields in entries:
+                        self._filter.add(fields["jti"])
+                        self._last_id = entry_id
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Синхронизация отозванных токенов прервана")
+                self._synced = False
+                await asyncio.sleep(1)
+
+    def start_sync(self) -> None:
+        """Запускает фоновую синхронизацию фильтра"""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync())
+
+    async def stop_sync(self) -> None:
+        """Останавливает фоновую синхронизацию фильтра"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        self._synced = False
+
+    def metrics(self) -> dict:
+        """Счетчики проверок отзыва"""
+        return {
+            "synced": self._synced,
+            "filter_items": self._filter.count,
+            "filter_negatives": self.filter_negatives,
+            "redis_checks": self.redis_checks,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_registry = RevocationRegistry(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    max_token_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+)
@@ -1,22 +1,59 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 
 import jwt
 from jwt import PyJWTError as JWTError
-from passlib.context import CryptContext
 
 from core.config import settings
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from core.hashing import hash_password_sync, hashing_executor, verify_password_sync
+from core.signing_keys import SigningKeySet
+from core.token_verifier import TokenVerifier
 
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверяет соответствие пароля и хеша"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await hashing_executor.run(
+        verify_password_sync, plain_password, hashed_password
+    )
 
 
 async def get_password_hash(password: str) -> str:
     """Создает хеш пароля"""
-    return pwd_context.hash(password)
+    return await hashing_executor.run(hash_password_sync, password)
+
+
+_dummy_hash: str | None = None
+
+
+async def verify_dummy_password(plain_password: str) -> bool:
+    """Проверка пароля по фиктивному хешу, когда пользователь не найден
+
+    Занимает столько же времени, сколько настоящая проверка, поэтому
+    по времени ответа нельзя узнать, зарегистрирован ли email.
+    Всегда возвращает False.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await get_password_hash(uuid.uuid4().hex)
+    await verify_password(plain_password, _dummy_hash)
+    return False
+
+
+def _encode(payload: dict) -> str:
+    """Подписывает payload секретом HS256 или активным ключом из набора"""
+    if settings.JWT_ALGORITHM == "HS256":
+        return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm="HS256")
+    kid, algorithm, key = signing_keys.signing_key()
+    return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+
+
+def decode_token(token: str) -> dict:
+    """Проверяет подпись и срок действия токена, при ошибке JWTError"""
+    if settings.JWT_ALGORITHM != "HS256":
+        header = jwt.get_unverified_header(token)
+        if header.get("kid") or not settings.JWT_ACCEPT_HS256:
+            return token_verifier.verify(token)
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
 
 
 async def create_access_token(data: dict) -> str:
@@ -25,11 +62,8 @@ async def create_access_token(data: dict) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    copy_data.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        copy_data, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    copy_data.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return _encode(copy_data)
 
 
 async def create_refresh_token(data: dict) -> str:
@@ -38,19 +72,25 @@ async def create_refresh_token(data: dict) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         days=settings.REFRESH_TOKEN_EXPIRE_DAYS
     )
-    copy_data.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(
-        copy_data, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    copy_data.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    return _encode(copy_data)
 
 
 async def verify_token(token: str) -> dict | None:
     """Проверяет и декодирует JWT токен"""
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
+        return decode_token(token)
     except JWTError:
         return None
+
+
+signing_keys = SigningKeySet(
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+)
+# в процессе приложения источник ключей - тот же каталог, неизвестный kid
+# (ключ, добавленный при ротации) приводит к его перечитыванию
+token_verifier = TokenVerifier(
+    source=signing_keys.reload_jwks,
+    min_refresh_interval=settings.JWT_KEYS_REFRESH_SECONDS,
+)
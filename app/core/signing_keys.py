@@ -0,0 +1,90 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SigningKeySet:
+    """Ключи подписи JWT из каталога, kid - имя файла без .pem
+
+    Файл с закрытым ключом дает ключ подписи, файл только с открытым -
+    ключ, которым токены лишь проверяются (выведенный из оборота ключ,
+    токены которого еще не истекли). Подписывает ключ active_kid или,
+    если он не задан, последний по имени закрытый ключ. Ротация: положить
+    новый ключ во все экземпляры, затем сделать его активным, а старый
+    заменить открытым ключом до истечения выданных им токенов.
+    RSA ключи подписывают RS256, Ed25519 - EdDSA, поэтому при ротации
+    можно сменить и алгоритм. Каталог читается при первом обращении
+    и перечитывается методом load.
+    """
+
+    def __init__(self, keys_dir: Optional[str], active_kid: Optional[str]) -> None:
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self._private: Optional[dict] = None
+        self._active: tuple = ()
+        self._jwks: dict = {"keys": []}
+
+    def load(self) -> None:
+        """Читает ключи из каталога"""
+        from cryptography.hazmat.primitives.serialization import (
+            load_pem_private_key,
+            load_pem_public_key,
+        )
+
+        if not self.keys_dir:
+            raise RuntimeError("Для RS256 и EdDSA нужно указать JWT_KEYS_DIR")
+        private, public = {}, {}
+        for path in sorted(Path(self.keys_dir).glob("*.pem")):
+            data = path.read_bytes()
+            if b"PRIVATE KEY" in data:
+                private[path.stem] = load_pem_private_key(data, password=None)
+                public[path.stem] = private[path.stem].public_key()
+            else:
+                public[path.stem] = load_pem_public_key(data)
+        if not private:
+            raise RuntimeError(f"В каталоге {self.keys_dir} нет закрытых ключей")
+        if self.active_kid and self.active_kid not in private:
+            raise RuntimeError(f"Нет закрытого ключа {self.active_kid}")
+        kid = self.active_kid or max(private)
+        self._active = (kid, self.algorithm(private[kid]), private[kid])
+        self._private = private
+        self._jwks = {"keys": [self._to_jwk(kid, key) for kid, key in public.items()]}
+        logger.info("Загружены ключи подписи JWT: %s", ", ".join(public))
+
+    @staticmethod
+    def algorithm(key) -> str:
+        """Алгоритм подписи для типа ключа"""
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+        if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+            return "RS256"
+        if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            return "EdDSA"
+        raise RuntimeError(f"Неподдерживаемый тип ключа: {type(key).__name__}")
+
+    def _to_jwk(self, kid: str, public_key) -> dict:
+        from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+        algorithm = self.algorithm(public_key)
+        converter = RSAAlgorithm if algorithm == "RS256" else OKPAlgorithm
+        jwk = converter.to_jwk(public_key, as_dict=True)
+        return {**jwk, "kid": kid, "alg": algorithm, "use": "sig"}
+
+    def signing_key(self) -> tuple[str, str, object]:
+        """kid, алгоритм и закрытый ключ для подписи"""
+        if self._private is None:
+            self.load()
+        return self._active
+
+    def jwks(self) -> dict:
+        """Открытые ключи в формате JWKS"""
+        if self._private is None:
+            self.load()
+        return self._jwks
+
+    def reload_jwks(self) -> dict:
+        """Перечитывает каталог и возвращает JWKS"""
+        self.load()
+        return self._jwks
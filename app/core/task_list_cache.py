@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.config import settings
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class TaskListCache:
+    """Кеш сериализованных списков задач с версией на пользователя
+
+    Каждое изменение задач пользователя увеличивает его версию в Redis.
+    Ответы хранятся под ключом (пользователь, версия, параметры запроса)
+    в Redis и в LRU в памяти процесса, поэтому после изменения в любом
+    воркере старые записи просто перестают находиться.
+    """
+
+    VERSION_PREFIX = "tasks:version:"
+    LIST_PREFIX = "tasks:list:"
+
+    def __init__(self, enabled: bool, ttl: int, local_max_size: int) -> None:
+        self.enabled = enabled
+        self.ttl = ttl
+        self.local_max_size = local_max_size
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    @staticmethod
+    def params_digest(params: dict) -> str:
+        """Короткий хеш параметров запроса"""
+        raw = "&".join(f"{key}={params[key]}" for key in sorted(params))
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    def etag(self, user_id: int, version: int, params: dict) -> str:
+        """ETag списка задач"""
+        return f'W/"{user_id}-{version}-{self.params_digest(params)}"'
+
+    async def version(self, user_id: int) -> Optional[int]:
+        """Текущая версия задач пользователя, None если Redis недоступен"""
+        if not self.enabled:
+            return None
+        key = f"{self.VERSION_PREFIX}{user_id}"
+        try:
+            redis = await get_redis()
+            value = await redis.get(key)
+            if value is None:
+                # начальная версия от времени, чтобы после потери ключа
+                # не совпасть со старыми версиями в памяти воркеров
+                await redis.setnx(key, str(time.time_ns()))
+                value = await redis.get(key)
+            return int(value)
+        except Exception:
+            logger.warning("Redis недоступен, список задач не кешируется")
+            return None
+
+    async def bump(self, user_id: int) -> None:
+        """Увеличивает версию задач пользователя после изменения"""
+        if not self.enabled:
+            return
+        key = f"{self.VERSION_PREFIX}{user_id}"
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline()
+            pipe.set(key, time.time_ns(), nx=True)
+            pipe.incr(key)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Не удалось обновить версию задач пользователя %s", user_id)
+
+    def _key(self, user_id: int, version: int, params: dict) -> str:
+        return f"{self.LIST_PREFIX}{user_id}:{version}:{self.params_digest(params)}"
+
+    async def get(self, user_id: int, version: int, params: dict) -> Optional[bytes]:
+        """Закешированное тело ответа"""
+        key = self._key(user_id, version, params)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.local_hits += 1
+            return entry[1]
+
+        try:
+            redis = await get_redis()
+            body = await redis.get(key)
+        except Exception:
+            body = None
+        if body is None:
+            self.misses += 1
+            return None
+        body = body.encode()
+        self._put_local(key, body)
+        self.redis_hits += 1
+        return body
+
+    async def set(self, user_id: int, version: int, params: dict, body: bytes) -> None:
+        """Сохраняет тело ответа в оба уровня кеша"""
+        key = self._key(user_id, version, params)
+        self._put_local(key, body)
+        try:
+            redis = await get_redis()
+            await redis.setex(key, self.ttl, body.decode())
+        except Exception:
+            logger.debug("Redis недоступен, список задач кешируется только в памяти")
+
+    def _put_local(self, key: str, body: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.local_max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает локальный уровень кеша"""
+        self._entries.clear()
+
+    def metrics(self) -> dict:
+        """Счетчики попаданий"""
+        return {
+            "size": len(self._entries),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+task_list_cache = TaskListCache(
+    enabled=settings.TASKS_CACHE_ENABLED,
+    ttl=settings.TASKS_CACHE_TTL_SECONDS,
+    local_max_size=settings.TASKS_CACHE_LOCAL_MAX_SIZE,
+)
@@ -0,0 +1,111 @@
+"""Локальная проверка JWT по набору открытых ключей (JWKS)
+
+Модуль зависит только от PyJWT (с cryptography) и стандартной библиотеки,
+поэтому его можно скопировать в другой сервис и проверять токены этого
+API без обращения к нему:
+
+    verifier = TokenVerifier("https://tasks.example.com/.well-known/jwks.json")
+    payload = verifier.verify(token)
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from typing import Callable, Iterable, Optional, Union
+
+import jwt
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+
+class TokenVerifier:
+    """Проверка подписи JWT открытыми ключами с кешем по kid
+
+    source - адрес JWKS или функция, возвращающая JWKS словарем. Ключи
+    разбираются один раз и хранятся по kid. Токен с неизвестным kid
+    приводит к повторной загрузке набора, но не чаще min_refresh_interval
+    секунд: новые ключи подхватываются без перезапуска, а токены
+    с выдуманными kid не превращаются в поток запросов к источнику.
+    Набор перечитывается и по истечении max_age секунд.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Callable[[], dict]],
+        algorithms: Iterable[str] = ASYMMETRIC_ALGORITHMS,
+        min_refresh_interval: float = 30.0,
+        max_age: float = 3600.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self.source = source
+        self.algorithms = tuple(algorithms)
+        self.min_refresh_interval = min_refresh_interval
+        self.max_age = max_age
+        self.timeout = timeout
+        self.refreshes = 0
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._loaded_at = 0.0
+        self._attempted_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> dict:
+        if callable(self.source):
+            return self.source()
+        with urllib.request.urlopen(self.source, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def refresh(self) -> None:
+        """Загружает набор ключей заново"""
+        self._attempted_at = time.monotonic()
+        keys = {}
+        for data in self._fetch().get("keys", []):
+            kid = data.get("kid")
+            if not kid:
+                continue
+            try:
+                key = jwt.PyJWK(data)
+            except jwt.PyJWKError:
+                continue  # ключи неподдерживаемых типов пропускаются
+            if key.algorithm_name in self.algorithms:
+                keys[kid] = key
+        self._keys = keys
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def _stale(self, kid: str) -> bool:
+        if self._attempted_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._attempted_at < self.min_refresh_interval:
+            return False
+        return now - self._loaded_at >= self.max_age or kid not in self._keys
+
+    def get_key(self, kid: str) -> jwt.PyJWK:
+        """Открытый ключ по kid"""
+        if self._stale(kid):
+            with self._lock:
+                if self._stale(kid):
+                    try:
+                        self.refresh()
+                    except Exception:
+                        # источник недоступен: проверяем загруженными ранее ключами
+                        if not self._keys:
+                            raise
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Неизвестный kid: {kid}")
+        return key
+
+    def verify(self, token: str, **kwargs) -> dict:
+        """Проверяет подпись и срок действия токена и возвращает его payload
+
+        Алгоритм берется из ключа, а не из заголовка токена, поэтому
+        подделать токен сменой alg нельзя. Дополнительные аргументы
+        (audience, issuer, leeway) передаются в jwt.decode.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise jwt.InvalidTokenError("В заголовке токена нет kid")
+        key = self.get_key(kid)
+        return jwt.decode(token, key.key, algorithms=[key.algorithm_name], **kwargs)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials
 
 from core.dependencies import get_auth_service, security
+from core.login_throttle import login_throttle
 from schemas.user import (
     UserCreateSchema,
     UserLoginSchema,
@@ -35,11 +36,16 @@ async def register(
 )
 async def login(
     login_data: UserLoginSchema,
+    request: Request,
     response: Response,
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ):
     """Аунтификация пользователя"""
-    return await auth_service.authenticate_user(login_data, response)
+    client_ip = login_throttle.client_ip(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+    )
+    return await auth_service.authenticate_user(login_data, response, client_ip)
 
 
 @router.post("/refresh", summary="Обновление токенов", response_model=UserTokenSchema)
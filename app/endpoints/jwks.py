@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from core.config import settings
+from core.security import signing_keys
+
+router = APIRouter(tags=["authentication"])
+
+
+@router.get("/.well-known/jwks.json", summary="Открытые ключи подписи токенов")
+async def get_jwks():
+    """Открытые ключи для локальной проверки токенов другими сервисами"""
+    keys = {"keys": []} if settings.JWT_ALGORITHM == "HS256" else signing_keys.jwks()
+    return JSONResponse(keys, headers={"Cache-Control": "public, max-age=300"})
@@ -0,0 +1,65 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from core.config import settings
+from core.database import async_engine, replica_router
+from core.metrics import metrics_registry
+from core.pool import db_pool_stats
+from core.redis import redis_service
+
+metrics_security = HTTPBearer(auto_error=False)
+
+
+async def check_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security),
+) -> None:
+    """Доступ к служебным эндпоинтам только по METRICS_TOKEN
+
+    Без заданного токена эндпоинты не отдаются совсем.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неверный токен доступа к метрикам",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(tags=["metrics"], dependencies=[Depends(check_metrics_token)])
+
+
+@router.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики приложения в текстовом формате Prometheus"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/pool-stats", include_in_schema=False)
+async def get_pool_stats():
+    """Состояние пулов соединений этого воркера
+
+    Итоговое число соединений с Postgres - это db.max_connections_per_worker,
+    умноженное на число воркеров uvicorn.
+    """
+    return {
+        "pid": os.getpid(),
+        "db": {
+            **(db_pool_stats(async_engine) or {}),
+            "max_connections_per_worker": settings.DB_POOL_SIZE
+            + settings.DB_MAX_OVERFLOW,
+        },
+        "replicas": replica_router.metrics(),
+        "redis": redis_service.pool_stats(),
+    }
@@ -1,9 +1,20 @@
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
+from core.config import settings
 from core.dependencies import get_current_user, get_task_service
-from schemas.task import TaskBaseSchema, TaskResponseSchema
+from schemas.task import (
+    TaskBaseSchema,
+    TaskBulkResultSchema,
+    TaskBulkUpdateSchema,
+    TaskCalendarSchema,
+    TaskFilterSchema,
+    TaskPageSchema,
+    TaskResponseSchema,
+)
 from schemas.user import UserResponseSchema
 from services.task_service import TaskService
 
@@ -25,10 +36,164 @@ async def create_task(
     return await task_service.create_task(task_data, current_user.id)
 
 
-@router.get("", summary="Получить все задачи", response_model=List[TaskResponseSchema])
+@router.post(
+    "/bulk",
+    response_model=List[TaskResponseSchema],
+    summary="Создать задачи пакетом",
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_tasks_bulk(
+    tasks_data: List[TaskBaseSchema],
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Создание нескольких задач одним запросом и одной транзакцией"""
+    if len(tasks_data) > settings.TASKS_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Не более {settings.TASKS_BULK_MAX_SIZE} задач за один запрос",
+        )
+    return await task_service.create_tasks(tasks_data, current_user.id)
+
+
+def _check_ids_size(ids: Optional[List[int]]) -> None:
+    """Ограничение длины списка id задач"""
+    if ids is not None and len(ids) > settings.TASKS_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Не более {settings.TASKS_BULK_MAX_SIZE} id задач за один запрос",
+        )
+
+
+@router.patch("", summary="Изменить задачи", response_model=TaskBulkResultSchema)
+async def update_tasks(
+    data: TaskBulkUpdateSchema,
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Изменение переданных полей у задач из отбора по id и периоду сроков
+
+    Выполняется одним запросом UPDATE к базе, задачи других
+    пользователей не затрагиваются.
+    """
+    _check_ids_size(data.filter.ids)
+    try:
+        return await task_service.update_tasks(
+            data.filter, data.update, current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.delete("", summary="Удалить задачи", response_model=TaskBulkResultSchema)
+async def delete_tasks(
+    ids: Optional[List[int]] = Query(None, description="Id задач"),
+    due_from: Optional[datetime] = Query(None, description="Срок не раньше"),
+    due_to: Optional[datetime] = Query(None, description="Срок раньше (не включая)"),
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Удаление задач из отбора по id и периоду сроков одним запросом DELETE"""
+    _check_ids_size(ids)
+    task_filter = TaskFilterSchema(ids=ids, due_from=due_from, due_to=due_to)
+    try:
+        return await task_service.delete_tasks(task_filter, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("", summary="Получить задачи", response_model=TaskPageSchema)
 async def get_tasks(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    due_from: Optional[datetime] = Query(None, description="Срок не раньше"),
+    due_to: Optional[datetime] = Query(None, description="Срок раньше (не включая)"),
+    overdue: Optional[bool] = Query(None, description="Только просроченные или нет"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Получение задач пользователя постранично, по возрастанию due_date
+
+    Ответ содержит ETag, при совпадении If-None-Match возвращается 304
+    без обращения к базе данных.
+    """
+    try:
+        etag, body = await task_service.get_user_tasks_json(
+            current_user.id,
+            if_none_match,
+            limit=limit,
+            cursor=cursor,
+            due_from=due_from,
+            due_to=due_to,
+            overdue=overdue,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+    if body is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", summary="Поиск задач", response_model=TaskPageSchema)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Поиск по заголовку и описанию задач, по убыванию релевантности
+
+    Слова запроса ищутся как префиксы, совпадения в заголовке важнее
+    совпадений в описании.
+    """
+    try:
+        body = await task_service.search_tasks_json(
+            current_user.id, q, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/calendar",
+    summary="Количество задач по дням или неделям",
+    response_model=TaskCalendarSchema,
+)
+async def get_tasks_calendar(
+    date_from: date = Query(..., description="Первый день периода"),
+    date_to: date = Query(..., description="Последний день периода"),
+    tz: str = Query("UTC", description="Часовой пояс IANA, например Europe/Moscow"),
+    granularity: Literal["day", "week"] = Query("day"),
+    current_user: UserResponseSchema = Depends(get_current_user),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Агрегированное по срокам количество задач пользователя"""
+    try:
+        return await task_service.get_calendar(
+            current_user.id, date_from, date_to, tz, granularity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export", summary="Выгрузить все задачи")
+async def export_tasks(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
     current_user: UserResponseSchema = Depends(get_current_user),
     task_service: TaskService = Depends(get_task_service),
 ):
-    """Получение всез задач пользователя"""
-    return await task_service.get_user_tasks(current_user.id)
+    """Потоковая выгрузка всех задач пользователя в NDJSON или CSV"""
+    return StreamingResponse(
+        task_service.export_tasks(current_user.id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"'
+        },
+    )
@@ -3,16 +3,32 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from core.dependencies import async_engine, async_session, shutdown_event, startup_event
+from core.boot import check_schema_revision
+from core.config import settings
+from core.database import async_engine, async_session
+from core.dependencies import shutdown_event, startup_event
+from core.observability import MetricsMiddleware
+from core.query_stats import QueryStatsMiddleware
+from endpoints import jwks, metrics
 from endpoints.api import routers
 from models import Base
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if settings.BOOT_MODE == "production":
+        await check_schema_revision(async_engine)
+    else:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    # startup_event запускает и фоновые задачи воркера: подписку на
+    # инвалидацию кеша пользователей, синхронизацию отзывов, напоминания.
+    # Обработчики on_startup при заданном lifespan Starlette не вызывает.
+    await startup_event()
+    try:
         yield
+    finally:
+        await shutdown_event()
         await async_session().close()
         await async_engine.dispose()
 
@@ -31,9 +47,13 @@ def create_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    application.add_event_handler("startup", startup_event)
-    application.add_event_handler("shutdown", shutdown_event)
     application.include_router(routers)
+    application.include_router(jwks.router)
+    if settings.SQL_TIMING_ENABLED:
+        application.add_middleware(QueryStatsMiddleware)
+    if settings.METRICS_ENABLED:
+        application.add_middleware(MetricsMiddleware)
+        application.include_router(metrics.router)
 
     return application
 
@@ -1,3 +1,4 @@
+from models import task_search  # noqa: F401 - DDL полнотекстового поиска
 from models.base import Base
 from models.task import Task
 from models.user import User
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -10,6 +10,9 @@ class Task(Base):
     """Модель задачи"""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(nullable=False)
@@ -0,0 +1,53 @@
+from sqlalchemy import DDL, event
+
+from .task import Task
+
+# Конфигурация simple: без стемминга, одинаково для русского и английского
+SEARCH_CONFIG = "simple"
+
+# Postgres: tsvector из заголовка (вес A) и описания (вес B) и триграммы
+# заголовка для поиска по префиксу и с опечатками. btree_gin добавляет
+# user_id в GIN индексы, чтобы поиск не перебирал задачи всех пользователей.
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_tasks_user_id_search_vector ON tasks "
+    "USING gin (user_id, search_vector)",
+    "CREATE INDEX ix_tasks_user_id_title_trgm ON tasks "
+    "USING gin (user_id, title gin_trgm_ops)",
+)
+
+# SQLite: внешняя FTS5 таблица над tasks, синхронизируется триггерами
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, "
+    "content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_update AFTER UPDATE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+)
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
@@ -1,30 +1,342 @@
-from typing import List
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Row,
+    Select,
+    Update,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.task import Task
+from models.task_search import SEARCH_CONFIG
+
+# порядок полей как в TaskResponseSchema
+TASK_LIST_COLUMNS = (
+    Task.title,
+    Task.description,
+    Task.due_date,
+    Task.id,
+    Task.user_id,
+    Task.created_at,
+)
 
 
 class TaskRepository:
     """Репозиторий для работы с задачами"""
 
-    def __init__(self, db_session: AsyncSession) -> None:
+    def __init__(
+        self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None
+    ) -> None:
         self.db_session = db_session
+        self.read_session = read_session or db_session
 
     async def get_by_user_id(
-        self, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        user_id: int,
+        limit: int = 100,
+        after: Optional[tuple[datetime, int]] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
     ) -> List[Task]:
-        """Получение всех задач пользователя"""
-        result = await self.db_session.execute(
-            select(Task).where(Task.user_id == user_id).offset(skip).limit(limit)
+        """Получение страницы задач пользователя в порядке (due_date, id)"""
+        query = self._page_query(
+            select(Task), user_id, limit, after, due_from, due_to, overdue
         )
+        result = await self.read_session.execute(query)
         return list(result.scalars().all())
 
+    async def get_rows_by_user_id(
+        self,
+        user_id: int,
+        limit: int = 100,
+        after: Optional[tuple[datetime, int]] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
+    ) -> List[Row]:
+        """Страница задач пользователя кортежами колонок TASK_LIST_COLUMNS
+
+        Не создает ORM объекты, для сериализации ответа без валидации.
+        """
+        query = self._page_query(
+            select(*TASK_LIST_COLUMNS), user_id, limit, after, due_from, due_to, overdue
+        )
+        result = await self.read_session.execute(query)
+        return list(result.all())
+
+    @staticmethod
+    def _page_query(
+        query: Select,
+        user_id: int,
+        limit: int,
+        after: Optional[tuple[datetime, int]],
+        due_from: Optional[datetime],
+        due_to: Optional[datetime],
+        overdue: Optional[bool],
+    ) -> Select:
+        """Фильтры и keyset пагинация страницы задач
+
+        Секции Postgres отсекаются по нижней границе due_date: due_from,
+        overdue=False или курсор. Первая страница без них читает все секции.
+        """
+        query = query.where(Task.user_id == user_id)
+        if due_from is not None:
+            query = query.where(Task.due_date >= due_from)
+        if due_to is not None:
+            query = query.where(Task.due_date < due_to)
+        if overdue is not None:
+            now = datetime.now(timezone.utc)
+            query = query.where(
+                Task.due_date < now if overdue else Task.due_date >= now
+            )
+        if after is not None:
+            # due_date >= отдельно от сравнения кортежей: по нему Postgres
+            # отсекает секции с прошедшими месяцами
+            query = query.where(
+                Task.due_date >= after[0],
+                tuple_(Task.due_date, Task.id) > tuple_(*after),
+            )
+        return query.order_by(Task.due_date, Task.id).limit(limit)
+
+    async def search_rows(
+        self,
+        user_id: int,
+        terms: List[str],
+        limit: int = 20,
+        after: Optional[tuple[float, int]] = None,
+    ) -> List[Row]:
+        """Поиск задач пользователя по словам из заголовка и описания
+
+        Кортежи колонок TASK_LIST_COLUMNS и rank в порядке убывания
+        релевантности (rank, id). Каждое слово ищется как префикс. В Postgres
+        задачи находятся по tsvector или по сходству триграмм заголовка
+        с запросом (опечатки), в SQLite - через FTS5 без учета опечаток.
+        """
+        if self.read_session.get_bind().dialect.name == "sqlite":
+            fts = table("tasks_fts")
+            fts_query = " ".join(f'"{term}"*' for term in terms)
+            rank = (-func.bm25(literal_column("tasks_fts"), 10.0, 1.0)).label("rank")
+            query = (
+                select(*TASK_LIST_COLUMNS, rank)
+                .select_from(fts)
+                .join(Task, Task.id == literal_column("tasks_fts.rowid"))
+                .where(literal_column("tasks_fts").op("MATCH")(fts_query))
+            )
+        else:
+            phrase = " ".join(terms)
+            ts_query = func.to_tsquery(
+                SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms)
+            )
+            search_vector = literal_column("tasks.search_vector", TSVECTOR)
+            rank = (
+                func.ts_rank_cd(search_vector, ts_query)
+                + func.word_similarity(phrase, Task.title)
+            ).label("rank")
+            query = select(*TASK_LIST_COLUMNS, rank).where(
+                or_(
+                    search_vector.op("@@")(ts_query),
+                    literal(phrase).op("<%")(Task.title),
+                )
+            )
+        query = query.where(Task.user_id == user_id)
+        if after is not None:
+            query = query.where(tuple_(rank, Task.id) < tuple_(*after))
+        query = query.order_by(rank.desc(), Task.id.desc()).limit(limit)
+        result = await self.read_session.execute(query)
+        return list(result.all())
+
+    async def stream_by_user_id(
+        self, user_id: int, batch_size: int = 1000
+    ) -> AsyncIterator[List[Row]]:
+        """Потоковое чтение всех задач пользователя пачками кортежей
+
+        Использует серверный курсор и не создает ORM объекты.
+        """
+        query = (
+            select(
+                Task.id,
+                Task.title,
+                Task.description,
+                Task.due_date,
+                Task.user_id,
+                Task.created_at,
+            )
+            .where(Task.user_id == user_id)
+            .order_by(Task.due_date, Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.read_session.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+    async def count_by_period(
+        self,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        granularity: str,
+        tz_name: str,
+    ) -> List[tuple[date, int]]:
+        """Количество задач по дням или ISO неделям в часовом поясе tz_name
+
+        Отбор идет по диапазону due_date в [start, end) по индексу
+        (user_id, due_date, id), группировка выполняется в базе.
+        """
+        if self.read_session.get_bind().dialect.name == "sqlite":
+            # В SQLite нет часовых поясов: используется смещение на начало окна
+            offset = int(ZoneInfo(tz_name).utcoffset(start).total_seconds())
+            modifiers = [f"{offset:+d} seconds"]
+            if granularity == "week":
+                modifiers += ["weekday 0", "-6 days"]
+            period = func.date(Task.due_date, *modifiers)
+        else:
+            local_due_date = func.timezone(tz_name, Task.due_date)
+            period = cast(func.date_trunc(granularity, local_due_date), Date)
+
+        query = (
+            select(period.label("period"), func.count().label("count"))
+            .where(
+                Task.user_id == user_id,
+                Task.due_date >= start,
+                Task.due_date < end,
+            )
+            .group_by("period")
+            .order_by("period")
+        )
+        result = await self.read_session.execute(query)
+        return [(row.period, row.count) for row in result]
+
     async def create_task(self, task_data: dict) -> Task:
         """Созаданик задачи"""
-        db_task = Task(**task_data)
-        self.db_session.add(db_task)
+        db_task = await self.db_session.scalar(
+            insert(Task).values(**task_data).returning(Task)
+        )
         await self.db_session.commit()
-        await self.db_session.refresh(db_task)
         return db_task
+
+    async def create_tasks(self, tasks_data: List[dict]) -> List[Task]:
+        """Создание задач одним многострочным INSERT ... RETURNING"""
+        if not tasks_data:
+            return []
+        result = await self.db_session.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True), tasks_data
+        )
+        tasks = list(result.all())
+        await self.db_session.commit()
+        return tasks
+
+    @staticmethod
+    def _filter_conditions(
+        user_id: int,
+        ids: Optional[List[int]],
+        due_from: Optional[datetime],
+        due_to: Optional[datetime],
+    ) -> List[ColumnElement]:
+        """Условия отбора задач пользователя по id и окну сроков"""
+        conditions = [Task.user_id == user_id]
+        if ids is not None:
+            conditions.append(Task.id.in_(ids))
+        if due_from is not None:
+            conditions.append(Task.due_date >= due_from)
+        if due_to is not None:
+            conditions.append(Task.due_date < due_to)
+        return conditions
+
+    def _update_query(
+        self,
+        user_id: int,
+        values: dict,
+        ids: Optional[List[int]],
+        due_from: Optional[datetime],
+        due_to: Optional[datetime],
+    ) -> Update:
+        """UPDATE задач пользователя из отбора без синхронизации сессии"""
+        return (
+            update(Task)
+            .where(*self._filter_conditions(user_id, ids, due_from, due_to))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def update_tasks(
+        self,
+        user_id: int,
+        values: dict,
+        ids: Optional[List[int]] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+    ) -> int:
+        """Изменение задач пользователя одним UPDATE, возвращает число задач
+
+        Задачи не загружаются в сессию и не возвращаются из базы.
+        """
+        result = await self.db_session.execute(
+            self._update_query(user_id, values, ids, due_from, due_to)
+        )
+        await self.db_session.commit()
+        return result.rowcount
+
+    async def update_tasks_returning(
+        self,
+        user_id: int,
+        values: dict,
+        ids: Optional[List[int]] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Row]]:
+        """Изменение задач одним UPDATE ... RETURNING id, user_id, due_date
+
+        Для переноса срока, когда по измененным задачам нужно
+        перепланировать напоминания. Строки читаются потоком пачками,
+        изменения фиксируются после чтения последней пачки.
+        """
+        query = self._update_query(user_id, values, ids, due_from, due_to).returning(
+            Task.id, Task.user_id, Task.due_date
+        )
+        result = await self.db_session.stream(query)
+        async for rows in result.partitions(batch_size):
+            yield rows
+        await self.db_session.commit()
+
+    async def delete_tasks(
+        self,
+        user_id: int,
+        ids: Optional[List[int]] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[int]]:
+        """Удаление задач одним DELETE ... RETURNING id, id удаленных пачками
+
+        Результат читается потоком, поэтому память не растет с размером
+        отбора. Изменения фиксируются после чтения последней пачки.
+        """
+        query = (
+            delete(Task)
+            .where(*self._filter_conditions(user_id, ids, due_from, due_to))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db_session.stream(query)
+        async for rows in result.partitions(batch_size):
+            yield [row.id for row in rows]
+        await self.db_session.commit()
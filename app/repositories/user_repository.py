@@ -5,23 +5,48 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User
+from repositories.base import dialect_insert
 
 
 class UserRepository:
     """Репозиторий для работы с пользователем"""
 
-    def __init__(self, db_session: AsyncSession) -> None:
+    def __init__(
+        self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None
+    ) -> None:
         self.db_session = db_session
+        self.read_session = read_session or db_session
 
-    async def get_by_email(self, email: EmailStr) -> Optional[User]:
-        """Получение пользователя по email"""
-        result = await self.db_session.execute(select(User).filter(User.email == email))
-        return result.scalar()
+    async def get_by_email(
+        self, email: EmailStr, primary_fallback: bool = True
+    ) -> Optional[User]:
+        """Получение пользователя по email
 
-    async def create_user(self, user_data: dict) -> User:
-        """Создание нового пользователя"""
-        db_user = User(**user_data)
-        self.db_session.add(db_user)
+        Пользователь, которого еще нет на реплике, ищется в основной базе.
+        Без primary_fallback поиск идет только по реплике: вход с
+        неизвестным email не должен стоить двух запросов.
+        """
+        query = select(User).filter(User.email == email)
+        user = (await self.read_session.execute(query)).scalar()
+        if (
+            user is None
+            and primary_fallback
+            and self.read_session is not self.db_session
+        ):
+            user = (await self.db_session.execute(query)).scalar()
+        return user
+
+    async def create_user(self, user_data: dict) -> Optional[User]:
+        """Создание нового пользователя
+
+        Возвращает None, если пользователь с таким email уже существует.
+        """
+        query = (
+            dialect_insert(self.db_session, User)
+            .values(**user_data)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        )
+        db_user = await self.db_session.scalar(query)
         await self.db_session.commit()
-        await self.db_session.refresh(db_user)
         return db_user
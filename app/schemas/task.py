@@ -1,7 +1,10 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing_extensions import TypedDict
+
+from core.config import settings
 
 
 class TaskBaseSchema(BaseModel):
@@ -20,3 +23,86 @@ class TaskResponseSchema(TaskBaseSchema):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskFilterSchema(BaseModel):
+    """Отбор задач пользователя для пакетного изменения или удаления
+
+    Длина ids ограничена: каждый id - параметр запроса к базе.
+    """
+
+    ids: Optional[List[int]] = Field(None, max_length=settings.TASKS_BULK_MAX_SIZE)
+    due_from: Optional[datetime] = None
+    due_to: Optional[datetime] = None
+
+
+class TaskPatchSchema(BaseModel):
+    """Частичное изменение задачи, меняются только переданные поля"""
+
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+
+    @field_validator("title", "due_date")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Поле не может быть пустым")
+        return value
+
+
+class TaskBulkUpdateSchema(BaseModel):
+    """Пакетное изменение задач по отбору"""
+
+    filter: TaskFilterSchema
+    update: TaskPatchSchema
+
+
+class TaskBulkResultSchema(BaseModel):
+    """Количество измененных или удаленных задач"""
+
+    count: int
+
+
+class TaskPageSchema(BaseModel):
+    """Страница задач с курсором на следующую страницу"""
+
+    items: List[TaskResponseSchema]
+    next_cursor: Optional[str] = None
+
+
+class TaskRowDict(TypedDict):
+    """Задача из колонок запроса, поля в порядке TaskResponseSchema"""
+
+    title: str
+    description: Optional[str]
+    due_date: datetime
+    id: int
+    user_id: int
+    created_at: datetime
+
+
+class TaskPageDict(TypedDict):
+    """Страница задач из колонок запроса"""
+
+    items: List[TaskRowDict]
+    next_cursor: Optional[str]
+
+
+# сериализация в JSON без валидации, формат совпадает с TaskPageSchema
+task_page_adapter = TypeAdapter(TaskPageDict)
+
+
+class TaskCalendarBucketSchema(BaseModel):
+    """Количество задач за день или неделю"""
+
+    period: date
+    count: int
+
+
+class TaskCalendarSchema(BaseModel):
+    """Количество задач по периодам в часовом поясе пользователя"""
+
+    granularity: Literal["day", "week"]
+    timezone: str
+    buckets: List[TaskCalendarBucketSchema]
@@ -1,17 +1,23 @@
 from datetime import datetime, timezone
+from typing import Optional
 
-import jwt
 from fastapi import HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials
 from jwt import PyJWTError as JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from core.hashing import HashingQueueFullError
+from core.login_throttle import login_throttle
+from core.principal_cache import principal_cache
 from core.redis import get_redis
+from core.revocation import revocation_registry
 from core.security import (
     create_access_token,
     create_refresh_token,
+    decode_token,
     get_password_hash,
+    verify_dummy_password,
     verify_password,
     verify_token,
 )
@@ -24,12 +30,37 @@ from schemas.user import (
     UserTokenSchema,
 )
 
+# KEYS: refresh_token:<email>, ключ отзыва старого токена, поток отзывов,
+#       ключ старого токена в кеше пользователей
+# ARGV: старый токен, новый токен, TTL нового, TTL отзыва, jti, exp,
+#       MINID потока, канал инвалидации, sha256 старого токена
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return -1
+end
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SETEX', KEYS[1], ARGV[3], ARGV[2])
+redis.call('SETEX', KEYS[2], ARGV[4], '1')
+if ARGV[5] ~= '' then
+    redis.call('XADD', KEYS[3], 'MINID', '~', ARGV[7], '*', 'jti', ARGV[5], 'exp', ARGV[6])
+end
+redis.call('DEL', KEYS[4])
+redis.call('PUBLISH', ARGV[8], ARGV[9])
+return 1
+"""
+
 
 class AuthService:
     """Сервис для работы с аунтификацией"""
 
-    def __init__(self, db_session: AsyncSession) -> None:
-        self.user_repository = UserRepository(db_session=db_session)
+    def __init__(
+        self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None
+    ) -> None:
+        self.user_repository = UserRepository(
+            db_session=db_session, read_session=read_session
+        )
         self.redis = None
 
     async def _get_redis(self):
@@ -40,29 +71,52 @@ class AuthService:
 
     async def register_user(self, user_data: UserCreateSchema) -> UserResponseSchema:
         """Регистрация пользователя"""
-        existing_user = await self.user_repository.get_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Пользователь с таким email уже зарегистрирован",
-            )
-
-        hashed_password = await get_password_hash(user_data.password)
+        try:
+            hashed_password = await get_password_hash(user_data.password)
+        except HashingQueueFullError:
+            raise self._hashing_busy_error()
         user_dict = user_data.model_dump()
         user_dict["password_hash"] = hashed_password
         del user_dict["password"]
 
         user = await self.user_repository.create_user(user_dict)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Пользователь с таким email уже зарегистрирован",
+            )
         return UserResponseSchema.model_validate(user)
 
     async def authenticate_user(
-        self, login_data: UserLoginSchema, response: Response
+        self,
+        login_data: UserLoginSchema,
+        response: Response,
+        client_ip: Optional[str] = None,
     ) -> UserTokenSchema:
         """Аунтефикация пользователя"""
-        user = await self.user_repository.get_by_email(login_data.email)
-        if not user or not await verify_password(
-            login_data.password, user.password_hash
-        ):
+        retry_after = await login_throttle.check(login_data.email, client_ip)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Слишком много попыток входа, повторите попытку позже",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        # только реплика: зарегистрированный в пределах ее задержки
+        # пользователь получит 401 и повторит вход
+        user = await self.user_repository.get_by_email(
+            login_data.email, primary_fallback=False
+        )
+        try:
+            if user is None:
+                is_valid = await verify_dummy_password(login_data.password)
+            else:
+                is_valid = await verify_password(
+                    login_data.password, user.password_hash
+                )
+        except HashingQueueFullError:
+            raise self._hashing_busy_error()
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Неверные учетные данные",
@@ -86,18 +140,11 @@ class AuthService:
 
     async def refresh_tokens(self, request: Request, response: Response):
         """Обновление токенов"""
-        redis = await self._get_redis()
         refresh_token = request.cookies.get("refresh_token")
 
         if not refresh_token:
             raise HTTPException(status_code=401, detail="Токен обновления отстуствует")
 
-        if await redis.exists(f"blacklist:{refresh_token}"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен обновления отозван",
-            )
-
         payload = await verify_token(refresh_token)
         if not payload or payload.get("type") != "refresh":
             raise HTTPException(
@@ -111,19 +158,23 @@ class AuthService:
                 detail="Неверная структура токена",
             )
 
-        stored_token = await redis.get(f"refresh_token:{email}")
-        if stored_token != refresh_token:
+        new_access_token = await create_access_token(data={"sub": email})
+        new_refresh_token = await create_refresh_token(data={"sub": email})
+
+        rotated = await self._rotate_refresh_token(
+            email, refresh_token, payload, new_refresh_token
+        )
+        if rotated < 0:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Токен обновления отозван",
+            )
+        if rotated == 0:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Токены обновления не совпадают",
             )
 
-        new_access_token = await create_access_token(data={"sub": email})
-        new_refresh_token = await create_refresh_token(data={"sub": email})
-
-        await self._store_refresh_token(email, new_refresh_token)
-        await self._add_to_blacklist(refresh_token, payload.get("exp"))
-
         response.set_cookie(
             key="refresh_token",
             value=new_refresh_token,
@@ -163,46 +214,106 @@ class AuthService:
 
         return UserLogoutSchema(message="Successfully logged out")
 
-    async def is_token_blacklisted(self, token: str) -> bool:
-        """Проверка токена в черном списке"""
+    async def is_token_revoked(self, token: str, payload: dict) -> bool:
+        """Проверка отзыва токена по jti"""
         try:
+            jti = payload.get("jti")
+            if jti:
+                return await revocation_registry.is_revoked(jti)
+            # токены, выпущенные до появления jti
             redis = await self._get_redis()
-            key = f"blacklist:{token}"
-            exists = await redis.exists(key)
-            return exists
+            return bool(await redis.exists(f"blacklist:{token}"))
         except Exception:
             return False
 
+    @staticmethod
+    def revocation_key(token: str, payload: dict) -> str:
+        """Ключ Redis, появление которого означает отзыв токена"""
+        jti = payload.get("jti")
+        if jti:
+            return revocation_registry.key(jti)
+        return f"blacklist:{token}"
+
+    @staticmethod
+    def _hashing_busy_error() -> HTTPException:
+        """Ошибка при переполненной очереди хеширования"""
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите попытку позже",
+            headers={"Retry-After": "1"},
+        )
+
     async def _store_refresh_token(self, email: str, refresh_token: str):
         """Сохраняет refresh token в Redis с TTL"""
         redis = await self._get_redis()
         expire_seconds = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
         await redis.setex(f"refresh_token:{email}", expire_seconds, refresh_token)
 
-    async def _add_to_blacklist(self, token: str, exp_timestamp: int):
-        """Добавляет токен в черный список с TTL до истечения"""
-        if exp_timestamp:
+    async def _rotate_refresh_token(
+        self, email: str, old_token: str, payload: dict, new_token: str
+    ) -> int:
+        """Атомарно меняет refresh token и отзывает старый за один round trip
+
+        Возвращает 1 при успехе, 0 если старый токен уже не актуален,
+        -1 если старый токен отозван.
+        """
+        redis = await self._get_redis()
+        now = datetime.now(timezone.utc).timestamp()
+        exp_timestamp = payload["exp"]
+        digest = principal_cache.digest(old_token)
+        result = await redis.run_script(
+            ROTATE_REFRESH_TOKEN_SCRIPT,
+            keys=[
+                f"refresh_token:{email}",
+                self.revocation_key(old_token, payload),
+                revocation_registry.STREAM,
+                f"{principal_cache.KEY_PREFIX}{digest}",
+            ],
+            args=[
+                old_token,
+                new_token,
+                settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+                max(1, int(exp_timestamp - now)),
+                payload.get("jti", ""),
+                int(exp_timestamp),
+                revocation_registry.stream_min_id(),
+                principal_cache.CHANNEL,
+                digest,
+            ],
+        )
+        if result == 1:
+            if payload.get("jti"):
+                revocation_registry.mark_revoked(payload["jti"])
+            principal_cache.drop_local(old_token)
+        return int(result)
+
+    async def _add_to_blacklist(self, token: str, payload: dict):
+        """Отзывает токен до его истечения"""
+        exp_timestamp = payload.get("exp")
+        if not exp_timestamp:
+            return
+        jti = payload.get("jti")
+        if jti:
+            await revocation_registry.revoke(jti, exp_timestamp)
+        else:
             current_time = datetime.now(timezone.utc).timestamp()
             ttl = max(1, int(exp_timestamp - current_time))
             redis_client = await get_redis()
             await redis_client.setex(f"blacklist:{token}", ttl, "revoked")
+        await principal_cache.invalidate(token)
 
     async def _add_access_token_to_blacklist(self, token: str):
         """Добавляет access token в черный список"""
         try:
-            payload = jwt.decode(
-                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-            )
-            await self._add_to_blacklist(token, payload.get("exp"))
+            payload = decode_token(token)
+            await self._add_to_blacklist(token, payload)
         except JWTError:
             pass
 
     async def _add_refresh_token_to_blacklist(self, token: str):
         """Добавляет refresh token в черный список"""
         try:
-            payload = jwt.decode(
-                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-            )
-            await self._add_to_blacklist(token, payload.get("exp"))
+            payload = decode_token(token)
+            await self._add_to_blacklist(token, payload)
         except JWTError:
             pass
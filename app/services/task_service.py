@@ -1,14 +1,47 @@
-from typing import List
+import csv
+import io
+import json
+import re
+from collections.abc import AsyncIterator
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from core.database import replica_router
+from core.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+from core.reminders import reminder_scheduler
+from core.task_list_cache import task_list_cache
 from repositories.task_repository import TaskRepository
-from schemas.task import TaskBaseSchema, TaskResponseSchema
+from schemas.task import (
+    TaskBaseSchema,
+    TaskBulkResultSchema,
+    TaskCalendarBucketSchema,
+    TaskCalendarSchema,
+    TaskFilterSchema,
+    TaskPageSchema,
+    TaskPatchSchema,
+    TaskResponseSchema,
+    task_page_adapter,
+)
+
+CALENDAR_MAX_DAYS = 731
+EXPORT_COLUMNS = ("id", "title", "description", "due_date", "user_id", "created_at")
+SEARCH_TERM = re.compile(r"\w+")
+SEARCH_MAX_TERMS = 8
 
 
 class TaskService:
     """Сервис для работы с задачами"""
 
-    def __init__(self, db_session) -> None:
-        self.task_repository = TaskRepository(db_session=db_session)
+    def __init__(self, db_session, read_session=None) -> None:
+        self.task_repository = TaskRepository(
+            db_session=db_session, read_session=read_session
+        )
 
     async def create_task(
         self, task_data: TaskBaseSchema, user_id: int
@@ -17,9 +50,280 @@ class TaskService:
         task_dict = task_data.model_dump()
         task_dict["user_id"] = user_id
         task = await self.task_repository.create_task(task_dict)
+        await self._after_write(user_id)
+        await reminder_scheduler.schedule([task])
         return TaskResponseSchema.model_validate(task)
 
-    async def get_user_tasks(self, user_id: int) -> List[TaskResponseSchema]:
-        """Получение задач пользователя"""
-        tasks = await self.task_repository.get_by_user_id(user_id)
+    async def create_tasks(
+        self, tasks_data: List[TaskBaseSchema], user_id: int
+    ) -> List[TaskResponseSchema]:
+        """Пакетное создание задач"""
+        rows = [{**task.model_dump(), "user_id": user_id} for task in tasks_data]
+        tasks = await self.task_repository.create_tasks(rows)
+        await self._after_write(user_id)
+        await reminder_scheduler.schedule(tasks)
         return [TaskResponseSchema.model_validate(task) for task in tasks]
+
+    async def update_tasks(
+        self, task_filter: TaskFilterSchema, patch: TaskPatchSchema, user_id: int
+    ) -> TaskBulkResultSchema:
+        """Пакетное изменение задач пользователя по отбору"""
+        values = patch.model_dump(exclude_unset=True)
+        if not values:
+            raise ValueError("Не указаны поля для изменения")
+        kwargs = _filter_kwargs(task_filter)
+        if "due_date" in values:
+            # новые сроки нужны для напоминаний, только тогда задачи возвращаются
+            count = 0
+            async for rows in self.task_repository.update_tasks_returning(
+                user_id, values, **kwargs
+            ):
+                count += len(rows)
+                await reminder_scheduler.schedule(rows)
+        else:
+            count = await self.task_repository.update_tasks(user_id, values, **kwargs)
+        if count:
+            await self._after_write(user_id)
+        return TaskBulkResultSchema(count=count)
+
+    async def delete_tasks(
+        self, task_filter: TaskFilterSchema, user_id: int
+    ) -> TaskBulkResultSchema:
+        """Пакетное удаление задач пользователя по отбору"""
+        kwargs = _filter_kwargs(task_filter)
+        count = 0
+        async for ids in self.task_repository.delete_tasks(user_id, **kwargs):
+            count += len(ids)
+            await reminder_scheduler.cancel((task_id, user_id) for task_id in ids)
+        if count:
+            await self._after_write(user_id)
+        return TaskBulkResultSchema(count=count)
+
+    @staticmethod
+    async def _after_write(user_id: int) -> None:
+        """Сброс кеша списка и отметка для чтения своих записей"""
+        await task_list_cache.bump(user_id)
+        await replica_router.mark_write(user_id)
+
+    async def get_user_tasks(
+        self,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
+    ) -> TaskPageSchema:
+        """Получение страницы задач пользователя"""
+        after = decode_cursor(cursor) if cursor else None
+        tasks = await self.task_repository.get_by_user_id(
+            user_id,
+            limit=limit + 1,
+            after=after,
+            due_from=due_from,
+            due_to=due_to,
+            overdue=overdue,
+        )
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].due_date, tasks[-1].id)
+        return TaskPageSchema(
+            items=[TaskResponseSchema.model_validate(task) for task in tasks],
+            next_cursor=next_cursor,
+        )
+
+    async def get_user_tasks_page_json(
+        self,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
+    ) -> bytes:
+        """Страница задач пользователя сразу в JSON
+
+        Выбираются только нужные колонки, ответ собирается из кортежей и
+        кодируется TypeAdapter без валидации и без ORM объектов.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.task_repository.get_rows_by_user_id(
+            user_id,
+            limit=limit + 1,
+            after=after,
+            due_from=due_from,
+            due_to=due_to,
+            overdue=overdue,
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].due_date, rows[-1].id)
+        return task_page_adapter.dump_json(
+            {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+        )
+
+    async def get_user_tasks_json(
+        self,
+        user_id: int,
+        if_none_match: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        overdue: Optional[bool] = None,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """Страница задач в JSON через кеш с версией пользователя
+
+        Возвращает ETag и тело ответа. Тело None означает, что у клиента
+        актуальная версия и можно ответить 304. Запросы с overdue зависят
+        от текущего времени и не кешируются.
+        """
+        page_params = {
+            "limit": limit,
+            "cursor": cursor,
+            "due_from": due_from.isoformat() if due_from else None,
+            "due_to": due_to.isoformat() if due_to else None,
+        }
+        version = (
+            None if overdue is not None else await task_list_cache.version(user_id)
+        )
+        if version is None:
+            body = await self.get_user_tasks_page_json(
+                user_id, limit, cursor, due_from, due_to, overdue
+            )
+            return None, body
+
+        etag = task_list_cache.etag(user_id, version, page_params)
+        if if_none_match and _etag_matches(etag, if_none_match):
+            task_list_cache.not_modified += 1
+            return etag, None
+
+        body = await task_list_cache.get(user_id, version, page_params)
+        if body is None:
+            body = await self.get_user_tasks_page_json(
+                user_id, limit, cursor, due_from, due_to
+            )
+            # изменение во время запроса могло попасть в ответ уже после
+            # чтения версии, такой ответ под старой версией не сохраняется
+            if await task_list_cache.version(user_id) == version:
+                await task_list_cache.set(user_id, version, page_params, body)
+        return etag, body
+
+    async def search_tasks_json(
+        self,
+        user_id: int,
+        q: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> bytes:
+        """Страница результатов поиска задач по релевантности в JSON"""
+        terms = SEARCH_TERM.findall(q.lower())[:SEARCH_MAX_TERMS]
+        if not terms:
+            raise ValueError("Поисковый запрос не содержит слов")
+        after = decode_search_cursor(cursor) if cursor else None
+        rows = await self.task_repository.search_rows(
+            user_id, terms, limit=limit + 1, after=after
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_search_cursor(rows[-1].rank, rows[-1].id)
+        items = [row._asdict() for row in rows]
+        for item in items:
+            del item["rank"]
+        return task_page_adapter.dump_json({"items": items, "next_cursor": next_cursor})
+
+    async def get_calendar(
+        self,
+        user_id: int,
+        date_from: date,
+        date_to: date,
+        tz_name: str,
+        granularity: str,
+    ) -> TaskCalendarSchema:
+        """Количество задач по дням или неделям за период [date_from, date_to]"""
+        try:
+            tz = ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError("Неизвестный часовой пояс")
+        if date_to < date_from:
+            raise ValueError("Конец периода раньше начала")
+        if (date_to - date_from).days >= CALENDAR_MAX_DAYS:
+            raise ValueError(f"Период не может превышать {CALENDAR_MAX_DAYS} дней")
+
+        start = datetime.combine(date_from, time.min, tzinfo=tz)
+        end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz)
+        rows = await self.task_repository.count_by_period(
+            user_id, start, end, granularity, tz_name
+        )
+        return TaskCalendarSchema(
+            granularity=granularity,
+            timezone=tz_name,
+            buckets=[
+                TaskCalendarBucketSchema(period=period, count=count)
+                for period, count in rows
+            ],
+        )
+
+    async def export_tasks(
+        self, user_id: int, export_format: str
+    ) -> AsyncIterator[str]:
+        """Выгрузка всех задач пользователя в NDJSON или CSV по частям"""
+        encode = _csv_chunk if export_format == "csv" else _ndjson_chunk
+        if export_format == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+        async for rows in self.task_repository.stream_by_user_id(user_id):
+            yield encode(rows)
+
+
+def _filter_kwargs(task_filter: TaskFilterSchema) -> dict:
+    """Параметры отбора задач, пустой отбор запрещен"""
+    kwargs = task_filter.model_dump()
+    if all(value is None for value in kwargs.values()):
+        raise ValueError("Укажите id задач или период сроков")
+    if (
+        task_filter.due_from is not None
+        and task_filter.due_to is not None
+        and task_filter.due_to < task_filter.due_from
+    ):
+        raise ValueError("Конец периода раньше начала")
+    return kwargs
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """Проверка заголовка If-None-Match со слабым сравнением"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _export_values(row) -> tuple:
+    """Значения строки выгрузки с датами в ISO 8601"""
+    task_id, title, description, due_date, user_id, created_at = row
+    return (
+        task_id,
+        title,
+        description,
+        due_date.isoformat(),
+        user_id,
+        created_at.isoformat(),
+    )
+
+
+def _ndjson_chunk(rows) -> str:
+    """Кодирует пачку строк в NDJSON"""
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row))), ensure_ascii=False)
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> str:
+    """Кодирует пачку строк в CSV"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_export_values(row) for row in rows)
+    return buffer.getvalue()
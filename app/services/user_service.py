@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,8 +10,12 @@ from schemas.user import UserResponseSchema
 class UserService:
     """Сервис для работы с пользователем"""
 
-    def __init__(self, db_session: AsyncSession) -> None:
-        self.user_repository = UserRepository(db_session=db_session)
+    def __init__(
+        self, db_session: AsyncSession, read_session: Optional[AsyncSession] = None
+    ) -> None:
+        self.user_repository = UserRepository(
+            db_session=db_session, read_session=read_session
+        )
 
     async def get_current_user(self, email: str) -> UserResponseSchema:
         """Получение текущего пользователя"""
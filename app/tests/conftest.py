@@ -1,18 +1,27 @@
 import asyncio
 from typing import AsyncGenerator
 
+import fakeredis
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from core.config import settings
 from core.dependencies import get_db
+from core.principal_cache import principal_cache
+from core.query_stats import install_query_hooks
+from core.redis import redis_service
+from core.security import create_access_token
+from core.task_list_cache import task_list_cache
 from main import create_application
 from models.base import Base
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./tests/test.db"
 
 engine = create_async_engine(TEST_DATABASE_URL, echo=False, future=True)
+install_query_hooks(engine)
 
 AsyncTestingSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
@@ -53,6 +62,8 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """Создает асинхронного тестового клиента."""
 
     app = create_application()
+    principal_cache.clear()
+    task_list_cache.clear()
 
     async def override_get_db():
         try:
@@ -80,3 +91,40 @@ def test_user_data():
 def another_user_data():
     """Данные другого тестового пользователя"""
     return {"email": "another@example.com", "password": "anotherpassword123"}
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient, test_user_data) -> dict:
+    """Заголовки авторизации зарегистрированного тестового пользователя"""
+    await client.post("/api/auth/register", json=test_user_data)
+    token = await create_access_token({"sub": test_user_data["email"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def metrics_headers(monkeypatch) -> dict:
+    """Заголовки доступа к /metrics и /pool-stats"""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics-token")
+    return {"Authorization": "Bearer test-metrics-token"}
+
+
+@pytest.fixture
+async def fake_redis():
+    """Подменяет подключение к Redis на fakeredis"""
+    redis_service.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_service
+    await redis_service.redis_client.aclose()
+    redis_service.redis_client = None
+
+
+@pytest.fixture
+def query_counter():
+    """Список SQL запросов, выполненных через тестовый движок"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
@@ -1,3 +1,5 @@
+import asyncio
+import time
 from typing import Dict
 
 from fastapi import status
@@ -32,3 +34,75 @@ class TestAuthRegistration:
         invalid_data = {"email": "invalid-email", "password": "password"}
         response = await client.post("/auth/register", json=invalid_data)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestAuthRegistrationQueries:
+    """Тесты количества запросов при регистрации"""
+
+    async def test_register_single_statement(
+        self, client: AsyncClient, test_user_data: Dict, query_counter: list
+    ):
+        """Регистрация выполняет один INSERT ... RETURNING"""
+        response = await client.post("/api/auth/register", json=test_user_data)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(query_counter) == 1
+        assert query_counter[0].lstrip().upper().startswith("INSERT")
+
+    async def test_register_duplicate_single_statement(
+        self, client: AsyncClient, test_user_data: Dict, query_counter: list
+    ):
+        """Повторная регистрация отклоняется тем же единственным запросом"""
+        await client.post("/api/auth/register", json=test_user_data)
+        query_counter.clear()
+
+        response = await client.post("/api/auth/register", json=test_user_data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "уже зарегистрирован" in response.json()["detail"]
+        assert len(query_counter) == 1
+
+
+class TestAuthRefresh:
+    """Тесты обновления токенов"""
+
+    async def login(self, client: AsyncClient, user_data: Dict) -> str:
+        """Регистрирует и авторизует пользователя, возвращает refresh token"""
+        await client.post("/api/auth/register", json=user_data)
+        response = await client.post("/api/auth/login", json=user_data)
+        return response.cookies["refresh_token"]
+
+    async def test_refresh_rotates_token(
+        self, client: AsyncClient, test_user_data: Dict, fake_redis
+    ):
+        """Старый refresh token после обновления больше не принимается"""
+        refresh_token = await self.login(client, test_user_data)
+        cookie = {"Cookie": f"refresh_token={refresh_token}"}
+
+        first = await client.post("/api/auth/refresh", headers=cookie)
+        second = await client.post("/api/auth/refresh", headers=cookie)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first.cookies["refresh_token"] != refresh_token
+        assert second.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_parallel_refresh_single_winner(
+        self, client: AsyncClient, test_user_data: Dict, fake_redis
+    ):
+        """Из параллельных обновлений с одним cookie проходит ровно одно"""
+        refresh_token = await self.login(client, test_user_data)
+        cookie = {"Cookie": f"refresh_token={refresh_token}"}
+        latencies = []
+
+        async def refresh():
+            started = time.perf_counter()
+            response = await client.post("/api/auth/refresh", headers=cookie)
+            latencies.append(time.perf_counter() - started)
+            return response.status_code
+
+        codes = await asyncio.gather(*(refresh() for _ in range(50)))
+
+        assert codes.count(status.HTTP_200_OK) == 1
+        assert codes.count(status.HTTP_401_UNAUTHORIZED) == 49
+        assert len(latencies) == 50
+        assert max(latencies) < 5
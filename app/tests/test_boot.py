@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.boot import alembic_heads, check_schema_revision
+
+
+class TestSchemaRevision:
+    """Тесты проверки ревизии схемы в production режиме"""
+
+    async def test_current_revision_passes(self, tmp_path):
+        """Схема на последней миграции проходит проверку"""
+        (head,) = alembic_heads()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'boot.db'}")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num TEXT)"))
+            await conn.execute(
+                text("INSERT INTO alembic_version VALUES (:head)"), {"head": head}
+            )
+
+        await check_schema_revision(engine)
+        await engine.dispose()
+
+    @pytest.mark.parametrize("revision", [None, "ab1877d0746b"])
+    async def test_outdated_schema_fails(self, tmp_path, revision):
+        """Без таблицы alembic_version или на старой ревизии запуск прерывается"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'boot.db'}")
+        if revision is not None:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("CREATE TABLE alembic_version (version_num TEXT)")
+                )
+                await conn.execute(
+                    text("INSERT INTO alembic_version VALUES (:revision)"),
+                    {"revision": revision},
+                )
+
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            await check_schema_revision(engine)
+        await engine.dispose()
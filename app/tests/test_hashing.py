@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.hashing import (
+    HashingExecutor,
+    HashingQueueFullError,
+    hash_password_sync,
+    verify_password_sync,
+)
+
+
+class TestHashingExecutor:
+    """Тесты пула хеширования паролей"""
+
+    async def test_hash_and_verify(self):
+        """Хеширование и проверка пароля в пуле"""
+        executor = HashingExecutor(kind="thread", max_workers=1, max_queue=0)
+
+        hashed = await executor.run(hash_password_sync, "secret")
+
+        assert await executor.run(verify_password_sync, "secret", hashed)
+        assert not await executor.run(verify_password_sync, "wrong", hashed)
+        assert executor.metrics()["hash_time"]["count"] == 3
+        executor.shutdown()
+
+    async def test_queue_limit(self):
+        """Запросы сверх лимита очереди отклоняются"""
+        executor = HashingExecutor(kind="thread", max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        running = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(HashingQueueFullError):
+            await executor.run(release.wait, 5)
+
+        release.set()
+        await asyncio.gather(*running)
+        assert executor.pending == 0
+        assert executor.rejected == 1
+        executor.shutdown()
@@ -0,0 +1,110 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from fastapi import status
+from httpx import AsyncClient
+
+from core import security
+from core.config import settings
+from core.signing_keys import SigningKeySet
+from core.token_verifier import TokenVerifier
+
+
+def write_key(keys_dir, kid: str, key) -> None:
+    """Сохраняет закрытый ключ в каталог ключей"""
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    (keys_dir / f"{kid}.pem").write_bytes(pem)
+
+
+@pytest.fixture
+def eddsa_keys(tmp_path, monkeypatch):
+    """Подпись EdDSA ключом 2026-01 из временного каталога"""
+    write_key(tmp_path, "2026-01", ed25519.Ed25519PrivateKey.generate())
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "EdDSA")
+    signing_keys = SigningKeySet(str(tmp_path), None)
+    verifier = TokenVerifier(source=signing_keys.reload_jwks, min_refresh_interval=0)
+    monkeypatch.setattr(security, "signing_keys", signing_keys)
+    monkeypatch.setattr(security, "token_verifier", verifier)
+    monkeypatch.setattr("endpoints.jwks.signing_keys", signing_keys)
+    return tmp_path
+
+
+class TestAsymmetricTokens:
+    """Тесты подписи токенов ключами из набора и JWKS"""
+
+    async def test_token_verified_locally_from_jwks(
+        self, client: AsyncClient, test_user_data, fake_redis, eddsa_keys
+    ):
+        """Токен проверяется по опубликованному JWKS без обращения к API"""
+        await client.post("/api/auth/register", json=test_user_data)
+        token = await security.create_access_token({"sub": test_user_data["email"]})
+
+        response = await client.get("/.well-known/jwks.json")
+        jwks = response.json()
+        verifier = TokenVerifier(source=lambda: jwks)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert jwt.get_unverified_header(token) == {
+            "alg": "EdDSA",
+            "kid": "2026-01",
+            "typ": "JWT",
+        }
+        assert [key["kid"] for key in jwks["keys"]] == ["2026-01"]
+        assert "d" not in jwks["keys"][0]
+        assert verifier.verify(token)["sub"] == test_user_data["email"]
+        me = await client.get(
+            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert me.status_code == status.HTTP_200_OK
+
+    async def test_rotation_keeps_old_tokens_valid(self, eddsa_keys):
+        """После ротации на RS256 старые токены проверяются, новые с новым kid"""
+        old_token = await security.create_access_token({"sub": "user@example.com"})
+        write_key(
+            eddsa_keys,
+            "2026-02",
+            rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        )
+        security.signing_keys.load()
+
+        new_token = await security.create_access_token({"sub": "user@example.com"})
+
+        assert jwt.get_unverified_header(new_token)["kid"] == "2026-02"
+        assert jwt.get_unverified_header(new_token)["alg"] == "RS256"
+        assert (await security.verify_token(old_token))["sub"] == "user@example.com"
+        assert (await security.verify_token(new_token))["sub"] == "user@example.com"
+
+    async def test_algorithm_taken_from_key(self, eddsa_keys):
+        """Токен с kid набора, но подписанный HS256, отклоняется"""
+        forged = jwt.encode(
+            {"sub": "user@example.com"},
+            settings.JWT_SECRET_KEY,
+            algorithm="HS256",
+            headers={"kid": "2026-01"},
+        )
+
+        assert await security.verify_token(forged) is None
+
+    def test_unknown_kid_refresh_is_rate_limited(self, eddsa_keys):
+        """Неизвестный kid перечитывает набор не чаще интервала"""
+        signing_keys = SigningKeySet(str(eddsa_keys), None)
+        verifier = TokenVerifier(
+            source=signing_keys.reload_jwks, min_refresh_interval=60
+        )
+        forged = jwt.encode(
+            {"sub": "user@example.com"},
+            ed25519.Ed25519PrivateKey.generate(),
+            algorithm="EdDSA",
+            headers={"kid": "unknown"},
+        )
+
+        for _ in range(5):
+            with pytest.raises(jwt.InvalidKeyError):
+                verifier.verify(forged)
+
+        assert verifier.refreshes == 1
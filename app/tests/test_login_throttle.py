@@ -0,0 +1,108 @@
+import ipaddress
+
+from fastapi import status
+from httpx import AsyncClient
+
+from core import security
+from core.hashing import hashing_executor
+from core.login_throttle import LoginThrottle, login_throttle
+from repositories.user_repository import UserRepository
+
+
+class TestLoginThrottle:
+    """Тесты ограничения попыток входа"""
+
+    async def test_email_limit_rejects_before_lookup(
+        self, client: AsyncClient, test_user_data, fake_redis, monkeypatch
+    ):
+        """Сверх лимита на email вход отклоняется без поиска пользователя и bcrypt"""
+        monkeypatch.setitem(login_throttle.limits, "email", (2, 1 / 60000))
+        await client.post("/api/auth/register", json=test_user_data)
+        credentials = {**test_user_data, "password": "wrongpassword"}
+        for _ in range(2):
+            response = await client.post("/api/auth/login", json=credentials)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        lookups = []
+        original = UserRepository.get_by_email
+
+        async def counting_get_by_email(self, email):
+            lookups.append(email)
+            return await original(self, email)
+
+        monkeypatch.setattr(UserRepository, "get_by_email", counting_get_by_email)
+        hashed_before = hashing_executor.hash_time.count
+
+        response = await client.post("/api/auth/login", json=test_user_data)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response.headers["Retry-After"]) >= 1
+        assert lookups == []
+        assert hashing_executor.hash_time.count == hashed_before
+
+    async def test_ip_limit_spans_emails(
+        self, client: AsyncClient, fake_redis, monkeypatch
+    ):
+        """Лимит на IP адрес действует для попыток с разными email"""
+        monkeypatch.setitem(login_throttle.limits, "ip", (3, 1 / 60000))
+        statuses = []
+        for i in range(4):
+            response = await client.post(
+                "/api/auth/login",
+                json={"email": f"user{i}@example.com", "password": "password123"},
+            )
+            statuses.append(response.status_code)
+
+        assert statuses == [status.HTTP_401_UNAUTHORIZED] * 3 + [
+            status.HTTP_429_TOO_MANY_REQUESTS
+        ]
+
+    def test_client_ip_trusts_only_proxies(self):
+        """X-Forwarded-For учитывается только от доверенных прокси"""
+        throttle = LoginThrottle(1, 1.0, 1, 1.0, trusted_proxies="10.0.0.0/8, ::1/128")
+
+        assert throttle.client_ip("203.0.113.5", "198.51.100.1") == "203.0.113.5"
+        assert throttle.client_ip("10.0.0.2", "198.51.100.1") == "198.51.100.1"
+        assert (
+            throttle.client_ip("10.0.0.2", "192.0.2.9, 198.51.100.1, 10.0.0.3")
+            == "198.51.100.1"
+        )
+        assert throttle.client_ip("10.0.0.2", "garbage") == "10.0.0.2"
+        assert throttle.client_ip("10.0.0.2", None) == "10.0.0.2"
+        assert throttle.client_ip(None, "198.51.100.1") is None
+
+    async def test_ip_limit_per_forwarded_client(
+        self, client: AsyncClient, fake_redis, monkeypatch
+    ):
+        """За доверенным прокси у каждого клиента свой бакет IP"""
+        monkeypatch.setitem(login_throttle.limits, "ip", (1, 1 / 60000))
+        monkeypatch.setattr(
+            login_throttle, "trusted_proxies", [ipaddress.ip_network("127.0.0.0/8")]
+        )
+        statuses = []
+        for forwarded_for in ("198.51.100.1", "198.51.100.2", "198.51.100.1"):
+            response = await client.post(
+                "/api/auth/login",
+                json={"email": f"{forwarded_for}@example.com", "password": "x"},
+                headers={"X-Forwarded-For": forwarded_for},
+            )
+            statuses.append(response.status_code)
+
+        assert statuses == [status.HTTP_401_UNAUTHORIZED] * 2 + [
+            status.HTTP_429_TOO_MANY_REQUESTS
+        ]
+
+    async def test_unknown_email_runs_dummy_verify(
+        self, client: AsyncClient, fake_redis, monkeypatch
+    ):
+        """Для неизвестного email пароль проверяется по фиктивному хешу"""
+        monkeypatch.setattr(security, "_dummy_hash", None)
+        hashed_before = hashing_executor.hash_time.count
+        credentials = {"email": "nobody@example.com", "password": "password123"}
+
+        first = await client.post("/api/auth/login", json=credentials)
+        second = await client.post("/api/auth/login", json=credentials)
+
+        assert first.status_code == second.status_code == status.HTTP_401_UNAUTHORIZED
+        # фиктивный хеш создается один раз, дальше только проверка
+        assert hashing_executor.hash_time.count - hashed_before == 3
@@ -0,0 +1,94 @@
+from typing import Dict
+
+from fastapi import status
+from httpx import AsyncClient
+
+from core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Тесты формата метрик"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Корзины гистограммы накапливаются, есть сумма и количество"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "latency_seconds", "Задержка", ("route",), buckets=(0.1, 1.0)
+        )
+
+        histogram.observe("/a", value=0.05)
+        histogram.observe("/a", value=0.5)
+        histogram.observe("/a", value=5)
+        text = registry.render()
+
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 5.55' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+
+    def test_label_values_are_escaped(self):
+        """Кавычки и переводы строк в метках экранируются"""
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Ошибки", ("reason",)).inc('a"b\n')
+
+        assert 'errors_total{reason="a\\"b\\n"} 1' in registry.render()
+
+
+class TestMetricsEndpoint:
+    """Тесты эндпоинта /metrics"""
+
+    async def test_route_and_redis_metrics(
+        self,
+        client: AsyncClient,
+        auth_headers: Dict,
+        metrics_headers: Dict,
+        fake_redis,
+    ):
+        """Запросы попадают в метрики по шаблону маршрута"""
+        await client.get("/api/tasks", headers=auth_headers)
+
+        response = await client.get("/metrics", headers=metrics_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'http_requests_total{method="GET",route="/api/tasks",status="200"}' in text
+        )
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/api/tasks"}'
+            in text
+        )
+        assert "http_requests_in_flight" in text
+        assert 'redis_command_duration_seconds_count{command="get"}' in text
+        assert "hashing_duration_seconds_total" in text
+        assert "principal_cache_lookups_total" in text
+        assert "revocation_checks_total" in text
+
+    async def test_unmatched_route(self, client: AsyncClient, metrics_headers: Dict):
+        """Неизвестные пути не создают отдельных рядов"""
+        await client.get("/no-such-path/123")
+
+        response = await client.get("/metrics", headers=metrics_headers)
+
+        assert 'route="<unmatched>",status="404"' in response.text
+        assert "/no-such-path/123" not in response.text
+
+    async def test_hidden_without_token_setting(self, client: AsyncClient):
+        """Без METRICS_TOKEN служебные эндпоинты не отдаются"""
+        for path in ("/metrics", "/pool-stats"):
+            response = await client.get(path)
+
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_wrong_token_rejected(
+        self, client: AsyncClient, metrics_headers: Dict
+    ):
+        """Без токена или с чужим токеном доступа нет"""
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            for path in ("/metrics", "/pool-stats"):
+                response = await client.get(path, headers=headers)
+
+                assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+
+from core.partitions import (
+    add_months,
+    expired_partitions,
+    month_start,
+    partition_month,
+    partition_name,
+)
+
+
+class TestPartitions:
+    """Тесты помесячных секций задач"""
+
+    def test_month_boundaries_in_utc(self):
+        """Месяц секции считается в UTC, переход через год корректен"""
+        moment = datetime(2026, 1, 1, 2, 30, tzinfo=timezone(timedelta(hours=3)))
+
+        month = month_start(moment)
+
+        assert month == datetime(2025, 12, 1, tzinfo=timezone.utc)
+        assert partition_name(month) == "tasks_p2025_12"
+        assert add_months(month, 1) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+        assert add_months(month, -12) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+        assert partition_month("tasks_p2025_12") == month
+        assert partition_month("tasks_default") is None
+
+    def test_expired_partitions_keep_retention_window(self):
+        """В архив уходят только секции, закончившиеся до срока хранения"""
+        names = [
+            "tasks_default",
+            "tasks_p2024_08",
+            "tasks_p2024_09",
+            "tasks_p2024_10",
+            "tasks_p2026_10",
+        ]
+        now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+        assert expired_partitions(names, 24, now) == [
+            "tasks_p2024_08",
+            "tasks_p2024_09",
+        ]
+
+    async def test_cursor_page_bounds_due_date(
+        self, client: AsyncClient, auth_headers, query_counter
+    ):
+        """Следующая страница ограничивает due_date снизу для отсечения секций"""
+        for day in range(3):
+            await client.post(
+                "/api/tasks",
+                json={
+                    "title": f"Задача {day}",
+                    "due_date": f"2030-01-0{day + 1}T00:00:00Z",
+                },
+                headers=auth_headers,
+            )
+        first = await client.get(
+            "/api/tasks", params={"limit": 2}, headers=auth_headers
+        )
+        query_counter.clear()
+
+        second = await client.get(
+            "/api/tasks",
+            params={"limit": 2, "cursor": first.json()["next_cursor"]},
+            headers=auth_headers,
+        )
+
+        assert [task["title"] for task in second.json()["items"]] == ["Задача 2"]
+        page_query = next(sql for sql in query_counter if "FROM tasks" in sql)
+        assert "tasks.due_date >= ?" in page_query
+
+    async def test_first_page_bounded_by_filters(
+        self, client: AsyncClient, auth_headers, query_counter
+    ):
+        """Первая страница с due_from или overdue=false ограничена снизу"""
+        for params in ({"due_from": "2030-01-01T00:00:00Z"}, {"overdue": "false"}):
+            query_counter.clear()
+
+            response = await client.get(
+                "/api/tasks", params=params, headers=auth_headers
+            )
+
+            assert response.status_code == 200
+            page_query = next(sql for sql in query_counter if "FROM tasks" in sql)
+            assert "tasks.due_date >= ?" in page_query
@@ -0,0 +1,55 @@
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.config import settings
+from core.pool import install_idle_ping
+
+
+class TestPoolStats:
+    """Тесты эндпоинта состояния пулов"""
+
+    async def test_pool_stats(
+        self, client: AsyncClient, metrics_headers: dict, fake_redis
+    ):
+        """Эндпоинт отдает настройки и загрузку пулов"""
+        response = await client.get("/pool-stats", headers=metrics_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["db"]["size"] == settings.DB_POOL_SIZE
+        assert data["db"]["max_connections_per_worker"] == (
+            settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        )
+        assert data["db"]["liveness"] == settings.DB_POOL_LIVENESS
+        assert {"in_use", "idle", "max_connections"} <= data["redis"].keys()
+
+
+class TestIdlePing:
+    """Тесты проверки простаивающих соединений"""
+
+    async def test_dead_idle_connection_is_replaced(self, tmp_path, monkeypatch):
+        """Соединение, не ответившее на проверку, заменяется новым"""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=AsyncAdaptedQueuePool,
+        )
+        install_idle_ping(engine, idle_seconds=0)
+        connects = []
+        event.listen(engine.sync_engine, "connect", lambda *args: connects.append(1))
+        pings = []
+
+        def failing_ping(dbapi_connection):
+            pings.append(1)
+            raise OSError("connection lost")
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        monkeypatch.setattr(engine.sync_engine.dialect, "do_ping", failing_ping)
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+
+        assert len(pings) == 1
+        assert len(connects) == 2
+        await engine.dispose()
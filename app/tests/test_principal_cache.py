@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import Dict
+
+import fakeredis
+from fastapi import status
+from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import main
+from core.principal_cache import PrincipalCache, principal_cache
+from core.redis import redis_service
+from schemas.user import UserResponseSchema
+
+
+class TestPrincipalCache:
+    """Тесты кеша аутентифицированных пользователей"""
+
+    async def test_repeated_requests_hit_cache(
+        self, client: AsyncClient, auth_headers: Dict, fake_redis
+    ):
+        """Повторный запрос с тем же токеном берет пользователя из памяти"""
+        first = await client.get("/api/users/me", headers=auth_headers)
+        hits_before = principal_cache.local_hits
+
+        second = await client.get("/api/users/me", headers=auth_headers)
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert first.json() == second.json()
+        assert principal_cache.local_hits == hits_before + 1
+
+    async def test_redis_tier_shared_between_workers(
+        self, client: AsyncClient, auth_headers: Dict, fake_redis
+    ):
+        """После очистки памяти пользователь берется из Redis"""
+        await client.get("/api/users/me", headers=auth_headers)
+        principal_cache.clear()
+        hits_before = principal_cache.redis_hits
+
+        response = await client.get("/api/users/me", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert principal_cache.redis_hits == hits_before + 1
+
+    async def test_logout_invalidates_cache(
+        self, client: AsyncClient, test_user_data: Dict, fake_redis
+    ):
+        """После выхода закешированный токен перестает работать"""
+        await client.post("/api/auth/register", json=test_user_data)
+        login = await client.post("/api/auth/login", json=test_user_data)
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        assert (await client.get("/api/users/me", headers=headers)).status_code == 200
+
+        await client.post("/api/auth/logout", headers=headers)
+        response = await client.get("/api/users/me", headers=headers)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    async def test_pubsub_invalidation_reaches_other_workers(self, fake_redis):
+        """Инвалидация в одном воркере удаляет запись из памяти другого"""
+        worker = PrincipalCache(enabled=True, max_size=10, local_ttl=60)
+        other = PrincipalCache(enabled=True, max_size=10, local_ttl=60)
+        payload = {"sub": "user@example.com", "exp": time.time() + 60}
+        user = UserResponseSchema(
+            id=1, email="user@example.com", created_at="2030-01-01T00:00:00Z"
+        )
+        worker.start_listener()
+        await asyncio.sleep(0.05)
+        await worker.set("token", payload, user, revocation_key="blacklist:token")
+        assert worker.metrics()["size"] == 1
+
+        await other.invalidate("token")
+        for _ in range(50):
+            if worker.metrics()["size"] == 0:
+                break
+            await asyncio.sleep(0.01)
+
+        assert worker.metrics()["size"] == 0
+        await worker.stop_listener()
+
+    def test_lifespan_starts_invalidation_listener(self, monkeypatch, tmp_path):
+        """Запуск приложения подписывает воркер на инвалидацию кеша"""
+
+        async def init_fake_redis():
+            redis_service.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+        monkeypatch.setattr(redis_service, "init_redis", init_fake_redis)
+        monkeypatch.setattr(
+            main,
+            "async_engine",
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"),
+        )
+        payload = {"sub": "user@example.com", "exp": time.time() + 60}
+        user = UserResponseSchema(
+            id=1, email="user@example.com", created_at="2030-01-01T00:00:00Z"
+        )
+
+        async def invalidated_by_other_worker() -> bool:
+            await asyncio.sleep(0.05)
+            principal_cache._put_local(principal_cache.digest("token"), payload, user)
+            other = PrincipalCache(enabled=True, max_size=10, local_ttl=60)
+            await other.invalidate("token")
+            for _ in range(50):
+                if principal_cache.metrics()["size"] == 0:
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+
+        try:
+            with TestClient(main.create_application()) as client:
+                listener = principal_cache._listener
+                assert listener is not None and not listener.done()
+                assert client.portal.call(invalidated_by_other_worker)
+            assert principal_cache._listener is None
+        finally:
+            redis_service.redis_client = None
@@ -0,0 +1,58 @@
+import logging
+from typing import Dict
+
+from httpx import AsyncClient
+
+from core.config import settings
+from core.query_stats import RequestQueryStats
+
+
+class TestQueryStats:
+    """Тесты SQL статистики запросов"""
+
+    async def test_server_timing_header(self, client: AsyncClient, auth_headers: Dict):
+        """Ответ содержит число запросов и время базы в Server-Timing"""
+        response = await client.get("/api/users/me", headers=auth_headers)
+
+        timing = response.headers["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert 'desc="1 queries"' in timing
+        assert "db-slowest;dur=" in timing
+        assert "FROM users" not in timing
+
+    async def test_server_timing_statement_in_debug(
+        self, client: AsyncClient, auth_headers: Dict, monkeypatch
+    ):
+        """Текст медленного запроса отдается только с отладочной настройкой"""
+        monkeypatch.setattr(settings, "SQL_TIMING_SHOW_STATEMENTS", True)
+
+        response = await client.get("/api/users/me", headers=auth_headers)
+
+        assert "FROM users" in response.headers["Server-Timing"]
+
+    async def test_slow_query_log_redacts_parameters(
+        self, client: AsyncClient, test_user_data: Dict, monkeypatch, caplog
+    ):
+        """В логе медленных запросов нет значений параметров"""
+        monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0)
+
+        with caplog.at_level(logging.WARNING, logger="core.query_stats"):
+            await client.post("/api/auth/register", json=test_user_data)
+
+        slow = [r.getMessage() for r in caplog.records if "Медленный" in r.message]
+        assert slow
+        assert all(test_user_data["email"] not in message for message in slow)
+        assert any("'str'" in message for message in slow)
+
+    def test_repeated_statement_warning(self, monkeypatch, caplog):
+        """Повтор одного запроса больше порога дает одно предупреждение"""
+        monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+        stats = RequestQueryStats("/api/tasks")
+
+        with caplog.at_level(logging.WARNING, logger="core.query_stats"):
+            for _ in range(10):
+                stats.record("SELECT * FROM tasks WHERE user_id = ?", 0.001)
+
+        warnings = [r for r in caplog.records if "N+1" in r.getMessage()]
+        assert len(warnings) == 1
+        assert stats.count == 10
@@ -0,0 +1,227 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from core.reminders import QueueNotifier, ReminderScheduler
+
+
+class FailingNotifier:
+    async def notify(self, reminder) -> None:
+        raise ConnectionError("webhook недоступен")
+
+
+def make_scheduler(notifier=None, **kwargs) -> ReminderScheduler:
+    return ReminderScheduler(
+        enabled=True, notifier=notifier or QueueNotifier(), **kwargs
+    )
+
+
+def due_in(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+class TestReminderScheduler:
+    """Тесты напоминаний о сроках задач"""
+
+    async def test_create_and_bulk_schedule_reminders(
+        self, client: AsyncClient, auth_headers, fake_redis
+    ):
+        """Созданные задачи попадают в очередь, задачи в прошлом - нет"""
+        response = await client.post(
+            "/api/tasks",
+            json={"title": "Созвон", "due_date": due_in(3600)},
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        task_id = response.json()["id"]
+        response = await client.post(
+            "/api/tasks/bulk",
+            json=[
+                {"title": "Отчет", "due_date": due_in(7200)},
+                {"title": "Прошлое", "due_date": due_in(-3600)},
+            ],
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        queued = await fake_redis.redis_client.zrange(
+            ReminderScheduler.QUEUE_KEY, 0, -1, withscores=True
+        )
+        assert [member.split(":")[0] for member, _ in queued] == [
+            str(task_id),
+            str(response.json()[0]["id"]),
+        ]
+        assert abs(queued[0][1] - (time.time() + 3600)) < 60
+
+    async def test_bulk_update_and_delete_reschedule_reminders(
+        self, client: AsyncClient, auth_headers, fake_redis
+    ):
+        """Перенос срока переносит напоминание, удаление задач его отменяет"""
+        response = await client.post(
+            "/api/tasks/bulk",
+            json=[
+                {"title": "Отчет", "due_date": due_in(3600)},
+                {"title": "Созвон", "due_date": due_in(7200)},
+            ],
+            headers=auth_headers,
+        )
+        first_id, second_id = [task["id"] for task in response.json()]
+
+        await client.patch(
+            "/api/tasks",
+            json={"filter": {"ids": [first_id]}, "update": {"due_date": due_in(86400)}},
+            headers=auth_headers,
+        )
+        await client.delete(
+            "/api/tasks", params={"ids": [second_id]}, headers=auth_headers
+        )
+
+        queued = await fake_redis.redis_client.zrange(
+            ReminderScheduler.QUEUE_KEY, 0, -1, withscores=True
+        )
+        assert [member.split(":")[0] for member, _ in queued] == [str(first_id)]
+        assert abs(queued[0][1] - (time.time() + 86400)) < 60
+
+    async def test_window_delete_cancels_queued_and_claimed(
+        self, client: AsyncClient, auth_headers, fake_redis
+    ):
+        """Удаление по окну сроков отменяет и выданные воркеру напоминания"""
+        response = await client.post(
+            "/api/tasks/bulk",
+            json=[
+                {"title": "Созвон", "due_date": due_in(3600)},
+                {"title": "Отчет", "due_date": due_in(7200)},
+                {"title": "Отпуск", "due_date": due_in(86400)},
+            ],
+            headers=auth_headers,
+        )
+        ids = [task["id"] for task in response.json()]
+        scheduler = make_scheduler(batch_size=1)
+        await scheduler.claim(time.time() + 4000)  # первая задача выдана воркеру
+        await fake_redis.redis_client.zadd(
+            ReminderScheduler.QUEUE_KEY, {f"{ids[1]}:999": time.time() + 7200}
+        )
+
+        response = await client.delete(
+            "/api/tasks",
+            params={"due_from": due_in(0), "due_to": due_in(36000)},
+            headers=auth_headers,
+        )
+
+        assert response.json() == {"count": 2}
+        queued = await fake_redis.redis_client.zrange(
+            ReminderScheduler.QUEUE_KEY, 0, -1
+        )
+        assert queued[0] == f"{ids[1]}:999"
+        assert queued[1].split(":")[0] == str(ids[2])
+        assert not await fake_redis.redis_client.zrange(
+            ReminderScheduler.CLAIMED_KEY, 0, -1
+        )
+        assert not await fake_redis.redis_client.hgetall(
+            ReminderScheduler.CLAIMED_DUE_KEY
+        )
+
+    async def test_due_reminders_fire_once_across_workers(self, fake_redis):
+        """Наступившие напоминания отправляются один раз при нескольких воркерах"""
+        notifier = QueueNotifier()
+        workers = [make_scheduler(notifier, batch_size=7) for _ in range(4)]
+        start = datetime.now(timezone.utc)
+        pipe = fake_redis.redis_client.pipeline()
+        for task_id in range(100):
+            due = (start + timedelta(seconds=task_id)).timestamp()
+            pipe.zadd(ReminderScheduler.QUEUE_KEY, {f"{task_id}:1": due})
+        await pipe.execute()
+
+        now = start.timestamp() + 49.5
+        while sum(await asyncio.gather(*(w.run_once(now) for w in workers))):
+            pass
+
+        fired = [notifier.queue.get_nowait().task_id for _ in range(50)]
+        assert notifier.queue.empty()
+        assert sorted(fired) == list(range(50))
+        assert await fake_redis.redis_client.zcard(ReminderScheduler.QUEUE_KEY) == 50
+        assert await fake_redis.redis_client.zcard(ReminderScheduler.CLAIMED_KEY) == 0
+
+    async def test_failed_reminder_retried_after_lease(self, fake_redis):
+        """Неотправленное напоминание повторяется после истечения аренды"""
+        now = time.time()
+        await fake_redis.redis_client.zadd(ReminderScheduler.QUEUE_KEY, {"5:1": now})
+        failing = make_scheduler(FailingNotifier(), lease=30)
+        retrying = make_scheduler(lease=30)
+
+        assert await failing.run_once(now) == 1
+        assert await retrying.run_once(now + 10) == 0
+        assert await retrying.run_once(now + 31) == 1
+        assert retrying.notifier.queue.get_nowait().task_id == 5
+
+    async def test_reclaimed_reminder_keeps_due_time(self, fake_redis):
+        """После истечения аренды напоминание возвращается со своим сроком"""
+        now = time.time()
+        due = now - 100
+        await fake_redis.redis_client.zadd(
+            ReminderScheduler.QUEUE_KEY, {"5:1": due, "6:1": now - 50}
+        )
+        crashed = make_scheduler(lease=30, batch_size=1)
+        retrying = make_scheduler(lease=30, batch_size=1)
+
+        assert [r.task_id for r in await crashed.claim(now)] == [5]
+        reclaimed = await retrying.claim(now + 31)
+
+        assert [r.task_id for r in reclaimed] == [5]
+        assert reclaimed[0].due_date.timestamp() == pytest.approx(due)
+        claimed_due = await fake_redis.redis_client.hget(
+            ReminderScheduler.CLAIMED_DUE_KEY, "5:1"
+        )
+        assert float(claimed_due) == pytest.approx(due)
+
+    async def test_reschedule_drops_claimed_reminder(self, fake_redis):
+        """Перенос срока снимает напоминание, уже выданное воркеру"""
+        now = time.time()
+        await fake_redis.redis_client.zadd(ReminderScheduler.QUEUE_KEY, {"5:1": now})
+        crashed = make_scheduler(lease=30)
+        retrying = make_scheduler(lease=30)
+        assert [r.task_id for r in await crashed.claim(now)] == [5]
+
+        past = datetime.fromtimestamp(now - 3600, timezone.utc)
+        await retrying.schedule([SimpleNamespace(id=5, user_id=1, due_date=past)])
+
+        assert await retrying.run_once(now + 31) == 0
+        assert not await fake_redis.redis_client.zrange(
+            ReminderScheduler.CLAIMED_KEY, 0, -1
+        )
+        assert not await fake_redis.redis_client.hgetall(
+            ReminderScheduler.CLAIMED_DUE_KEY
+        )
+
+    async def test_cancel_removes_reminder(self, fake_redis):
+        """Отмененное напоминание не отправляется"""
+        now = time.time()
+        scheduler = make_scheduler()
+        await fake_redis.redis_client.zadd(
+            ReminderScheduler.QUEUE_KEY, {"1:1": now, "2:1": now}
+        )
+
+        await scheduler.cancel([(1, 1)])
+
+        assert await scheduler.run_once(now) == 1
+        assert scheduler.notifier.queue.get_nowait().task_id == 2
+
+    async def test_background_loop_dispatches(self, fake_redis):
+        """Фоновый цикл забирает напоминания, пока его не остановят"""
+        scheduler = make_scheduler(poll_interval=0.01)
+        await fake_redis.redis_client.zadd(
+            ReminderScheduler.QUEUE_KEY, {"9:3": time.time() - 1}
+        )
+
+        scheduler.start()
+        try:
+            reminder = await asyncio.wait_for(scheduler.notifier.queue.get(), 1)
+        finally:
+            await scheduler.stop()
+
+        assert (reminder.task_id, reminder.user_id) == (9, 3)
@@ -0,0 +1,105 @@
+from typing import Dict
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core import dependencies
+from core.replicas import ReplicaRouter
+from models.base import Base
+from services import task_service
+from tests.conftest import engine
+
+TASK = {"title": "Задача", "due_date": "2030-01-01T10:00:00Z"}
+
+
+@pytest.fixture
+async def replica(tmp_path):
+    """Пустая реплика: данные основной базы на нее не попадают"""
+    replica_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+    )
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield replica_engine
+    await replica_engine.dispose()
+
+
+def install_router(monkeypatch, replica_engine, read_your_writes: float):
+    router = ReplicaRouter(
+        primary=engine,
+        replicas=[replica_engine],
+        selection="round_robin",
+        health_check_interval=10,
+        read_your_writes=read_your_writes,
+    )
+    monkeypatch.setattr(dependencies, "replica_router", router)
+    monkeypatch.setattr(task_service, "replica_router", router)
+    return router
+
+
+class TestReplicaRouting:
+    """Тесты маршрутизации чтения по репликам"""
+
+    async def test_reads_go_to_replica(
+        self, client: AsyncClient, auth_headers: Dict, replica, monkeypatch, fake_redis
+    ):
+        """Список задач читается с реплики, пользователь - с основной базы"""
+        install_router(monkeypatch, replica, read_your_writes=0)
+        await client.post("/api/tasks", json=TASK, headers=auth_headers)
+
+        response = await client.get("/api/tasks", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"] == []
+
+    async def test_read_your_writes(
+        self, client: AsyncClient, auth_headers: Dict, replica, monkeypatch, fake_redis
+    ):
+        """После своей записи пользователь читает из основной базы"""
+        install_router(monkeypatch, replica, read_your_writes=5)
+        await client.post("/api/tasks", json=TASK, headers=auth_headers)
+
+        response = await client.get("/api/tasks", headers=auth_headers)
+
+        assert len(response.json()["items"]) == 1
+
+    async def test_unhealthy_replica_falls_back_to_primary(
+        self, client: AsyncClient, auth_headers: Dict, replica, monkeypatch, fake_redis
+    ):
+        """Без доступных реплик чтение идет в основную базу"""
+        router = install_router(monkeypatch, replica, read_your_writes=0)
+        await client.post("/api/tasks", json=TASK, headers=auth_headers)
+        await replica.dispose()
+        monkeypatch.setattr(
+            replica.sync_engine.dialect, "connect", lambda *a, **kw: 1 / 0
+        )
+        await router.check_health()
+
+        response = await client.get("/api/tasks", headers=auth_headers)
+
+        assert router.healthy == [False]
+        assert len(response.json()["items"]) == 1
+        assert router.primary_fallbacks >= 1
+
+    async def test_login_unknown_email_reads_only_replica(
+        self,
+        client: AsyncClient,
+        replica,
+        monkeypatch,
+        fake_redis,
+        query_counter: list,
+    ):
+        """Вход с неизвестным email не обращается к основной базе"""
+        install_router(monkeypatch, replica, read_your_writes=0)
+
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": "nobody@example.com", "password": "password123"},
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert not [query for query in query_counter if "FROM users" in query]
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from core.revocation import BloomFilter, RevocationRegistry
+
+
+def make_registry() -> RevocationRegistry:
+    return RevocationRegistry(capacity=1000, error_rate=0.01, max_token_age=3600)
+
+
+class TestBloomFilter:
+    """Тесты фильтра Блума"""
+
+    def test_no_false_negatives(self):
+        """Все добавленные элементы находятся"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Доля ложноположительных ответов близка к заданной"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+
+        assert false_positives < 300
+
+
+class TestRevocationRegistry:
+    """Тесты реестра отозванных токенов"""
+
+    async def test_revoked_jti_detected(self, fake_redis):
+        """Отозванный jti определяется, остальные нет"""
+        registry = make_registry()
+
+        await registry.revoke("revoked-jti", time.time() + 60)
+
+        assert await registry.is_revoked("revoked-jti")
+        assert not await registry.is_revoked("active-jti")
+
+    async def test_synced_filter_skips_redis(self, fake_redis):
+        """После синхронизации отрицательный ответ фильтра не ходит в Redis"""
+        registry = make_registry()
+        await make_registry().revoke("revoked-jti", time.time() + 60)
+        registry.start_sync()
+        for _ in range(50):
+            if registry.metrics()["synced"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert not await registry.is_revoked("active-jti")
+        assert await registry.is_revoked("revoked-jti")
+        metrics = registry.metrics()
+        assert metrics["filter_negatives"] == 1
+        assert metrics["redis_checks"] == 1
+        await registry.stop_sync()
+
+    async def test_sync_picks_up_other_workers(self, fake_redis):
+        """Отзыв в другом воркере попадает в фильтр через поток"""
+        registry = make_registry()
+        registry.start_sync()
+        await asyncio.sleep(0.05)
+
+        await make_registry().revoke("remote-jti", time.time() + 60)
+        for _ in range(100):
+            if registry.metrics()["filter_items"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await registry.is_revoked("remote-jti")
+        await registry.stop_sync()
+
+    async def test_overfull_filter_rebuilt_once(self, fake_redis):
+        """Фильтр, переполненный действующими отзывами, не перестраивается по кругу"""
+        registry = RevocationRegistry(capacity=2, error_rate=0.01, max_token_age=3600)
+        for i in range(5):
+            await make_registry().revoke(f"jti-{i}", time.time() + 60)
+        reload = registry._reload
+        reloads = []
+
+        async def counting_reload(redis) -> None:
+            reloads.append(1)
+            await reload(redis)
+
+        registry._reload = counting_reload
+        registry.start_sync()
+        for i in range(5, 8):
+            await asyncio.sleep(0.02)
+            await make_registry().revoke(f"jti-{i}", time.time() + 60)
+        for _ in range(100):
+            if registry.metrics()["filter_items"] == 8:
+                break
+            await asyncio.sleep(0.01)
+
+        assert registry.metrics()["filter_items"] == 8
+        assert len(reloads) == 1
+        await registry.stop_sync()
@@ -0,0 +1,76 @@
+import os
+from datetime import datetime, timezone
+
+import fakeredis
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.seed import FUTURE_SHARE, emails, seed_database, seed_redis
+from models import Base
+from tests.conftest import engine
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+class TestSeed:
+    """Тесты генератора синтетических данных"""
+
+    async def test_seeded_user_can_login_and_list_tasks(
+        self, client: AsyncClient, fake_redis
+    ):
+        """Пользователи из генератора входят общим паролем и видят свои задачи"""
+        addresses, count = await seed_database(
+            engine, users=3, tasks_per_user=50, password="seedpass123", batch_size=40
+        )
+        assert count == 150
+
+        response = await client.post(
+            "/api/auth/login", json={"email": addresses[1], "password": "seedpass123"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        tasks = await client.get("/api/tasks", params={"limit": 100}, headers=headers)
+
+        items = tasks.json()["items"]
+        assert len(items) == 50
+        now = datetime.now(timezone.utc)
+        future = sum(
+            datetime.fromisoformat(task["due_date"]).replace(tzinfo=timezone.utc) > now
+            for task in items
+        )
+        assert 0 < future < len(items) * FUTURE_SHARE * 2
+
+    async def test_redis_entries_reproducible_for_seed(self):
+        """Отозванные jti и их сроки зависят только от seed"""
+        keys = []
+        for _ in range(2):
+            client = fakeredis.FakeAsyncRedis(decode_responses=True)
+            await seed_redis(client, emails("s", 3), 0, 20, 8, seed=7)
+            keys.append(set(await client.keys("revoked:*")))
+            await client.aclose()
+
+        assert len(keys[0]) == 21  # 20 ключей и поток revoked:log
+        assert keys[0] == keys[1]
+
+    @pytest.mark.postgres
+    @pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL не задан")
+    async def test_postgres_copy(self):
+        """В Postgres задачи загружаются через COPY с генерируемым search_vector"""
+        pg_engine = create_async_engine(POSTGRES_URL)
+        async with pg_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            _, count = await seed_database(
+                pg_engine, users=2, tasks_per_user=30, batch_size=25
+            )
+            async with pg_engine.connect() as conn:
+                indexed = await conn.scalar(
+                    text("SELECT count(*) FROM tasks WHERE search_vector IS NOT NULL")
+                )
+            assert count == indexed == 60
+        finally:
+            async with pg_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+            await pg_engine.dispose()
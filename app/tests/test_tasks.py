@@ -0,0 +1,667 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict
+
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from core.config import settings
+from core.security import create_access_token
+from core.task_list_cache import task_list_cache
+from models import Task
+from repositories.task_repository import TaskRepository
+from services.task_service import TaskService
+
+
+async def create_tasks(client: AsyncClient, headers: Dict, due_dates: list[str]):
+    """Создает задачи с указанными сроками"""
+    for i, due_date in enumerate(due_dates):
+        response = await client.post(
+            "/api/tasks",
+            json={"title": f"Задача {i}", "due_date": due_date},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+
+class TestTasksPagination:
+    """Тесты постраничного получения задач"""
+
+    async def test_pages_are_ordered_and_complete(
+        self, client: AsyncClient, auth_headers: Dict
+    ):
+        """Обход всех страниц по курсору возвращает задачи по порядку без повторов"""
+        due_dates = [
+            "2030-01-03T10:00:00Z",
+            "2030-01-01T10:00:00Z",
+            "2030-01-02T10:00:00Z",
+            "2030-01-01T10:00:00Z",
+            "2030-01-05T10:00:00Z",
+        ]
+        await create_tasks(client, auth_headers, due_dates)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                "/api/tasks", params=params, headers=auth_headers
+            )
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert len(page["items"]) <= 2
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        assert len(seen) == len(due_dates)
+        assert len({task["id"] for task in seen}) == len(due_dates)
+        keys = [(task["due_date"], task["id"]) for task in seen]
+        assert keys == sorted(keys)
+
+    async def test_invalid_cursor(self, client: AsyncClient, auth_headers: Dict):
+        """Невалидный курсор"""
+        response = await client.get(
+            "/api/tasks", params={"cursor": "not-a-cursor"}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestTaskCreate:
+    """Тесты создания задачи"""
+
+    async def test_create_single_statement(
+        self, client: AsyncClient, auth_headers: Dict, query_counter: list
+    ):
+        """Создание задачи выполняет один INSERT ... RETURNING"""
+        await client.get("/api/users/me", headers=auth_headers)
+        query_counter.clear()
+
+        response = await client.post(
+            "/api/tasks",
+            json={"title": "Задача", "due_date": "2030-01-01T10:00:00Z"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["id"]
+        assert len(query_counter) == 1
+        assert query_counter[0].lstrip().upper().startswith("INSERT")
+
+
+class TestTasksBulkCreate:
+    """Тесты пакетного создания задач"""
+
+    async def test_bulk_create(self, client: AsyncClient, auth_headers: Dict):
+        """Задачи создаются одним запросом и возвращаются в исходном порядке"""
+        payload = [
+            {"title": f"Задача {i}", "due_date": f"2030-01-{i + 1:02d}T10:00:00Z"}
+            for i in range(10)
+        ]
+
+        response = await client.post(
+            "/api/tasks/bulk", json=payload, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert [task["title"] for task in data] == [task["title"] for task in payload]
+        assert all(task["id"] and task["created_at"] for task in data)
+        listing = await client.get("/api/tasks", headers=auth_headers)
+        assert len(listing.json()["items"]) == 10
+
+    async def test_bulk_create_too_large(
+        self, client: AsyncClient, auth_headers: Dict, monkeypatch
+    ):
+        """Пакет больше лимита отклоняется"""
+        monkeypatch.setattr(settings, "TASKS_BULK_MAX_SIZE", 2)
+        payload = [
+            {"title": "Задача", "due_date": "2030-01-01T10:00:00Z"} for _ in range(3)
+        ]
+
+        response = await client.post(
+            "/api/tasks/bulk", json=payload, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+
+    async def test_bulk_create_invalid_item(
+        self, client: AsyncClient, auth_headers: Dict
+    ):
+        """Ошибка валидации одного элемента отклоняет весь пакет"""
+        payload = [
+            {"title": "Задача", "due_date": "2030-01-01T10:00:00Z"},
+            {"title": "Без срока"},
+        ]
+
+        response = await client.post(
+            "/api/tasks/bulk", json=payload, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        listing = await client.get("/api/tasks", headers=auth_headers)
+        assert listing.json()["items"] == []
+
+
+class TestTasksExport:
+    """Тесты выгрузки задач"""
+
+    async def test_export_ndjson(self, client: AsyncClient, auth_headers: Dict):
+        """Выгрузка в NDJSON содержит все задачи по порядку"""
+        due_dates = ["2030-01-02T10:00:00Z", "2030-01-01T10:00:00Z"]
+        await create_tasks(client, auth_headers, due_dates)
+
+        response = await client.get("/api/tasks/export", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["title"] for row in rows] == ["Задача 1", "Задача 0"]
+        assert set(rows[0]) == {
+            "id",
+            "title",
+            "description",
+            "due_date",
+            "user_id",
+            "created_at",
+        }
+
+    async def test_export_csv(self, client: AsyncClient, auth_headers: Dict):
+        """Выгрузка в CSV начинается с заголовка"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"] * 3)
+
+        response = await client.get(
+            "/api/tasks/export", params={"format": "csv"}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == [
+            "id",
+            "title",
+            "description",
+            "due_date",
+            "user_id",
+            "created_at",
+        ]
+        assert len(rows) == 4
+
+    async def test_export_unknown_format(self, client: AsyncClient, auth_headers: Dict):
+        """Неизвестный формат выгрузки"""
+        response = await client.get(
+            "/api/tasks/export", params={"format": "xml"}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+class TestTasksDueDateFilters:
+    """Тесты фильтрации задач по сроку"""
+
+    async def test_due_date_range(self, client: AsyncClient, auth_headers: Dict):
+        """Фильтр по диапазону сроков"""
+        await create_tasks(
+            client,
+            auth_headers,
+            ["2030-01-01T10:00:00Z", "2030-01-05T10:00:00Z", "2030-01-10T10:00:00Z"],
+        )
+
+        response = await client.get(
+            "/api/tasks",
+            params={
+                "due_from": "2030-01-02T00:00:00Z",
+                "due_to": "2030-01-10T10:00:00Z",
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task["title"] for task in response.json()["items"]] == ["Задача 1"]
+
+    async def test_overdue(self, client: AsyncClient, auth_headers: Dict):
+        """Фильтр просроченных задач"""
+        await create_tasks(
+            client, auth_headers, ["2000-01-01T10:00:00Z", "2100-01-01T10:00:00Z"]
+        )
+
+        overdue = await client.get(
+            "/api/tasks", params={"overdue": "true"}, headers=auth_headers
+        )
+        upcoming = await client.get(
+            "/api/tasks", params={"overdue": "false"}, headers=auth_headers
+        )
+
+        assert [task["title"] for task in overdue.json()["items"]] == ["Задача 0"]
+        assert [task["title"] for task in upcoming.json()["items"]] == ["Задача 1"]
+
+
+class TestTasksCalendar:
+    """Тесты агрегации задач по дням и неделям"""
+
+    async def test_calendar_by_day_in_timezone(
+        self, client: AsyncClient, auth_headers: Dict
+    ):
+        """Группировка по дням учитывает часовой пояс пользователя"""
+        await create_tasks(
+            client,
+            auth_headers,
+            [
+                "2030-01-01T10:00:00Z",
+                "2030-01-01T20:00:00Z",  # 2 января по Екатеринбургу (UTC+5)
+                "2030-01-03T10:00:00Z",
+                "2030-02-01T10:00:00Z",  # вне периода
+            ],
+        )
+
+        response = await client.get(
+            "/api/tasks/calendar",
+            params={
+                "date_from": "2030-01-01",
+                "date_to": "2030-01-31",
+                "tz": "Asia/Yekaterinburg",
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["buckets"] == [
+            {"period": "2030-01-01", "count": 1},
+            {"period": "2030-01-02", "count": 1},
+            {"period": "2030-01-03", "count": 1},
+        ]
+
+    async def test_calendar_by_week(self, client: AsyncClient, auth_headers: Dict):
+        """Группировка по ISO неделям начиная с понедельника"""
+        await create_tasks(
+            client,
+            auth_headers,
+            [
+                "2030-01-07T10:00:00Z",  # понедельник
+                "2030-01-13T10:00:00Z",  # воскресенье той же недели
+                "2030-01-14T10:00:00Z",  # следующий понедельник
+            ],
+        )
+
+        response = await client.get(
+            "/api/tasks/calendar",
+            params={
+                "date_from": "2030-01-01",
+                "date_to": "2030-01-31",
+                "granularity": "week",
+            },
+            headers=auth_headers,
+        )
+
+        assert response.json()["buckets"] == [
+            {"period": "2030-01-07", "count": 2},
+            {"period": "2030-01-14", "count": 1},
+        ]
+
+    async def test_calendar_invalid_timezone(
+        self, client: AsyncClient, auth_headers: Dict
+    ):
+        """Неизвестный часовой пояс"""
+        response = await client.get(
+            "/api/tasks/calendar",
+            params={
+                "date_from": "2030-01-01",
+                "date_to": "2030-01-31",
+                "tz": "Mars/Base",
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestTasksListCache:
+    """Тесты кеширования списка задач"""
+
+    async def test_not_modified_without_queries(
+        self,
+        client: AsyncClient,
+        auth_headers: Dict,
+        fake_redis,
+        query_counter: list,
+    ):
+        """Совпадение If-None-Match дает 304 без обращения к базе"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"])
+        first = await client.get("/api/tasks", headers=auth_headers)
+        etag = first.headers["ETag"]
+        query_counter.clear()
+
+        response = await client.get(
+            "/api/tasks", headers={**auth_headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert query_counter == []
+
+    async def test_cached_body_served_without_queries(
+        self,
+        client: AsyncClient,
+        auth_headers: Dict,
+        fake_redis,
+        query_counter: list,
+    ):
+        """Повторный запрос отдается из кеша"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"])
+        first = await client.get("/api/tasks", headers=auth_headers)
+        query_counter.clear()
+
+        second = await client.get("/api/tasks", headers=auth_headers)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+        assert query_counter == []
+
+    async def test_write_changes_etag(
+        self, client: AsyncClient, auth_headers: Dict, fake_redis
+    ):
+        """Создание задачи меняет версию списка"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"])
+        first = await client.get("/api/tasks", headers=auth_headers)
+        etag = first.headers["ETag"]
+
+        await create_tasks(client, auth_headers, ["2030-01-02T10:00:00Z"])
+        response = await client.get(
+            "/api/tasks", headers={**auth_headers, "If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["ETag"] != etag
+        assert len(response.json()["items"]) == 2
+
+    async def test_other_params_have_other_etag(
+        self, client: AsyncClient, auth_headers: Dict, fake_redis
+    ):
+        """ETag зависит от параметров запроса"""
+        first = await client.get("/api/tasks", headers=auth_headers)
+        second = await client.get(
+            "/api/tasks", params={"limit": 1}, headers=auth_headers
+        )
+
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    async def test_not_cached_when_version_changes_during_query(
+        self, client: AsyncClient, auth_headers: Dict, fake_redis, monkeypatch
+    ):
+        """Ответ не кешируется, если версия изменилась во время запроса"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"])
+        page_json = TaskService.get_user_tasks_page_json
+
+        async def concurrent_write(self, user_id, *args):
+            body = await page_json(self, user_id, *args)
+            await task_list_cache.bump(user_id)
+            return body
+
+        monkeypatch.setattr(TaskService, "get_user_tasks_page_json", concurrent_write)
+        response = await client.get("/api/tasks", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        keys = await fake_redis.redis_client.keys(f"{task_list_cache.LIST_PREFIX}*")
+        assert keys == []
+
+
+class TestTaskPageSerialization:
+    """Тесты быстрой сериализации страницы задач"""
+
+    async def test_fast_path_matches_schema(
+        self, client: AsyncClient, auth_headers: Dict, db_session
+    ):
+        """JSON из колонок совпадает с сериализацией TaskPageSchema"""
+        await create_tasks(
+            client,
+            auth_headers,
+            [
+                "2030-01-02T10:00:00Z",
+                "2030-01-01T10:00:00+03:00",
+                "2030-01-03T00:00:00Z",
+            ],
+        )
+        user_id = (await client.get("/api/users/me", headers=auth_headers)).json()["id"]
+        service = TaskService(db_session)
+
+        fast = await service.get_user_tasks_page_json(user_id, limit=2)
+        page = await service.get_user_tasks(user_id, limit=2)
+
+        assert fast == page.model_dump_json().encode()
+        assert json.loads(fast)["next_cursor"]
+
+
+class TestTasksSearch:
+    """Тесты полнотекстового поиска задач"""
+
+    async def test_search_ranked_and_paginated(
+        self, client: AsyncClient, auth_headers: Dict
+    ):
+        """Совпадения в заголовке выше совпадений в описании, курсор листает дальше"""
+        payload = [
+            {"title": "Купить молоко", "due_date": "2030-01-01T10:00:00Z"},
+            {
+                "title": "Магазин",
+                "description": "молоко и хлеб",
+                "due_date": "2030-01-02T10:00:00Z",
+            },
+            {"title": "Отчет по проекту", "due_date": "2030-01-03T10:00:00Z"},
+            {"title": "Молоко для кофе", "due_date": "2030-01-04T10:00:00Z"},
+        ]
+        await client.post("/api/tasks/bulk", json=payload, headers=auth_headers)
+
+        first = await client.get(
+            "/api/tasks/search", params={"q": "молок", "limit": 2}, headers=auth_headers
+        )
+        second = await client.get(
+            "/api/tasks/search",
+            params={"q": "молок", "limit": 2, "cursor": first.json()["next_cursor"]},
+            headers=auth_headers,
+        )
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        titles = [task["title"] for task in first.json()["items"]]
+        assert sorted(titles) == ["Купить молоко", "Молоко для кофе"]
+        assert [task["title"] for task in second.json()["items"]] == ["Магазин"]
+        assert second.json()["next_cursor"] is None
+
+    async def test_search_only_own_tasks(
+        self, client: AsyncClient, auth_headers: Dict, another_user_data
+    ):
+        """Поиск не находит задачи других пользователей"""
+        await client.post(
+            "/api/tasks",
+            json={"title": "Секретный отчет", "due_date": "2030-01-01T10:00:00Z"},
+            headers=auth_headers,
+        )
+        await client.post("/api/auth/register", json=another_user_data)
+        token = await create_access_token({"sub": another_user_data["email"]})
+
+        response = await client.get(
+            "/api/tasks/search",
+            params={"q": "отчет"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"] == []
+
+    async def test_search_without_words(self, client: AsyncClient, auth_headers: Dict):
+        """Запрос без слов отклоняется"""
+        response = await client.get(
+            "/api/tasks/search", params={"q": "*?!"}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestTasksBulkUpdateDelete:
+    """Тесты пакетного изменения и удаления задач"""
+
+    async def test_update_by_due_window_single_statement(
+        self, client: AsyncClient, auth_headers: Dict, query_counter: list
+    ):
+        """Изменение по периоду сроков выполняется одним UPDATE"""
+        await create_tasks(
+            client,
+            auth_headers,
+            ["2030-01-01T10:00:00Z", "2030-01-02T10:00:00Z", "2030-02-01T10:00:00Z"],
+        )
+        query_counter.clear()
+
+        response = await client.patch(
+            "/api/tasks",
+            json={
+                "filter": {
+                    "due_from": "2030-01-01T00:00:00Z",
+                    "due_to": "2030-02-01T00:00:00Z",
+                },
+                "update": {"title": "Отчет за январь", "description": None},
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"count": 2}
+        statements = [sql for sql in query_counter if "tasks" in sql]
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("UPDATE")
+        assert "RETURNING" not in statements[0].upper()
+        found = await client.get(
+            "/api/tasks/search", params={"q": "январь"}, headers=auth_headers
+        )
+        assert len(found.json()["items"]) == 2
+
+    async def test_other_user_tasks_untouched(
+        self, client: AsyncClient, auth_headers: Dict, another_user_data
+    ):
+        """Задачи другого пользователя не изменяются и не удаляются по их id"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"])
+        page = await client.get("/api/tasks", headers=auth_headers)
+        task_id = page.json()["items"][0]["id"]
+        await client.post("/api/auth/register", json=another_user_data)
+        token = await create_access_token({"sub": another_user_data["email"]})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        updated = await client.patch(
+            "/api/tasks",
+            json={"filter": {"ids": [task_id]}, "update": {"title": "Чужая"}},
+            headers=headers,
+        )
+        deleted = await client.delete(
+            "/api/tasks", params={"ids": [task_id]}, headers=headers
+        )
+
+        assert updated.json() == {"count": 0}
+        assert deleted.json() == {"count": 0}
+        page = await client.get("/api/tasks", headers=auth_headers)
+        assert [task["title"] for task in page.json()["items"]] == ["Задача 0"]
+
+    async def test_delete_by_ids(
+        self, client: AsyncClient, auth_headers: Dict, query_counter: list
+    ):
+        """Удаляются только задачи из списка id"""
+        await create_tasks(
+            client,
+            auth_headers,
+            ["2030-01-01T10:00:00Z", "2030-01-02T10:00:00Z", "2030-01-03T10:00:00Z"],
+        )
+        page = await client.get("/api/tasks", headers=auth_headers)
+        ids = [task["id"] for task in page.json()["items"]]
+
+        query_counter.clear()
+
+        response = await client.delete(
+            "/api/tasks", params={"ids": ids[:2]}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        statements = [sql for sql in query_counter if "tasks" in sql]
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("DELETE")
+        assert "RETURNING" in statements[0].upper()
+        assert response.json() == {"count": 2}
+        page = await client.get("/api/tasks", headers=auth_headers)
+        assert [task["id"] for task in page.json()["items"]] == ids[2:]
+
+    async def test_delete_streams_ids_in_batches(
+        self, client: AsyncClient, auth_headers: Dict, db_session
+    ):
+        """id удаленных задач читаются из RETURNING пачками"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"] * 5)
+        user_id = (await db_session.scalars(select(Task.user_id))).first()
+        repository = TaskRepository(db_session)
+
+        batches = [
+            ids
+            async for ids in repository.delete_tasks(
+                user_id, due_from=datetime(2030, 1, 1), batch_size=2
+            )
+        ]
+
+        assert [len(ids) for ids in batches] == [2, 2, 1]
+        page = await client.get("/api/tasks", headers=auth_headers)
+        assert page.json()["items"] == []
+
+    async def test_update_returning_streams_rows_in_batches(
+        self, client: AsyncClient, auth_headers: Dict, db_session
+    ):
+        """Строки RETURNING при переносе срока читаются пачками"""
+        await create_tasks(client, auth_headers, ["2030-01-01T10:00:00Z"] * 3)
+        user_id = (await db_session.scalars(select(Task.user_id))).first()
+        repository = TaskRepository(db_session)
+        due_date = datetime(2031, 1, 1)
+
+        batches = [
+            rows
+            async for rows in repository.update_tasks_returning(
+                user_id, {"due_date": due_date}, due_to=due_date, batch_size=2
+            )
+        ]
+
+        assert [len(rows) for rows in batches] == [2, 1]
+        assert {row.due_date for rows in batches for row in rows} == {due_date}
+
+    async def test_too_many_ids_rejected(
+        self, client: AsyncClient, auth_headers: Dict, query_counter: list
+    ):
+        """Список id длиннее лимита отклоняется до обращения к базе"""
+        ids = list(range(1, settings.TASKS_BULK_MAX_SIZE + 2))
+        query_counter.clear()
+
+        updated = await client.patch(
+            "/api/tasks",
+            json={"filter": {"ids": ids}, "update": {"title": "Отчет"}},
+            headers=auth_headers,
+        )
+        deleted = await client.delete(
+            "/api/tasks", params={"ids": ids}, headers=auth_headers
+        )
+
+        assert updated.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert deleted.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+        assert not [sql for sql in query_counter if "tasks" in sql]
+
+    async def test_invalid_requests(self, client: AsyncClient, auth_headers: Dict):
+        """Пустой отбор, пустое изменение и null в заголовке отклоняются"""
+        no_filter = await client.delete("/api/tasks", headers=auth_headers)
+        no_update = await client.patch(
+            "/api/tasks",
+            json={"filter": {"ids": [1]}, "update": {}},
+            headers=auth_headers,
+        )
+        null_title = await client.patch(
+            "/api/tasks",
+            json={"filter": {"ids": [1]}, "update": {"title": None}},
+            headers=auth_headers,
+        )
+
+        assert no_filter.status_code == status.HTTP_400_BAD_REQUEST
+        assert no_update.status_code == status.HTTP_400_BAD_REQUEST
+        assert null_title.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -1,20 +1,132 @@
+import base64
+import json
 import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
 
 import requests
 import streamlit as st
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080/api")
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+# профиль кешируется не дольше жизни access токена
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15")) * 60
+TOKEN_REFRESH_MARGIN_SECONDS = 30
+TASK_PAGE_SIZES = (20, 50, 100)
 st.set_page_config(page_title="JWT  Test")
 
 
+class ApiError(Exception):
+    """Ответ API с ошибкой"""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@st.cache_resource(max_entries=1000)
+def get_http_session(user_key: str) -> requests.Session:
+    """HTTP сессия пользователя с пулом keep-alive соединений к API"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def http_session() -> requests.Session:
+    """HTTP сессия текущего пользователя"""
+    return get_http_session(st.session_state.get("user_email", ""))
+
+
+def error_detail(response: requests.Response, default: str) -> str:
+    """Текст ошибки из ответа API"""
+    try:
+        detail = response.json().get("detail", default)
+    except ValueError:
+        return default
+    return detail if isinstance(detail, str) else str(detail)
+
+
+def token_expires_at(token: str) -> float:
+    """Время истечения JWT из payload, без проверки подписи"""
+    try:
+        payload = token.split(".")[1]
+        padded = payload + "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(padded))["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return 0.0
+
+
+def api_request(method: str, path: str, **kwargs) -> requests.Response:
+    """Запрос к API от имени пользователя
+
+    Access токен обновляется заранее, если он истекает, и после ответа 401,
+    после чего запрос повторяется один раз.
+    """
+    expires_at = token_expires_at(st.session_state.access_token)
+    if expires_at - time.time() < TOKEN_REFRESH_MARGIN_SECONDS:
+        refresh_tokens(silent=True)
+
+    headers = kwargs.pop("headers", {})
+
+    def send() -> requests.Response:
+        return http_session().request(
+            method,
+            f"{API_BASE_URL}{path}",
+            headers={
+                **headers,
+                "Authorization": f"Bearer {st.session_state.access_token}",
+            },
+            timeout=HTTP_TIMEOUT_SECONDS,
+            **kwargs,
+        )
+
+    response = send()
+    if response.status_code == 401 and refresh_tokens(silent=True):
+        response = send()
+    return response
+
+
+@st.cache_data(ttl=PROFILE_CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_profile(user_email: str, access_token: str) -> dict:
+    """Профиль пользователя, кешируется по access токену"""
+    response = get_http_session(user_email).get(
+        f"{API_BASE_URL}/users/me",
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=HTTP_TIMEOUT_SECONDS,
+    )
+    if response.status_code != 200:
+        raise ApiError(response.status_code, error_detail(response, "Ошибка доступа"))
+    return response.json()
+
+
+def load_profile() -> dict:
+    """Профиль текущего пользователя с обновлением токена при 401"""
+    expires_at = token_expires_at(st.session_state.access_token)
+    if expires_at - time.time() < TOKEN_REFRESH_MARGIN_SECONDS:
+        refresh_tokens(silent=True)
+    email = st.session_state.get("user_email", "")
+    try:
+        return fetch_profile(email, st.session_state.access_token)
+    except ApiError as e:
+        if e.status_code != 401 or not refresh_tokens(silent=True):
+            raise
+    return fetch_profile(email, st.session_state.access_token)
+
+
 def main() -> None:
     st.title("JWT аунтификация")
 
     page = st.sidebar.selectbox(
-        "Выберите страницу", ["Регистрация", "Логин", "Профиль", "Выход"]
+        "Выберите страницу", ["Регистрация", "Логин", "Профиль", "Задачи", "Выход"]
     )
 
     if page == "Регистрация":
@@ -23,6 +135,8 @@ def main() -> None:
         login()
     elif page == "Профиль":
         profile()
+    elif page == "Задачи":
+        tasks()
     elif page == "Выход":
         logout()
 
@@ -42,16 +156,16 @@ def registration() -> None:
                 return
 
             try:
-                response = requests.post(
+                response = get_http_session(email).post(
                     f"{API_BASE_URL}/auth/register",
                     json={"email": email, "password": password},
+                    timeout=HTTP_TIMEOUT_SECONDS,
                 )
 
                 if response.status_code == 201:
                     st.success("Регистрация прошла успешно! Теперь можете войти.")
                 else:
-                    error_msg = response.json().get("detail", "Ошибка регистрации")
-                    st.error({error_msg})
+                    st.error(error_detail(response, "Ошибка регистрации"))
 
             except requests.exceptions.RequestException as e:
                 st.error(f"Ошибка подключения к API: {e}")
@@ -72,14 +186,15 @@ def login() -> None:
                 return
 
             try:
-                response = requests.post(
+                response = get_http_session(email).post(
                     f"{API_BASE_URL}/auth/login",
                     json={"email": email, "password": password},
-                    headers={"Content-Type": "application/json"},
+                    timeout=HTTP_TIMEOUT_SECONDS,
                 )
 
                 if response.status_code == 200:
                     data = response.json()
+                    reset_task_pages()
                     st.session_state.access_token = data["access_token"]
                     st.session_state.user_email = email
 
@@ -91,8 +206,7 @@ def login() -> None:
                     st.success(f"Вход успешен! Добро пожаловать, {email}")
                     st.json(data)
                 else:
-                    error_msg = response.json().get("detail", "Ошибка входа")
-                    st.error({error_msg})
+                    st.error(error_detail(response, "Ошибка входа"))
 
             except requests.exceptions.RequestException as e:
                 st.error(f"Ошибка подключения к API: {e}")
@@ -113,19 +227,127 @@ def profile() -> None:
     st.write(f"**Email:** {st.session_state.get('user_email', 'Неизвестно')}")
     st.write(f"**Access Token:** `{st.session_state.access_token}`")
 
-    if st.button("📡 Получить данные профиля"):
-        try:
-            headers = {"Authorization": f"Bearer {st.session_state.access_token}"}
-            response = requests.get(f"{API_BASE_URL}/users/me", headers=headers)
-            if response.status_code == 200:
-                st.success("Данные получены успешно!")
-                st.json(response.json())
+    st.subheader("Данные профиля")
+    try:
+        st.json(load_profile())
+    except ApiError as e:
+        st.error(e.detail)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Ошибка подключения к API: {e}")
+
+
+def reset_task_pages() -> None:
+    """Сбрасывает загруженные страницы задач"""
+    st.session_state.task_view = None
+    st.session_state.task_page = 0
+    st.session_state.task_cursors = [None]
+    st.session_state.task_page_cache = {}
+
+
+def load_task_page(query: str, limit: int, cursor: Optional[str]) -> dict:
+    """Одна страница задач или результатов поиска
+
+    Страницы хранятся в сессии вместе с ETag: повторный показ страницы
+    списка стоит ответа 304 без тела.
+    """
+    key = (query, limit, cursor)
+    cached = st.session_state.task_page_cache.get(key)
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    if query:
+        response = api_request("GET", "/tasks/search", params={**params, "q": query})
+    else:
+        headers = {"If-None-Match": cached[0]} if cached and cached[0] else {}
+        response = api_request("GET", "/tasks", params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+    if response.status_code != 200:
+        raise ApiError(response.status_code, error_detail(response, "Ошибка загрузки"))
+    page = response.json()
+    st.session_state.task_page_cache[key] = (response.headers.get("ETag"), page)
+    return page
+
+
+def create_task_form() -> None:
+    """Форма создания задачи"""
+    with st.expander("Новая задача"):
+        with st.form("task_form", clear_on_submit=True):
+            title = st.text_input("Название")
+            description = st.text_area("Описание")
+            due_date = st.date_input("Срок")
+            due_time = st.time_input("Время (UTC)")
+            submit = st.form_submit_button("Создать")
+
+        if submit:
+            if not title:
+                st.error("Введите название задачи")
+                return
+            due = datetime.combine(due_date, due_time, tzinfo=timezone.utc)
+            try:
+                response = api_request(
+                    "POST",
+                    "/tasks",
+                    json={
+                        "title": title,
+                        "description": description or None,
+                        "due_date": due.isoformat(),
+                    },
+                )
+            except requests.exceptions.RequestException as e:
+                st.error(f"Ошибка подключения к API: {e}")
+                return
+            if response.status_code == 201:
+                reset_task_pages()
+                st.success("Задача создана")
             else:
-                error_msg = response.json().get("detail", "Ошибка доступа")
-                st.error(error_msg)
+                st.error(error_detail(response, "Ошибка создания задачи"))
 
-        except requests.exceptions.RequestException as e:
-            st.error(f"Ошибка подключения к API: {e}")
+
+def tasks() -> None:
+    """Задачи пользователя постранично"""
+    st.header("Задачи")
+
+    if "access_token" not in st.session_state:
+        st.warning("⚠Сначала войдите в систему")
+        return
+    if "task_cursors" not in st.session_state:
+        reset_task_pages()
+
+    create_task_form()
+
+    query = st.text_input("Поиск по названию и описанию").strip()
+    limit = st.selectbox("Задач на странице", TASK_PAGE_SIZES)
+    if st.session_state.task_view != (query, limit):
+        reset_task_pages()
+        st.session_state.task_view = (query, limit)
+
+    cursors = st.session_state.task_cursors
+    index = st.session_state.task_page
+    try:
+        page = load_task_page(query, limit, cursors[index])
+    except ApiError as e:
+        st.error(e.detail)
+        return
+    except requests.exceptions.RequestException as e:
+        st.error(f"Ошибка подключения к API: {e}")
+        return
+
+    if page["items"]:
+        st.dataframe(page["items"], use_container_width=True, hide_index=True)
+    else:
+        st.info("Задач не найдено")
+
+    previous, number, following = st.columns([1, 2, 1])
+    if previous.button("← Назад", disabled=index == 0):
+        st.session_state.task_page = index - 1
+        st.rerun()
+    number.write(f"Страница {index + 1}")
+    if following.button("Далее →", disabled=not page["next_cursor"]):
+        del cursors[index + 1 :]
+        cursors.append(page["next_cursor"])
+        st.session_state.task_page = index + 1
+        st.rerun()
 
 
 def logout() -> None:
@@ -138,15 +360,11 @@ def logout() -> None:
 
     if st.button("Выйти"):
         try:
-            headers = {"Authorization": f"Bearer {st.session_state.access_token}"}
-
             cookies = {}
             if "refresh_token" in st.session_state:
                 cookies = {"refresh_token": st.session_state.refresh_token}
 
-            response = requests.post(
-                f"{API_BASE_URL}/auth/logout", headers=headers, cookies=cookies
-            )
+            response = api_request("POST", "/auth/logout", cookies=cookies)
 
             if response.status_code == 200:
                 for key in list(st.session_state.keys()):
@@ -154,36 +372,46 @@ def logout() -> None:
 
                 st.success("Выход выполнен успешно!")
             else:
-                error_msg = response.json().get("detail", "Ошибка выхода")
-                st.error(error_msg)
+                st.error(error_detail(response, "Ошибка выхода"))
 
         except requests.exceptions.RequestException as e:
             st.error(f"Ошибка подключения к API: {e}")
 
 
-def refresh_tokens() -> None:
-    """Обновление access token через refresh token"""
+def refresh_tokens(silent: bool = False) -> bool:
+    """Обновление access token через refresh token
+
+    С silent=True сообщения не выводятся, результат только возвращается.
+    """
     if "refresh_token" not in st.session_state:
-        st.error("Refresh токен не найден")
-        return
+        if not silent:
+            st.error("Refresh токен не найден")
+        return False
 
     try:
         cookies = {"refresh_token": st.session_state.refresh_token}
-        response = requests.post(f"{API_BASE_URL}/auth/refresh", cookies=cookies)
+        response = http_session().post(
+            f"{API_BASE_URL}/auth/refresh",
+            cookies=cookies,
+            timeout=HTTP_TIMEOUT_SECONDS,
+        )
 
         if response.status_code == 200:
             data = response.json()
             st.session_state.access_token = data["access_token"]
             if response.cookies.get("refresh_token"):
                 st.session_state.refresh_token = response.cookies.get("refresh_token")
+            if not silent:
                 st.success("Токены обновлены!")
+            return True
 
-        else:
-            error_msg = response.json().get("detail", "Ошибка обновления")
-            st.error(error_msg)
+        if not silent:
+            st.error(error_detail(response, "Ошибка обновления"))
 
     except requests.exceptions.RequestException as e:
-        st.error(f"Ошибка подключения к API: {e}")
+        if not silent:
+            st.error(f"Ошибка подключения к API: {e}")
+    return False
 
 
 if __name__ == "__main__":